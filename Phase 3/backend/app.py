@@ -1,847 +1,1951 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-
-from flask_mysqldb import MySQL 
-import MySQLdb.cursors
-
-from threading import Thread, main_thread
-from time import sleep
-import subprocess
-from datetime import date, datetime
-
-app = Flask(__name__)
-CORS(app, origins='*') 
-
-#Config for DB
-app.config['MYSQL_HOST'] = 'localhost'
-app.config['MYSQL_USER'] = 'admin'
-app.config['MYSQL_PASSWORD'] = 'admin' 
-app.config['MYSQL_DB'] = 'lobsternotes'
-# Try common socket locations 
-import os
-socket_paths = [
-    '/tmp/mysql.sock',  # Standard Linux location
-    '/var/run/mysqld/mysql.sock',  # Another common Linux location
-    os.path.expanduser('~/mysql.sock'),  # Home directory location
-]
-for socket_path in socket_paths:
-    if os.path.exists(socket_path):
-        app.config['MYSQL_UNIX_SOCKET'] = socket_path
-        break
-
-
-
-
-# Initialize MySQL connection. Using PyMySQL as the driver.
-mysql = MySQL(app)
-
-
-#Get professor courses from ProfessorDashboard
-@app.route('/api/professor/<int:prof_id>/courses', methods=['GET'])
-def get_professor_courses(prof_id):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
-        
-        search_term = request.args.get('search')
-        
-        query = """
-        SELECT CourseID, Subject, CatalogNumber, Name, Section, Year, ProfessorID
-        FROM course
-        WHERE ProfessorID = %s
-        """
-        params = [prof_id]
-
-        if search_term:
-            query += " AND (Name LIKE %s OR Subject LIKE %s)"
-            search_param = '%' + search_term + '%'
-            params.extend([search_param, search_param])
-
-        cursor.execute(query, tuple(params))
-        courses = cursor.fetchall()
-        return jsonify(courses)
-    except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"error": "Failed to fetch courses"}), 500
-    finally:
-        if cursor: cursor.close()
-
-#Get single course detail 
-@app.route('/api/course/<int:course_id>', methods=['GET'])
-def get_course_details(course_id):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Fetch course info and the prof name
-        query = """
-        SELECT c.*, u.Name as ProfessorName 
-        FROM course c
-        LEFT JOIN user u ON c.ProfessorID = u.UserID
-        WHERE c.CourseID = %s
-        """
-        cursor.execute(query, (course_id,))
-        course = cursor.fetchone() # Fetch just one result
-        
-        if not course:
-            return jsonify({"error": "Course not found"}), 404
-            
-        return jsonify(course)
-    except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"error": "Failed to fetch details"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-#Get Course Roster
-@app.route('/api/course/<int:course_id>/roster', methods=['GET'])
-def get_course_roster(course_id):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Query students enrolled in the course
-        query = """
-        SELECT 
-            u.UserID,
-            u.Name,     
-            u.Courses 
-        FROM student s
-        JOIN user u ON s.UserID = u.UserID
-        JOIN enrolled e ON s.UserID = e.StudentID
-        WHERE e.CourseID = %s;
-        """
-        
-        cursor.execute(query, (course_id,))
-        students = cursor.fetchall()
-        
-        #Return list of students as JSON
-        return jsonify(students)
-        
-    except Exception as e:
-        print(f"Database Query Error in get_course_roster: {e}")
-        return jsonify({"error": "Failed to fetch student roster from database"}), 500
-
-    finally:
-        if cursor:
-            cursor.close()
-
-#create a new course
-@app.route('/api/courses', methods=['POST'])
-def add_course():
-    cursor = None
-    try:
-        #Get data from frontend
-        data = request.get_json()
-        
-        #validate frontend required fields
-        subject = data.get('Subject')
-        catalog_number = data.get('CatalogNumber')
-        name = data.get('Name')
-        section = data.get('Section')
-        year = data.get('Year')
-        session = data.get('Session')
-        professor_id = data.get('ProfessorID')
-
-        conn = mysql.connection
-        # Use DictCursor to easily access ProfessorID later, though not strictly required for INSERT
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
-        
-        #Insert query
-        query = """
-        INSERT INTO course (Subject, CatalogNumber, Name, Section, Year, Session, ProfessorID)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        #Execute query
-        cursor.execute(query, (subject, catalog_number, name, section, year, session, professor_id))
-        
-        #Save insert to DB
-        conn.commit()
-
-        return jsonify({"message": "Course created successfully", "course_id": cursor.lastrowid}), 201
-    except Exception as e:
-        #Rollback implemented for Atomicity and Consistency in ACID - GW
-        if conn:
-            conn.rollback()
-        print(f"Error adding course: {e}")
-        return jsonify({"error": "Failed to add course"}), 500
-    finally:
-        if cursor: cursor.close()
-
-#Update course
-@app.route('/api/courses/<int:course_id>', methods=['PUT'])
-def update_course(course_id):
-    cursor = None
-    try:
-        data = request.get_json()
-        
-        # Attributes that can be updated
-        name = data.get('Name')
-        section = data.get('Section')
-        session = data.get('Session')
-        year = data.get('Year')
-
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
-        
-        #Update query
-        query = """
-        UPDATE course
-        SET Name = %s, Section = %s, Session = %s, Year = %s
-        WHERE CourseID = %s
-        """
-        
-        # Execute query
-        cursor.execute(query, (name, section, session, year, course_id))
-        #save to DB
-        conn.commit()
-
-        if cursor.rowcount == 0:
-             return jsonify({"error": "Course not found or no changes made"}), 404
-             
-        return jsonify({"message": "Course updated successfully"}), 200
-    except Exception as e:
-        #Rollback implemented for Atomicity and Consistency in ACID - GW
-        if conn:
-            conn.rollback()
-        print(f"Error updating course: {e}")
-        return jsonify({"error": "Failed to update course"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-#Delete Course (ENSURE PROFESSOR ONLY -> Will delete all records attached to course)
-@app.route('/api/courses/<int:course_id>', methods=['DELETE'])
-def delete_course(course_id):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
-        
-        # Delete query
-        query = """
-        DELETE FROM course
-        WHERE CourseID = %s
-        """
-        
-        #Execute query
-        cursor.execute(query, (course_id,))
-        
-        #update DB
-        conn.commit()
-
-        if cursor.rowcount == 0:
-             return jsonify({"error": "Course not found"}), 404
-             
-        return jsonify({"message": f"Course {course_id} deleted successfully"}), 200
-    except Exception as e:
-        #Rollback implemented for Atomicity and Consistency in ACID - GW
-        if conn:
-            conn.rollback()
-        print(f"Error deleting course: {e}")
-        return jsonify({"error": "Failed to delete course"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# ==================== USER ENDPOINTS ====================
-
-# List users (basic info)
-@app.route('/api/users', methods=['GET'])
-def list_users():
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute("SELECT UserID, Name, Courses, IsProfessor FROM user ORDER BY UserID")
-        users = cursor.fetchall()
-        return jsonify(users)
-    except Exception as e:
-        print(f"Error fetching users: {e}")
-        return jsonify({"error": "Failed to fetch users"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# Create a new user (student or professor)
-@app.route('/api/users', methods=['POST'])
-def create_user():
-    cursor = None
-    try:
-        data = request.get_json()
-
-        name = data.get('Name')
-        password = data.get('Password')
-        courses = data.get('Courses')
-        is_professor = data.get('IsProfessor', False)
-
-        # Normalize boolean (handle string inputs)
-        if isinstance(is_professor, str):
-            is_professor = is_professor.strip().lower() in ['true', '1', 'yes', 'y']
-
-        if not name:
-            return jsonify({"error": "Missing required field: Name"}), 400
-        
-        if not password:
-            return jsonify({"error": "Missing required field: Password"}), 400
-
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-
-        # If user already exists, return their id
-        cursor.execute("SELECT UserID FROM user WHERE Name = %s", (name,))
-        existing = cursor.fetchone()
-        if existing:
-            return jsonify({"message": "User already exists", "user_id": existing['UserID']}), 200
-
-        # Insert user
-        cursor.execute(
-            "INSERT INTO user (Name, Password, Courses, IsProfessor) VALUES (%s, %s, %s, %s)",
-            (name, password, courses, is_professor)
-        )
-        conn.commit()
-
-        user_id = cursor.lastrowid
-
-        # Insert into role table
-        if is_professor:
-            cursor.execute("INSERT INTO professor (UserID, Badge) VALUES (%s, NULL)", (user_id,))
-        else:
-            cursor.execute("INSERT INTO student (UserID) VALUES (%s)", (user_id,))
-
-        conn.commit()
-
-        return jsonify({
-            "message": "User created successfully",
-            "user_id": user_id,
-            "Name": name,
-            "IsProfessor": bool(is_professor)
-        }), 201
-
-    except Exception as e:
-        #Rollback implemented for Atomicity and Consistency in ACID - GW
-        if conn:
-            conn.rollback()
-        print(f"Error creating user: {e}")
-        return jsonify({"error": "Failed to create user"}), 500
-    finally:
-        if cursor: cursor.close()
-
-# Login procedure
-@app.route('/api/login/',methods=['POST','GET'])
-def login():
-    conn = mysql.connection
-    cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-    data = request.get_json()
-    name = data.get('Name')
-    password = data.get('Password')
-    if not name:
-        return jsonify({"error": "Missing required field: Name"}), 400
-    if not password:
-        return jsonify({"error": "Missing required field: Password"}), 400
-
-
-
-    cursor.execute('SELECT UserID, Name, Courses, IsProfessor from user where Name = %s and Password = %s',(name,password))
-    result = cursor.fetchone()
-    conn.commit()
-    return (jsonify(result))
-
-
-
-# Get all resources/notes with optional search and filtering
-@app.route('/api/resources', methods=['GET'])
-def get_resources():
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Get query parameters for filtering
-        search_term = request.args.get('search')
-        topic = request.args.get('topic')
-        format_type = request.args.get('format')
-        subject = request.args.get('subject')
-        
-        # Base query joining all resource types
-        query = """
-        SELECT 
-            r.ResourceID,
-            r.Date,
-            r.DateFor,
-            r.Author,
-            r.Topic as Title,
-            r.Topic,
-            r.Keywords,
-            r.Rating,
-            r.Format,
-            r.isVerified,
-            n.Body,
-            w.Link as Url,
-            v.Duration,
-            v.Link as VideoUrl,
-            p.Link as PdfUrl,
-            i.Link as ImageUrl,
-            i.Size as ImageSize
-        FROM resource r
-        LEFT JOIN note n ON r.ResourceID = n.ResourceID
-        LEFT JOIN website w ON r.ResourceID = w.ResourceID
-        LEFT JOIN video v ON r.ResourceID = v.ResourceID
-        LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
-        LEFT JOIN image i ON r.ResourceID = i.ResourceID
-        WHERE 1=1
-        """
-        params = []
-        
-        # Add broader search filter across title, keywords, author, bodies, and URLs
-        if search_term:
-            query += " AND (r.Topic LIKE %s OR r.Keywords LIKE %s OR r.Author LIKE %s OR n.Body LIKE %s OR w.Link LIKE %s OR v.Link LIKE %s OR p.Link LIKE %s OR i.Link LIKE %s)"
-            search_param = '%' + search_term + '%'
-            params.extend([search_param, search_param, search_param, search_param, search_param, search_param, search_param, search_param])
-        
-        # Add topic filter
-        if topic:
-            query += " AND r.Topic LIKE %s"
-            params.append('%' + topic + '%')
-        
-        # Add format filter (case-insensitive)
-        if format_type:
-            query += " AND LOWER(r.Format) = LOWER(%s)"
-            params.append(format_type)
-        
-        # Add subject filter (search in topic/keywords)
-        if subject:
-            query += " AND (r.Topic LIKE %s OR r.Keywords LIKE %s)"
-            subject_param = '%' + subject + '%'
-            params.extend([subject_param, subject_param])
-        
-        query += " ORDER BY r.Date DESC"
-        
-        cursor.execute(query, tuple(params))
-        resources = cursor.fetchall()
-        # Consolidate URLs (handle lowercase formats from import)
-        for resource in resources:
-            fmt = (resource.get('Format') or '').lower()
-            resource['Format'] = fmt  # normalize returned value
-            if fmt == 'website' and resource.get('Url'):
-                pass
-            elif fmt == 'video':
-                resource['Url'] = resource.get('VideoUrl')
-            elif fmt == 'pdf':
-                resource['Url'] = resource.get('PdfUrl')
-            elif fmt == 'image':
-                resource['Url'] = resource.get('ImageUrl')
-            
-            if 'VideoUrl' in resource:
-                del resource['VideoUrl']
-            if 'PdfUrl' in resource:
-                del resource['PdfUrl']
-            if 'ImageUrl' in resource:
-                del resource['ImageUrl']
-        
-        return jsonify(resources)
-    except Exception as e:
-        print(f"Error fetching resources: {e}")
-        return jsonify({"error": "Failed to fetch resources"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# Get single resource/note by ID
-@app.route('/api/resources/<int:resource_id>', methods=['GET'])
-def get_resource_details(resource_id):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        query = """
-        SELECT 
-            r.ResourceID,
-            r.Date,
-            r.DateFor,
-            r.Author,
-            r.Topic as Title,
-            r.Topic,
-            r.Keywords,
-            r.Rating,
-            r.Format,
-            r.isVerified,
-            n.Body,
-            w.Link as WebsiteUrl,
-            v.Duration,
-            v.Link as VideoUrl,
-            p.Link as PdfUrl,
-            p.Body as PdfBody,
-            i.Link as ImageUrl,
-            i.Size as ImageSize,
-            (SELECT AVG(Score) FROM rating WHERE ResourceID = r.ResourceID) as Average_Rating
-        FROM resource r
-        LEFT JOIN note n ON r.ResourceID = n.ResourceID
-        LEFT JOIN website w ON r.ResourceID = w.ResourceID
-        LEFT JOIN video v ON r.ResourceID = v.ResourceID
-        LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
-        LEFT JOIN image i ON r.ResourceID = i.ResourceID
-        WHERE r.ResourceID = %s
-        """
-        cursor.execute(query, (resource_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            return jsonify({"error": "Resource not found"}), 404
-        
-        # Consolidate URL field
-        if result.get('Format') == 'Website':
-            result['Url'] = result.get('WebsiteUrl') or result.get('Web_Address')
-        elif result.get('Format') == 'Video':
-            result['Url'] = result.get('VideoUrl')
-        elif result.get('Format') == 'Pdf':
-            result['Url'] = result.get('PdfUrl')
-        elif result.get('Format') == 'Image':
-            result['Url'] = result.get('ImageUrl')
-        elif result.get('Format') == 'Note':
-            result['Body'] = result.get('Body') or result.get('Note_Body')
-        
-        return jsonify(result)
-    except Exception as e:
-        print(f"Error fetching resource details: {e}")
-        return jsonify({"error": "Failed to fetch resource details"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# Create a new resource/note
-@app.route('/api/resources', methods=['POST'])
-def create_resource():
-    cursor = None
-    try:
-        from datetime import datetime
-        data = request.get_json()
-        
-        # Required fields
-        author = data.get('Author')
-        topic = data.get('Topic')
-        format_type = data.get('Format')
-        
-        # DateFor defaults to today if not provided
-        date_for = data.get('DateFor') or datetime.now().strftime('%Y-%m-%d')
-        
-        # Optional fields
-        keywords = data.get('Keywords')
-        body = data.get('Body')
-        link = data.get('Link') or data.get('Url')
-        duration = data.get('Duration')
-        size = data.get('Size')
-        
-        if not all([author, topic, format_type]):
-            return jsonify({"error": "Missing required fields: Author, Topic, Format"}), 400
-        
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Check if author exists, if not create them
-        cursor.execute("SELECT UserID FROM user WHERE Name = %s", (author,))
-        author_exists = cursor.fetchone()
-        
-        if not author_exists:
-            # Create new user for the author
-            cursor.execute(
-                "INSERT INTO user (Name, Courses, IsProfessor) VALUES (%s, NULL, FALSE)",
-                (author,)
-            )
-            # conn.commit() #Commented out for Atomicity -GW
-            
-            # Get the new user ID and create Student entry
-            cursor.execute("SELECT UserID FROM user WHERE Name = %s", (author,))
-            new_user = cursor.fetchone()
-            if new_user:
-                user_id = new_user['UserID']
-                cursor.execute("INSERT INTO student (UserID) VALUES (%s)", (user_id,))
-                # conn.commit() #Commented out for Atomicity -GW
-        
-        insert_query = """
-        INSERT INTO resource (Date, DateFor, Author, Topic, Keywords, Format)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        
-        today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute(insert_query, (today, date_for, author, topic, keywords, format_type))
-        # conn.commit() #Commented out for Atomicity -GW
-        
-        resource_id = cursor.lastrowid
-        
-        # Now insert format-specific data
-        if format_type == 'Note' and body:
-            cursor.execute("INSERT INTO note (ResourceID, Body) VALUES (%s, %s)", (resource_id, body))
-        elif format_type == 'Website' and link:
-            cursor.execute("INSERT INTO website (ResourceID, Link) VALUES (%s, %s)", (resource_id, link))
-        elif format_type == 'Pdf' and (link or body):
-            cursor.execute("INSERT INTO pdf (ResourceID, Body, Link) VALUES (%s, %s, %s)", (resource_id, body, link))
-        elif format_type == 'Image' and link:
-            cursor.execute("INSERT INTO image (ResourceID, Size, Link) VALUES (%s, %s, %s)", (resource_id, size, link))
-        elif format_type == 'Video' and link:
-            cursor.execute("INSERT INTO video (ResourceID, Duration, Link) VALUES (%s, %s, %s)", (resource_id, duration, link))
-        
-        conn.commit() #need only the commit at end, keeps user from being created if note creation fails -GW
-        
-        return jsonify({
-            "message": "Resource created successfully",
-            "resource_id": resource_id
-        }), 201
-        
-    except Exception as e:
-        #Rollback implemented for Atomicity and Consistency in ACID - GW
-        if conn:
-            conn.rollback()
-        print(f"Error creating resource: {e}")
-        return jsonify({"error": f"Failed to create resource: {str(e)}"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# Submit a rating for a resource
-@app.route('/api/resources/<int:resource_id>/ratings', methods=['POST'])
-def submit_rating(resource_id):
-    cursor = None
-    try:
-        data = request.get_json()
-        
-        poster = data.get('Poster')
-        score = data.get('Score')
-        date = data.get('Date')
-        
-        if not all([poster, score, date]):
-            return jsonify({"error": "Missing required fields"}), 400
-        
-        # Validate score range
-        try:
-            score_float = float(score)
-            if score_float < 0.0 or score_float > 5.0:
-                return jsonify({"error": "Score must be between 0.0 and 5.0"}), 400
-        except ValueError:
-            return jsonify({"error": "Invalid score format"}), 400
-        
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Check if poster exists as a user, if not create them
-        cursor.execute("SELECT UserID FROM user WHERE Name = %s", (poster,))
-        poster_exists = cursor.fetchone()
-        
-        if not poster_exists:
-            # Create new user for the poster
-            cursor.execute(
-                "INSERT INTO user (Name, Courses, IsProfessor) VALUES (%s, NULL, FALSE)",
-                (poster,)
-            )
-            # conn.commit() #Commented out for Atomicity -GW
-            
-            # Get the new user ID and create Student entry
-            cursor.execute("SELECT UserID FROM user WHERE Name = %s", (poster,))
-            new_user = cursor.fetchone()
-            if new_user:
-                user_id = new_user['UserID']
-                cursor.execute("INSERT INTO student (UserID) VALUES (%s)", (user_id,))
-                # conn.commit() #Commented out for Atomicity -GW
-        
-        # Use stored procedure SP_Rating_Rate
-        cursor.callproc('SP_Rating_Rate', [
-            resource_id,
-            poster,
-            score,
-            date
-        ])
-        
-        # conn.commit() #Commented out for Atomicity -GW
-        
-        # Update the average rating in Resource table
-        cursor.execute("""
-            UPDATE resource 
-            SET Rating = (
-                SELECT ROUND(AVG(Score), 1) 
-                FROM rating 
-                WHERE ResourceID = %s
-            )
-            WHERE ResourceID = %s
-        """, (resource_id, resource_id))
-        
-        conn.commit() #need only the commit at end, keeps user from being created if rating fails -GW
-        
-        return jsonify({"message": "Rating submitted successfully"}), 201
-        
-    except Exception as e:
-        #Rollback implemented for Atomicity and Consistency in ACID - GW
-        if conn:
-            conn.rollback()
-        print(f"Error submitting rating: {e}")
-        return jsonify({"error": "Failed to submit rating"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# Get ratings for a specific resource
-@app.route('/api/resources/<int:resource_id>/ratings', methods=['GET'])
-def get_resource_ratings(resource_id):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        query = """
-        SELECT RatingID, Poster, Score, Date
-        FROM rating
-        WHERE ResourceID = %s
-        ORDER BY Date DESC
-        """
-        
-        cursor.execute(query, (resource_id,))
-        ratings = cursor.fetchall()
-        
-        return jsonify(ratings)
-    except Exception as e:
-        print(f"Error fetching ratings: {e}")
-        return jsonify({"error": "Failed to fetch ratings"}), 500
-    finally:
-        if cursor: cursor.close()
-
-
-# Get resources by subject/course
-@app.route('/api/subjects/<subject_code>/resources', methods=['GET'])
-def get_resources_by_subject(subject_code):
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        
-        # Get subject name first
-        cursor.execute("SELECT Name FROM Subject WHERE Code = %s", (subject_code,))
-        subject = cursor.fetchone()
-        
-        if not subject:
-            return jsonify({"error": "Subject not found"}), 404
-        
-        subject_name = subject['Name']
-        
-        # Search for resources matching the subject in Topic or Keywords
-        query = """
-        SELECT 
-            r.ResourceID,
-            r.Date,
-            r.DateFor,
-            r.Author,
-            r.Topic as Title,
-            r.Topic,
-            r.Keywords,
-            r.Rating,
-            r.Format,
-            r.isVerified,
-            n.Body,
-            w.Link as Url,
-            v.Link as VideoUrl,
-            p.Link as PdfUrl,
-            i.Link as ImageUrl
-        FROM resource r
-        LEFT JOIN note n ON r.ResourceID = n.ResourceID
-        LEFT JOIN website w ON r.ResourceID = w.ResourceID
-        LEFT JOIN video v ON r.ResourceID = v.ResourceID
-        LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
-        LEFT JOIN image i ON r.ResourceID = i.ResourceID
-        WHERE r.Topic LIKE %s OR r.Keywords LIKE %s
-        ORDER BY r.Date DESC
-        """
-        
-        search_param = '%' + subject_code + '%'
-        cursor.execute(query, (search_param, search_param))
-        resources = cursor.fetchall()
-        
-        # Consolidate URLs
-        for resource in resources:
-            if resource['Format'] == 'Video':
-                resource['Url'] = resource['VideoUrl']
-            elif resource['Format'] == 'Pdf':
-                resource['Url'] = resource['PdfUrl']
-            elif resource['Format'] == 'Image':
-                resource['Url'] = resource['ImageUrl']
-            
-            if 'VideoUrl' in resource:
-                del resource['VideoUrl']
-            if 'PdfUrl' in resource:
-                del resource['PdfUrl']
-            if 'ImageUrl' in resource:
-                del resource['ImageUrl']
-        
-        return jsonify({
-            "subject": subject_name,
-            "code": subject_code,
-            "resources": resources
-        })
-    except Exception as e:
-        print(f"Error fetching resources by subject: {e}")
-        return jsonify({"error": "Failed to fetch resources"}), 500
-    finally:
-        if cursor: cursor.close()
-
-# Dump the full contents of the database with mysqldump
-def fullBackup():
-    with app.app_context():
-        sleep(0.1)
-        try:
-            today = date.today()
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S")
-            command = ["mysqldump","--allow-keywords","--quick","--databases","LobsterNotes",
-                "--single-transaction","--force" "--dump-date","--insert-ignore",
-                "--user=admin","--password=admin","--port=3306","--routines",
-                "--triggers",f"--result-file=sql-commands-and-backend/database/mysql/backups/backup_{today}_{current_time}",
-                "--source-date=2","--flush-logs","--log-error=sql-commands-and-backend/database/mysql/backups/backup.err"]
-            subprocess.run(command,check=True)
-        except subprocess.CalledProcessError as err:
-            print(f"Error during mysql full backup: {err}")
-            print(f"Command: {' '.join(err.cmd)}")
-            print(f"Stderror: {err.stderr.decode()}")
-        except FileNotFoundError:
-            print("Error: mysqldump command not found.")
-        except Exception as err:
-            print(f"Unexpected error occured in mysql full backup: {err}")
-        return
-
-# Partial backup just consists of flushing all logs
-def partialBackup(cursor):
-    with app.app_context():
-        sleep(0.01)
-        cursor.execute("FLUSH LOGS")
-        return
-
-def backup():
-    with app.app_context():
-        backupConnection = mysql.connection
-        backupCursor = backupConnection.cursor(cursor=cursors.DictCursor)
-        sleep(0.001)
-        fullBackup()
-        partialCounter = 0
-        while main_thread().is_alive():
-            sleep(1800) # sleeps for 30 minutes
-            partialBackup(backupCursor) # do partial backup every 30 mins
-            partialCounter += 1
-            if partialCounter >= 48:
-                # does a full backup every 24 hours
-                fullBackup()
-                partialCounter = 0
-        # In the case that the main thread exits:
-        # Do a final full backup, which includes flushing the logs
-        fullBackup()
-        return
-
-
-#Runs app
-if __name__ == "__main__":
-    with app.app_context():
-        backupManager = Thread(target=backup,kwargs={},daemon=False)
-        backupManager.start()
-        app.run(debug=True, port=8080)
+from flask import Flask, Response, has_app_context, jsonify, request, stream_with_context
+from flask_cors import CORS
+
+import MySQLdb.cursors
+from db_pool import MySQLPool
+from search_index import ResourceIndex
+from rating_queue import RatingQueue
+from response_cache import ResponseCache
+from user_resolver import UserResolver
+from request_metrics import RequestMetrics, query_observers
+from slow_queries import SlowQueryLog
+
+from threading import Event, Lock, Thread, main_thread
+from time import monotonic, sleep
+import subprocess
+import signal
+from datetime import date, datetime
+import re
+import json
+
+app = Flask(__name__)
+CORS(app, origins='*', expose_headers=['X-Next-Cursor', 'Server-Timing']) 
+
+#Config for DB
+app.config['MYSQL_HOST'] = 'localhost'
+app.config['MYSQL_USER'] = 'admin'
+app.config['MYSQL_PASSWORD'] = 'admin' 
+app.config['MYSQL_DB'] = 'lobsternotes'
+# Try common socket locations 
+import os
+socket_paths = [
+    '/tmp/mysql.sock',  # Standard Linux location
+    '/var/run/mysqld/mysql.sock',  # Another common Linux location
+    os.path.expanduser('~/mysql.sock'),  # Home directory location
+]
+for socket_path in socket_paths:
+    if os.path.exists(socket_path):
+        app.config['MYSQL_UNIX_SOCKET'] = socket_path
+        break
+
+
+
+# Connection pool settings (see db_pool.py)
+app.config['MYSQL_POOL_SIZE'] = 10
+app.config['MYSQL_POOL_TIMEOUT'] = 5.0
+app.config['MYSQL_POOL_MAX_LIFETIME'] = 3600.0
+app.config['MYSQL_POOL_PING_INTERVAL'] = 30.0
+
+# Initialize pooled MySQL connections. Handlers borrow one through mysql.connection
+mysql = MySQLPool(app)
+
+# Optional in-memory search index for /api/resources/search (see search_index.py)
+app.config['SEARCH_INDEX_ENABLED'] = os.environ.get('LOBSTER_SEARCH_INDEX', '0') == '1'
+# Each worker updates its own copy of the index with the writes it serves. Writes made by other
+# workers (or outside the API) are picked up by a rebuild: every SEARCH_INDEX_CHECK_INTERVAL
+# seconds the 'resources' row of cache_version is compared with the one the index was built
+# from. 0 turns the check off, leaving an index stale until the worker is recycled
+app.config['SEARCH_INDEX_CHECK_INTERVAL'] = float(os.environ.get('LOBSTER_SEARCH_INDEX_CHECK_INTERVAL', '60'))
+resource_index = ResourceIndex()
+
+# Optional write-behind rating ingestion (see rating_queue.py)
+app.config['RATING_QUEUE_ENABLED'] = os.environ.get('LOBSTER_RATING_QUEUE', '0') == '1'
+app.config['RATING_QUEUE_BATCH_SIZE'] = int(os.environ.get('LOBSTER_RATING_BATCH_SIZE', '200'))
+app.config['RATING_QUEUE_FLUSH_INTERVAL'] = float(os.environ.get('LOBSTER_RATING_FLUSH_INTERVAL', '1.0'))
+# Longest wait between retries while the database cannot take a batch; batches are never given up
+app.config['RATING_QUEUE_MAX_BACKOFF'] = float(os.environ.get('LOBSTER_RATING_MAX_BACKOFF', '30'))
+app.config['RATING_QUEUE_SPOOL_DIR'] = os.environ.get(
+    'LOBSTER_RATING_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spool'))
+
+# Response cache for read endpoints (see response_cache.py).
+# Set LOBSTER_CACHE_SHARED to a file path to share cached entries between workers on one host.
+# Tag versions come from the cache_version table (LOBSTER_CACHE_VERSIONS=database) so every
+# worker and every writer agrees on them; 'process' keeps them in the API process, which only
+# sees the API's own writes and needs LOBSTER_CACHE_SHARED with more than one worker
+app.config['RESPONSE_CACHE_ENABLED'] = os.environ.get('LOBSTER_CACHE', '1') == '1'
+app.config['RESPONSE_CACHE_TTL'] = float(os.environ.get('LOBSTER_CACHE_TTL', '30'))
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('LOBSTER_CACHE_MAX_ENTRIES', '1024'))
+app.config['RESPONSE_CACHE_SHARED_PATH'] = os.environ.get('LOBSTER_CACHE_SHARED') or None
+app.config['RESPONSE_CACHE_VERSIONS'] = os.environ.get('LOBSTER_CACHE_VERSIONS', 'database')
+# Seconds a worker reuses the cache_version rows it read. Its own writes show at once; writes
+# from other workers and tools can take this long to change its ETags. 0 reads them every request
+app.config['RESPONSE_CACHE_VERSION_REFRESH'] = float(os.environ.get('LOBSTER_CACHE_VERSION_REFRESH', '1'))
+# Set by gunicorn.conf.py and run_asgi.sh
+app.config['WORKERS'] = int(os.environ.get('LOBSTER_WORKERS', '1'))
+response_cache = ResponseCache(
+    max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+    ttl=app.config['RESPONSE_CACHE_TTL'],
+    shared_path=app.config['RESPONSE_CACHE_SHARED_PATH'],
+    enabled=app.config['RESPONSE_CACHE_ENABLED'],
+    version_refresh=app.config['RESPONSE_CACHE_VERSION_REFRESH'],
+)
+
+def cache_versions_query(tags):
+    placeholders = ', '.join(['%s'] * len(tags))
+    return (f"SELECT Tag, Version, UNIX_TIMESTAMP(Modified) AS Modified FROM cache_version "
+            f"WHERE Tag IN ({placeholders})", tuple(tags))
+
+def cache_versions_from_rows(rows):
+    return {row['Tag']: (int(row['Version']), float(row['Modified'])) for row in rows}
+
+# Read on the request's own connection, so the versions come from the same snapshot as the data
+def load_cache_versions(tags):
+    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        cursor.execute(*cache_versions_query(tags))
+        return cache_versions_from_rows(cursor.fetchall())
+    finally:
+        cursor.close()
+
+# One statement for every tag a write touched, in tag order so concurrent bumps lock the rows alike.
+# Called by invalidate() after the write has committed, on the request's connection or, from the
+# rating flusher, a pooled one
+def bump_cache_versions(tags):
+    rows = ', '.join(['(%s, 1, now(6))'] * len(tags))
+    sql = (f"INSERT INTO cache_version (Tag, Version, Modified) VALUES {rows} "
+           f"ON DUPLICATE KEY UPDATE Version = Version + 1, Modified = now(6)")
+    pooled = None if has_app_context() else mysql.pool.acquire()
+    conn = mysql.connection if pooled is None else pooled.raw
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, tuple(tags))
+        conn.commit()
+    finally:
+        cursor.close()
+        if pooled is not None:
+            mysql.pool.release(pooled)
+
+if app.config['RESPONSE_CACHE_VERSIONS'] == 'database':
+    response_cache.version_loader = load_cache_versions
+    response_cache.version_bumper = bump_cache_versions
+elif app.config['WORKERS'] > 1 and not app.config['RESPONSE_CACHE_SHARED_PATH']:
+    # Each worker would answer 304 for versions only it has seen
+    print("Response cache and ETags off: LOBSTER_CACHE_VERSIONS=process with several workers needs LOBSTER_CACHE_SHARED")
+    response_cache.enabled = False
+    response_cache.conditional = False
+
+# Name -> UserID resolution for authors and rating posters (see user_resolver.py)
+app.config['USER_CACHE_MAX_ENTRIES'] = int(os.environ.get('LOBSTER_USER_CACHE_MAX_ENTRIES', '4096'))
+user_resolver = UserResolver(max_entries=app.config['USER_CACHE_MAX_ENTRIES'])
+
+# Keep the search index and cached responses current after a queued rating batch lands
+def refresh_indexed_ratings(resource_ids):
+    response_cache.invalidate('resources', *[f'resource:{rid}' for rid in resource_ids])
+    if not resource_index.built:
+        return
+    pooled = mysql.pool.acquire()
+    cursor = pooled.raw.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(resource_ids))
+        cursor.execute(f"SELECT ResourceID, Rating FROM resource WHERE ResourceID IN ({placeholders})", tuple(resource_ids))
+        for resource_id, rating in cursor.fetchall():
+            resource_index.update_rating(resource_id, rating)
+        pooled.raw.commit()
+    finally:
+        cursor.close()
+        mysql.pool.release(pooled)
+
+rating_queue = RatingQueue(
+    mysql.pool,
+    app.config['RATING_QUEUE_SPOOL_DIR'],
+    batch_size=app.config['RATING_QUEUE_BATCH_SIZE'],
+    flush_interval=app.config['RATING_QUEUE_FLUSH_INTERVAL'],
+    max_backoff=app.config['RATING_QUEUE_MAX_BACKOFF'],
+    user_resolver=user_resolver,
+    on_flush=refresh_indexed_ratings,
+)
+
+
+# Per-route latency histograms and DB query timing, see request_metrics.py
+request_metrics = RequestMetrics()
+request_metrics.init_app(app, pool=mysql)
+request_metrics.add_collector('lobster_pool', mysql.pool.stats, counters=mysql.pool.STATS_COUNTERS)
+request_metrics.add_collector('lobster_rating_queue', rating_queue.stats, counters=rating_queue.STATS_COUNTERS)
+request_metrics.add_collector('lobster_user_cache', user_resolver.stats, counters=user_resolver.STATS_COUNTERS)
+request_metrics.add_collector('lobster_response_cache', response_cache.stats, counters=response_cache.STATS_COUNTERS)
+
+# Slow query capture (see slow_queries.py), off unless LOBSTER_SLOW_QUERY_MS is set
+app.config['SLOW_QUERY_THRESHOLD_MS'] = float(os.environ.get('LOBSTER_SLOW_QUERY_MS', '0'))
+app.config['SLOW_QUERY_EXPLAIN'] = os.environ.get('LOBSTER_SLOW_QUERY_EXPLAIN', '1') == '1'
+app.config['SLOW_QUERY_EXPLAIN_INTERVAL'] = float(os.environ.get('LOBSTER_SLOW_QUERY_EXPLAIN_INTERVAL', '300'))
+# The admin endpoints require a matching X-Admin-Token header, and refuse every request while unset
+app.config['ADMIN_TOKEN'] = os.environ.get('LOBSTER_ADMIN_TOKEN') or None
+slow_query_log = None
+if app.config['SLOW_QUERY_THRESHOLD_MS'] > 0:
+    slow_query_log = SlowQueryLog(
+        mysql.pool,
+        threshold=app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000,
+        explain=app.config['SLOW_QUERY_EXPLAIN'],
+        explain_interval=app.config['SLOW_QUERY_EXPLAIN_INTERVAL'],
+    )
+    query_observers.append(slow_query_log.observe)
+
+def admin_denied():
+    token = app.config['ADMIN_TOKEN']
+    return token is None or request.headers.get('X-Admin-Token') != token
+
+# Slow queries aggregated by fingerprint with their EXPLAIN plans
+# ?sort=total|count|max|recent&limit=N, DELETE resets the log
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+def get_slow_queries():
+    if admin_denied():
+        return jsonify({"error": "Admin token required"}), 403
+    if slow_query_log is None:
+        return jsonify({"enabled": False, "queries": []})
+    if request.method == 'DELETE':
+        slow_query_log.clear()
+        return jsonify({"enabled": True, "cleared": True})
+    sort = request.args.get('sort', 'total')
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if sort not in ('total', 'count', 'max', 'recent') or limit < 1:
+        return jsonify({"error": "Expected sort=total|count|max|recent and a positive limit"}), 400
+    return jsonify({"enabled": True, **slow_query_log.report(limit=limit, sort=sort)})
+
+# Everything above in the Prometheus text format
+@app.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+    return Response(request_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Connection pool metrics (checkouts, wait time, pool occupancy)
+@app.route('/api/metrics/pool', methods=['GET'])
+def get_pool_metrics():
+    return jsonify(mysql.pool.stats())
+
+# Rating queue metrics (queue depth, flush latency)
+@app.route('/api/metrics/ratings', methods=['GET'])
+def get_rating_queue_metrics():
+    return jsonify(rating_queue.stats())
+
+# Author/poster resolution cache metrics
+@app.route('/api/metrics/users', methods=['GET'])
+def get_user_resolver_metrics():
+    return jsonify(user_resolver.stats())
+
+# Response cache metrics (hit ratio, entries, invalidations)
+@app.route('/api/metrics/cache', methods=['GET'])
+def get_cache_metrics():
+    return jsonify(response_cache.stats())
+
+
+
+
+#Get professor courses from ProfessorDashboard
+@app.route('/api/professor/<int:prof_id>/courses', methods=['GET'])
+def get_professor_courses(prof_id):
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
+        
+        search_term = request.args.get('search')
+        
+        query = """
+        SELECT CourseID, Subject, CatalogNumber, Name, Section, Year, ProfessorID
+        FROM course
+        WHERE ProfessorID = %s
+        """
+        params = [prof_id]
+
+        if search_term:
+            query += " AND (Name LIKE %s OR Subject LIKE %s)"
+            search_param = '%' + search_term + '%'
+            params.extend([search_param, search_param])
+
+        cursor.execute(query, tuple(params))
+        courses = cursor.fetchall()
+        return jsonify(courses)
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": "Failed to fetch courses"}), 500
+    finally:
+        if cursor: cursor.close()
+
+#Get single course detail 
+@app.route('/api/course/<int:course_id>', methods=['GET'])
+@response_cache.cached(tags=lambda course_id: [f'course:{course_id}'])
+def get_course_details(course_id):
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Fetch course info and the prof name
+        query = """
+        SELECT c.*, u.Name as ProfessorName 
+        FROM course c
+        LEFT JOIN user u ON c.ProfessorID = u.UserID
+        WHERE c.CourseID = %s
+        """
+        cursor.execute(query, (course_id,))
+        course = cursor.fetchone() # Fetch just one result
+        
+        if not course:
+            return jsonify({"error": "Course not found"}), 404
+            
+        return jsonify(course)
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": "Failed to fetch details"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+#Get Course Roster
+@app.route('/api/course/<int:course_id>/roster', methods=['GET'])
+@response_cache.cached(tags=lambda course_id: [f'course:{course_id}', 'users'])
+def get_course_roster(course_id):
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Query students enrolled in the course
+        query = """
+        SELECT 
+            u.UserID,
+            u.Name,     
+            u.Courses 
+        FROM student s
+        JOIN user u ON s.UserID = u.UserID
+        JOIN enrolled e ON s.UserID = e.StudentID
+        WHERE e.CourseID = %s;
+        """
+        
+        cursor.execute(query, (course_id,))
+        students = cursor.fetchall()
+        
+        #Return list of students as JSON
+        return jsonify(students)
+        
+    except Exception as e:
+        print(f"Database Query Error in get_course_roster: {e}")
+        return jsonify({"error": "Failed to fetch student roster from database"}), 500
+
+    finally:
+        if cursor:
+            cursor.close()
+
+#create a new course
+@app.route('/api/courses', methods=['POST'])
+def add_course():
+    cursor = None
+    try:
+        #Get data from frontend
+        data = request.get_json()
+        
+        #validate frontend required fields
+        subject = data.get('Subject')
+        catalog_number = data.get('CatalogNumber')
+        name = data.get('Name')
+        section = data.get('Section')
+        year = data.get('Year')
+        session = data.get('Session')
+        professor_id = data.get('ProfessorID')
+
+        conn = mysql.connection
+        # Use DictCursor to easily access ProfessorID later, though not strictly required for INSERT
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
+        
+        #Insert query
+        query = """
+        INSERT INTO course (Subject, CatalogNumber, Name, Section, Year, Session, ProfessorID)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        
+        #Execute query
+        cursor.execute(query, (subject, catalog_number, name, section, year, session, professor_id))
+        
+        #Save insert to DB
+        conn.commit()
+        response_cache.invalidate('courses')
+
+        return jsonify({"message": "Course created successfully", "course_id": cursor.lastrowid}), 201
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        print(f"Error adding course: {e}")
+        return jsonify({"error": "Failed to add course"}), 500
+    finally:
+        if cursor: cursor.close()
+
+#Update course
+@app.route('/api/courses/<int:course_id>', methods=['PUT'])
+def update_course(course_id):
+    cursor = None
+    try:
+        data = request.get_json()
+        
+        # Attributes that can be updated
+        name = data.get('Name')
+        section = data.get('Section')
+        session = data.get('Session')
+        year = data.get('Year')
+
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
+        
+        #Update query
+        query = """
+        UPDATE course
+        SET Name = %s, Section = %s, Session = %s, Year = %s
+        WHERE CourseID = %s
+        """
+        
+        # Execute query
+        cursor.execute(query, (name, section, session, year, course_id))
+        #save to DB
+        conn.commit()
+        response_cache.invalidate('courses', f'course:{course_id}')
+
+        if cursor.rowcount == 0:
+             return jsonify({"error": "Course not found or no changes made"}), 404
+             
+        return jsonify({"message": "Course updated successfully"}), 200
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        print(f"Error updating course: {e}")
+        return jsonify({"error": "Failed to update course"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+#Delete Course (ENSURE PROFESSOR ONLY -> Will delete all records attached to course)
+@app.route('/api/courses/<int:course_id>', methods=['DELETE'])
+def delete_course(course_id):
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor) 
+        
+        # Delete query
+        query = """
+        DELETE FROM course
+        WHERE CourseID = %s
+        """
+        
+        #Execute query
+        cursor.execute(query, (course_id,))
+        
+        #update DB
+        conn.commit()
+        response_cache.invalidate('courses', f'course:{course_id}')
+
+        if cursor.rowcount == 0:
+             return jsonify({"error": "Course not found"}), 404
+             
+        return jsonify({"message": f"Course {course_id} deleted successfully"}), 200
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        print(f"Error deleting course: {e}")
+        return jsonify({"error": "Failed to delete course"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# ==================== USER ENDPOINTS ====================
+
+# List users (basic info), ?stream=json|ndjson streams the rows
+@app.route('/api/users', methods=['GET'])
+def list_users():
+    cursor = None
+    try:
+        query = "SELECT UserID, Name, Courses, IsProfessor FROM user ORDER BY UserID"
+        stream_format = requested_stream_format()
+        if stream_format:
+            return stream_query(query, [], stream_format)
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        cursor.execute(query)
+        users = cursor.fetchall()
+        return jsonify(users)
+    except Exception as e:
+        print(f"Error fetching users: {e}")
+        return jsonify({"error": "Failed to fetch users"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Create a new user (student or professor)
+@app.route('/api/users', methods=['POST'])
+def create_user():
+    cursor = None
+    try:
+        data = request.get_json()
+
+        name = data.get('Name')
+        password = data.get('Password')
+        courses = data.get('Courses')
+        is_professor = data.get('IsProfessor', False)
+
+        # Normalize boolean (handle string inputs)
+        if isinstance(is_professor, str):
+            is_professor = is_professor.strip().lower() in ['true', '1', 'yes', 'y']
+
+        if not name:
+            return jsonify({"error": "Missing required field: Name"}), 400
+        
+        if not password:
+            return jsonify({"error": "Missing required field: Password"}), 400
+
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+
+        # If user already exists, return their id
+        cursor.execute("SELECT UserID FROM user WHERE Name = %s", (name,))
+        existing = cursor.fetchone()
+        if existing:
+            return jsonify({"message": "User already exists", "user_id": existing['UserID']}), 200
+
+        # Insert user
+        cursor.execute(
+            "INSERT INTO user (Name, Password, Courses, IsProfessor) VALUES (%s, %s, %s, %s)",
+            (name, password, courses, is_professor)
+        )
+        conn.commit()
+
+        user_id = cursor.lastrowid
+
+        # Insert into role table
+        if is_professor:
+            cursor.execute("INSERT INTO professor (UserID, Badge) VALUES (%s, NULL)", (user_id,))
+        else:
+            cursor.execute("INSERT INTO student (UserID) VALUES (%s)", (user_id,))
+
+        conn.commit()
+        response_cache.invalidate('users')
+
+        return jsonify({
+            "message": "User created successfully",
+            "user_id": user_id,
+            "Name": name,
+            "IsProfessor": bool(is_professor)
+        }), 201
+
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        print(f"Error creating user: {e}")
+        return jsonify({"error": "Failed to create user"}), 500
+    finally:
+        if cursor: cursor.close()
+
+# Login procedure
+@app.route('/api/login/',methods=['POST','GET'])
+def login():
+    conn = mysql.connection
+    cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+    data = request.get_json()
+    name = data.get('Name')
+    password = data.get('Password')
+    if not name:
+        return jsonify({"error": "Missing required field: Name"}), 400
+    if not password:
+        return jsonify({"error": "Missing required field: Password"}), 400
+
+
+
+    cursor.execute('SELECT UserID, Name, Courses, IsProfessor from user where Name = %s and Password = %s',(name,password))
+    result = cursor.fetchone()
+    conn.commit()
+    return (jsonify(result))
+
+
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Parse ?limit= into a bounded page size
+def parse_page_limit(raw_limit):
+    if raw_limit is None or raw_limit == '':
+        return DEFAULT_PAGE_SIZE
+    limit = int(raw_limit)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+# Rows fetched per round trip when streaming
+STREAM_BATCH_SIZE = 500
+
+# ?stream=ndjson (or Accept: application/x-ndjson) streams one JSON object per line,
+# ?stream=json streams a JSON array. Returns None for a normal buffered response
+def requested_stream_format(req=request):
+    fmt = req.args.get('stream')
+    if fmt in ('ndjson', 'json'):
+        return fmt
+    if req.accept_mimetypes.best == 'application/x-ndjson':
+        return 'ndjson'
+    return None
+
+# The format can come from Accept, so it is part of the cache key and ETag
+response_cache.variant = requested_stream_format
+
+# Stream query rows from an unbuffered server-side cursor so memory stays O(batch)
+# instead of O(rows). prefix/suffix wrap the JSON array, e.g. to build an envelope
+def stream_query(query, params, fmt, transform=None, prefix='', suffix=''):
+    stream_cursor = mysql.connection.cursor(MySQLdb.cursors.SSDictCursor)
+    # Execute before the first byte goes out so SQL errors still become a 500
+    stream_cursor.execute(query, tuple(params))
+    
+    def generate():
+        try:
+            if fmt == 'json':
+                yield prefix + '['
+            first = True
+            while True:
+                rows = stream_cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                chunk = []
+                for row in rows:
+                    text = app.json.dumps(transform(row) if transform else row)
+                    if fmt == 'ndjson':
+                        chunk.append(text + '\n')
+                    else:
+                        chunk.append(text if first else ',' + text)
+                        first = False
+                yield ''.join(chunk)
+            if fmt == 'json':
+                yield ']' + suffix
+        finally:
+            stream_cursor.close()
+    
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def parse_cursor_date(value):
+    return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+
+# Columns a resource list can be keyset paginated on: name -> (sort expression, cursor parser)
+# Unrated resources sort as -1 so Rating is never NULL in a cursor
+SORT_COLUMNS = {
+    'Relevance': ('s.Relevance', float),
+    'Date': ('r.Date', parse_cursor_date),
+    'DateFor': ('r.DateFor', parse_cursor_date),
+    'Rating': ('COALESCE(r.Rating, -1)', float),
+    'ResourceID': ('r.ResourceID', int),
+}
+
+# ?sort= options and the full key each one pages on, ResourceID breaking ties
+RESOURCE_SORTS = {
+    'relevance': ('Relevance', 'Date', 'ResourceID'),
+    'date': ('Date', 'ResourceID'),
+    'datefor': ('DateFor', 'ResourceID'),
+    'rating': ('Rating', 'ResourceID'),
+}
+
+# Cursor is the sort key of the last row on the previous page, e.g.
+# "<Date>,<ResourceID>", or "<Relevance>,<Date>,<ResourceID>" for ranked search results
+def encode_resource_cursor(row, sort_key):
+    values = []
+    for column in sort_key:
+        value = row[column]
+        if column == 'Rating' and value is None:
+            value = -1
+        if isinstance(value, (date, datetime)):
+            value = value.strftime('%Y-%m-%d')
+        values.append(str(value))
+    return ','.join(values)
+
+def decode_resource_cursor(cursor_value, sort_key):
+    parts = cursor_value.split(',')
+    if len(parts) != len(sort_key):
+        raise ValueError("wrong number of cursor fields")
+    return tuple(SORT_COLUMNS[column][1](part) for column, part in zip(sort_key, parts))
+
+# Seek predicate for rows after the cursor: (k1 < v1) OR (k1 = v1 AND ((k2 < v2) OR ...))
+def build_seek_predicate(sort_key, values, descending=True):
+    op = '<' if descending else '>'
+    expr, params = None, []
+    for column, value in reversed(list(zip(sort_key, values))):
+        column_sql = SORT_COLUMNS[column][0]
+        if expr is None:
+            expr = f"{column_sql} {op} %s"
+            params = [value]
+        else:
+            expr = f"({column_sql} {op} %s OR ({column_sql} = %s AND {expr}))"
+            params = [value, value] + params
+    return expr, params
+
+
+# InnoDB FULLTEXT ignores words shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_TOKEN = 3
+# Link fragments ("youtube.com", "https://...", "lecture1.pdf") are not word tokens
+URL_SEARCH_RE = re.compile(r'://|^www\.|/|\.(com|org|edu|net|io|pdf|png|jpe?g|gif)\b', re.IGNORECASE)
+# Boolean mode syntax typed by the user: "phrase", +must, -exclude, ~lower, prefix*
+BOOLEAN_SYNTAX_RE = re.compile(r'"|(^|\s)[+\-~<>(]|\*(\s|$)')
+
+# Turn a search box string into a MATCH ... AGAINST boolean mode query.
+# Plain words are all required and prefix matched; boolean syntax is passed through.
+# Returns None when FULLTEXT cannot serve the search (URL fragments, only short words)
+def build_fulltext_query(search_term):
+    if URL_SEARCH_RE.search(search_term):
+        return None
+    if BOOLEAN_SYNTAX_RE.search(search_term):
+        return search_term
+    words = [w for w in re.findall(r'\w+', search_term) if len(w) >= FULLTEXT_MIN_TOKEN]
+    if not words:
+        return None
+    return ' '.join('+' + w + '*' for w in words)
+
+# Ranked matches from the FULLTEXT indexes on resource, note and pdf, one row per ResourceID
+FULLTEXT_MATCH_SQL = """
+        JOIN (
+            SELECT hits.ResourceID, ROUND(SUM(hits.Score), 6) as Relevance
+            FROM (
+                SELECT ResourceID, MATCH(Topic, Keywords, Author) AGAINST (%s IN BOOLEAN MODE) as Score
+                FROM resource
+                WHERE MATCH(Topic, Keywords, Author) AGAINST (%s IN BOOLEAN MODE)
+                UNION ALL
+                SELECT ResourceID, MATCH(Body) AGAINST (%s IN BOOLEAN MODE) as Score
+                FROM note
+                WHERE MATCH(Body) AGAINST (%s IN BOOLEAN MODE)
+                UNION ALL
+                SELECT ResourceID, MATCH(Body) AGAINST (%s IN BOOLEAN MODE) as Score
+                FROM pdf
+                WHERE MATCH(Body) AGAINST (%s IN BOOLEAN MODE)
+            ) as hits
+            GROUP BY hits.ResourceID
+        ) s ON r.ResourceID = s.ResourceID
+"""
+
+
+# Lowercase Format of a list row (imports store lowercase formats, the API uses Note, Video, ...)
+def normalize_resource_format(resource):
+    if 'Format' in resource:
+        resource['Format'] = (resource.get('Format') or '').lower()  # normalize returned value
+    return resource
+
+# List queries read resource_summary (aliased r), which already carries the subtype link
+# as Url and a body snippet. Only the full Body still needs a join
+RESOURCE_LIST_FROM = "FROM resource_summary r"
+
+# Fields a resource list row can carry: name -> (select expression, tables it needs joined)
+RESOURCE_FIELDS = {
+    'ResourceID': ('r.ResourceID', ()),
+    'Date': ('r.Date', ()),
+    'DateFor': ('r.DateFor', ()),
+    'Author': ('r.Author', ()),
+    'Title': ('r.Topic as Title', ()),
+    'Topic': ('r.Topic', ()),
+    'Keywords': ('r.Keywords', ()),
+    'Rating': ('r.Rating', ()),
+    'Format': ('r.Format', ()),
+    'isVerified': ('r.isVerified', ()),
+    'RatingCount': ('r.RatingCount', ()),
+    'Url': ('r.Url', ()),
+    'Duration': ('r.Duration', ()),
+    'ImageSize': ('r.ImageSize', ()),
+    'Snippet': ('r.Snippet', ()),
+    'Body': ('n.Body', ('note',)),
+}
+
+# Default list projection: what the list views render, no joins
+COMPACT_RESOURCE_FIELDS = ('ResourceID', 'Date', 'DateFor', 'Author', 'Title', 'Topic',
+                           'Keywords', 'Rating', 'Format', 'isVerified')
+
+RESOURCE_JOINS = {
+    'note': "LEFT JOIN note n ON r.ResourceID = n.ResourceID",
+}
+
+# Parse ?fields=Title,Url,... ("all" for every field, missing for the compact projection)
+def parse_resource_fields(raw_fields):
+    if not raw_fields:
+        return list(COMPACT_RESOURCE_FIELDS)
+    if raw_fields in ('all', '*'):
+        return list(RESOURCE_FIELDS)
+    fields = [f.strip() for f in raw_fields.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in RESOURCE_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields {unknown}, allowed: {', '.join(RESOURCE_FIELDS)}")
+    return fields
+
+# SELECT list and LEFT JOINs for the requested fields plus any tables the filters need
+def build_resource_select(fields, joins=()):
+    columns = [RESOURCE_FIELDS[f][0] for f in fields]
+    needed = set(joins)
+    for f in fields:
+        needed.update(RESOURCE_FIELDS[f][1])
+    join_sql = '\n'.join(RESOURCE_JOINS[table] for table in RESOURCE_JOINS if table in needed)
+    return "SELECT " + ', '.join(columns), join_sql
+
+# Fields a query needs for itself (ids, cursors) are selected but dropped before returning
+def with_internal_fields(fields, internal):
+    selected = list(fields) + [f for f in internal if f not in fields]
+    hidden = set(selected) - set(fields)
+    
+    def shape(row):
+        normalize_resource_format(row)
+        for f in hidden:
+            row.pop(f, None)
+        return row
+    return selected, shape
+
+# Load list rows for the given ResourceIDs in one query, keeping the order of resource_ids
+def hydrate_resources(cursor, resource_ids, fields=None):
+    if not resource_ids:
+        return []
+    selected, shape = with_internal_fields(fields or list(RESOURCE_FIELDS), ['ResourceID'])
+    select_sql, join_sql = build_resource_select(selected)
+    placeholders = ', '.join(['%s'] * len(resource_ids))
+    cursor.execute(f"{select_sql} {RESOURCE_LIST_FROM} {join_sql} WHERE r.ResourceID IN ({placeholders})",
+                   tuple(resource_ids))
+    by_id = {row['ResourceID']: row for row in cursor.fetchall()}
+    return [shape(by_id[rid]) for rid in resource_ids if rid in by_id]
+
+# Build the in-memory search index on first use when it is enabled, and rebuild it when the
+# resources version in the database has moved on since (see SEARCH_INDEX_CHECK_INTERVAL)
+def get_resource_index():
+    if not app.config['SEARCH_INDEX_ENABLED']:
+        return None
+    if not resource_index.built:
+        with search_index_build_lock:
+            if not resource_index.built:
+                build_resource_index()
+    elif search_index_check_due() and search_index_build_lock.acquire(blocking=False):
+        # One thread checks and rebuilds; the others keep searching the current index meanwhile
+        try:
+            search_index_state['checked'] = monotonic()
+            version = resources_version()
+            if version is not None and version != search_index_state['version']:
+                build_resource_index(version)
+        finally:
+            search_index_build_lock.release()
+    return resource_index
+
+search_index_build_lock = Lock()
+search_index_state = {"version": None, "checked": 0.0}
+
+def search_index_check_due():
+    interval = app.config['SEARCH_INDEX_CHECK_INTERVAL']
+    return interval > 0 and monotonic() - search_index_state['checked'] >= interval
+
+# (Version, Modified) of the resources tag, or None when cache_version cannot be read
+def resources_version():
+    try:
+        return load_cache_versions(['resources']).get('resources')
+    except Exception as e:
+        print(f"Search index version check failed: {e}")
+        return None
+
+# The version is read before the rows, so a write landing during the build triggers the next one
+def build_resource_index(version=None):
+    if version is None:
+        version = resources_version()
+    resource_index.build(mysql.connection)
+    search_index_state.update(version=version, checked=monotonic())
+
+
+# WHERE clauses shared by the resource list and its facet counts.
+# Returns (from_sql, join_tables, where_sql, params, ranked); raises ValueError on bad filters
+def build_resource_filters(args):
+    search_term = args.get('search')
+    topic = args.get('topic')
+    format_type = args.get('format')
+    subject = args.get('subject')
+    
+    fulltext_query = build_fulltext_query(search_term) if search_term else None
+    ranked = fulltext_query is not None
+    
+    from_sql = RESOURCE_LIST_FROM
+    params = []
+    # Ranked search joins the FULLTEXT matches on the base tables
+    if ranked:
+        from_sql += FULLTEXT_MATCH_SQL
+        params.extend([fulltext_query] * 6)
+    
+    where = ["1=1"]
+    join_tables = ()
+    # URL fragments search the link column
+    url_search = bool(search_term) and not ranked and URL_SEARCH_RE.search(search_term)
+    if url_search:
+        where.append("r.Url LIKE %s")
+        params.append('%' + search_term + '%')
+    # Words too short for the FULLTEXT index only search the resource row
+    elif search_term and not ranked:
+        where.append("(r.Topic LIKE %s OR r.Keywords LIKE %s OR r.Author LIKE %s)")
+        params.extend(['%' + search_term + '%'] * 3)
+    
+    # Add topic filter
+    if topic:
+        where.append("r.Topic LIKE %s")
+        params.append('%' + topic + '%')
+    
+    # Add format filter (case-insensitive)
+    if format_type:
+        where.append("LOWER(r.Format) = LOWER(%s)")
+        params.append(format_type)
+    
+    # Add subject filter (search in topic/keywords)
+    if subject:
+        where.append("(r.Topic LIKE %s OR r.Keywords LIKE %s)")
+        subject_param = '%' + subject + '%'
+        params.extend([subject_param, subject_param])
+    
+    # ?subject_code=CS matches the resource_subject tags, the same ones the facets count
+    subject_code = args.get('subject_code')
+    if subject_code:
+        where.append("EXISTS (SELECT 1 FROM resource_subject rs WHERE rs.ResourceID = r.ResourceID AND rs.SubjectCode = %s)")
+        params.append(subject_code)
+    
+    # Range filters: ?min_rating=4&date_from=2024-01-01&date_to=...&datefor_from=...&datefor_to=...
+    min_rating = args.get('min_rating')
+    if min_rating:
+        where.append("r.Rating >= %s")
+        params.append(float(min_rating))
+    for arg, column, op in (('date_from', 'r.Date', '>='), ('date_to', 'r.Date', '<='),
+                            ('datefor_from', 'r.DateFor', '>='), ('datefor_to', 'r.DateFor', '<=')):
+        if args.get(arg):
+            where.append(f"{column} {op} %s")
+            params.append(parse_cursor_date(args[arg]))
+    
+    # ?verified=1 only verified resources, ?verified=0 only unverified ones
+    verified = args.get('verified')
+    if verified in ('1', 'true'):
+        where.append("r.isVerified = TRUE")
+    elif verified in ('0', 'false'):
+        where.append("(r.isVerified IS NULL OR r.isVerified = FALSE)")
+    elif verified:
+        raise ValueError("verified must be 1 or 0")
+    
+    return from_sql, join_tables, " AND ".join(where), params, ranked
+
+
+# Turn /api/resources query args into the list query (without its LIMIT).
+# Returns (plan, None), or (None, error message) for a 400. Shared with the ASGI mode (asgi.py)
+def plan_resource_list(args):
+    try:
+        from_sql, filter_joins, where_sql, params, ranked = build_resource_filters(args)
+    except ValueError as e:
+        return None, f"Invalid filter: {e}"
+    
+    # Ranked searches default to relevance order, everything else to newest first
+    sort = args.get('sort', 'relevance' if ranked else 'date').lower()
+    order = args.get('order', 'desc').lower()
+    if sort not in RESOURCE_SORTS or (sort == 'relevance' and not ranked) or order not in ('asc', 'desc'):
+        return None, f"Invalid sort, expected sort={'|'.join(RESOURCE_SORTS)} (relevance needs a search) and order=asc|desc"
+    sort_key = RESOURCE_SORTS[sort]
+    descending = order == 'desc'
+    
+    # Get pagination parameters
+    paged = is_paged_request(args)
+    after = args.get('after')
+    try:
+        limit = parse_page_limit(args.get('limit'))
+        after_key = decode_resource_cursor(after, sort_key) if after else None
+    except ValueError:
+        return None, "Invalid pagination parameters, expected after=<cursor from next_cursor>&limit=N"
+    
+    try:
+        fields = parse_resource_fields(args.get('fields'))
+    except ValueError as e:
+        return None, str(e)
+    
+    # The cursor needs the sort key columns even when they weren't requested
+    selected, shape = with_internal_fields(fields, [c for c in sort_key if c != 'Relevance'])
+    select_sql, join_sql = build_resource_select(selected, filter_joins)
+    if ranked:
+        select_sql += ", s.Relevance"
+    
+    query = f"{select_sql}\n{from_sql}\n{join_sql}\nWHERE {where_sql}"
+    
+    # Seek past the last row of the previous page (date order uses IX_ResourceSummary_Date_ResourceID)
+    if after_key:
+        seek_sql, seek_params = build_seek_predicate(sort_key, after_key, descending)
+        query += " AND " + seek_sql
+        params.extend(seek_params)
+    
+    direction = 'DESC' if descending else 'ASC'
+    query += " ORDER BY " + ', '.join(f"{SORT_COLUMNS[c][0]} {direction}" for c in sort_key)
+    
+    return {
+        "query": query,
+        "params": params,
+        "sort_key": sort_key,
+        # Every list is one page. Clients asking for pages get an envelope, older clients
+        # get the page as a plain list and the rest through X-Next-Cursor
+        "limit": limit,
+        "shape": shape,
+        "paged": paged,
+    }, None
+
+# Requests with ?limit= or ?after= get the {resources, next_cursor} envelope, the others a plain list
+def is_paged_request(args):
+    return 'limit' in args or 'after' in args
+
+# LIMIT for a page fetch, one extra row to know whether another page exists
+def page_query(query, params, limit):
+    return query + " LIMIT %s", tuple(params) + (limit + 1,)
+
+# Rows fetched by page_query -> (page rows, next_cursor or None)
+def finish_resource_page(rows, limit, sort_key, shape=None):
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_resource_cursor(rows[-1], sort_key)
+    if shape:
+        for row in rows:
+            shape(row)
+    return rows, next_cursor
+
+
+# Get all resources/notes with optional search and filtering
+# Results are keyset paginated on (Date DESC, ResourceID DESC) using ?after=<Date,ResourceID>&limit=N;
+# without ?limit= or ?after= the first DEFAULT_PAGE_SIZE rows come back as a plain list, with
+# X-Next-Cursor when there are more. Only ?stream= hands out the whole list
+# ?search= uses the FULLTEXT indexes and ranks by relevance; URL fragments fall back to LIKE on links
+# ?sort=date|datefor|rating|relevance&order=desc|asc picks the key the pages follow
+# ?min_rating=, ?date_from=/date_to=, ?datefor_from=/datefor_to= and ?verified=1|0 narrow the list
+# ?stream=json|ndjson streams every matching row (or only ?limit= rows) instead of one page
+# Rows come from the resource_summary read model, so listing is a single-table scan
+# ?fields=Title,Url,Snippet,... picks the columns; only Body joins another table
+# ?ids=1,2,3 returns the full records of those resources instead (see get_resources_by_ids)
+@app.route('/api/resources', methods=['GET'])
+@response_cache.cached(tags=lambda: ['resources'])
+def get_resources():
+    if 'ids' in request.args:
+        return get_resources_by_ids(request.args['ids'])
+    
+    cursor = None
+    try:
+        plan, error = plan_resource_list(request.args)
+        if error:
+            return jsonify({"error": error}), 400
+        query, params, limit = plan['query'], plan['params'], plan['limit']
+        
+        # stream_query reads on its own cursor
+        stream_format = requested_stream_format()
+        if stream_format:
+            if 'limit' in request.args:
+                query += " LIMIT %s"
+                params.append(limit)
+            return stream_query(query, params, stream_format, transform=plan['shape'])
+        
+        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        cursor.execute(*page_query(query, params, limit))
+        # Normalize formats (handle lowercase formats from import) and drop cursor-only fields
+        resources, next_cursor = finish_resource_page(cursor.fetchall(), limit, plan['sort_key'], plan['shape'])
+        
+        if plan['paged']:
+            response = jsonify({"resources": resources, "next_cursor": next_cursor})
+        else:
+            response = jsonify(resources)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except Exception as e:
+        print(f"Error fetching resources: {e}")
+        return jsonify({"error": "Failed to fetch resources"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Filter chip counts for the resource browser, taking the same filters as /api/resources.
+# One grouped query: GROUP BY Format, subject WITH ROLLUP gives per-format totals on the
+# rollup rows and per-subject counts summed over the detail rows (a resource has one Format).
+# Subject counts follow the resource_subject tags, so they match ?subject_code=
+@app.route('/api/resources/facets', methods=['GET'])
+@response_cache.cached(tags=lambda: ['resources'])
+def get_resource_facets():
+    cursor = None
+    try:
+        try:
+            from_sql, filter_joins, where_sql, params, _ = build_resource_filters(request.args)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid filter: {e}"}), 400
+        
+        _, join_sql = build_resource_select([], filter_joins)
+        query = f"""
+        SELECT 
+            LOWER(r.Format) as Format,
+            sub.SubjectCode as Subject,
+            GROUPING(LOWER(r.Format)) as AllFormats,
+            GROUPING(sub.SubjectCode) as AllSubjects,
+            COUNT(DISTINCT r.ResourceID) as Count
+        {from_sql}
+        {join_sql}
+        LEFT JOIN resource_subject sub ON sub.ResourceID = r.ResourceID
+        WHERE {where_sql}
+        GROUP BY LOWER(r.Format), sub.SubjectCode WITH ROLLUP
+        """
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        cursor.execute(query, tuple(params))
+        
+        total = 0
+        formats = {}
+        subjects = {}
+        for row in cursor.fetchall():
+            if row['AllFormats']:
+                total = row['Count']
+            elif row['AllSubjects']:
+                formats[row['Format']] = row['Count']
+            elif row['Subject'] is not None:
+                subjects[row['Subject']] = subjects.get(row['Subject'], 0) + row['Count']
+        
+        return jsonify({
+            "total": total,
+            "formats": formats,
+            "subjects": dict(sorted(subjects.items(), key=lambda item: (-item[1], item[0]))),
+        })
+    except Exception as e:
+        print(f"Error fetching resource facets: {e}")
+        return jsonify({"error": "Failed to fetch resource facets"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Search-as-you-type from the in-memory index: ?q=&format=&subject=&min_rating=&limit=
+# The index returns ranked ResourceIDs, which are hydrated in one query
+@app.route('/api/resources/search', methods=['GET'])
+def search_resources():
+    cursor = None
+    try:
+        index = get_resource_index()
+        if index is None:
+            return jsonify({"error": "Search index is disabled, use /api/resources?search="}), 404
+        
+        query_text = request.args.get('q', '')
+        try:
+            limit = parse_page_limit(request.args.get('limit'))
+            min_rating = request.args.get('min_rating', type=float)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+        try:
+            fields = parse_resource_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        hits = index.search(
+            query_text,
+            limit=limit,
+            prefix=request.args.get('prefix', '1') != '0',
+            format_type=request.args.get('format'),
+            subject=request.args.get('subject'),
+            min_rating=min_rating,
+        )
+        if not hits:
+            return jsonify([])
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        # Ranked results always carry their ResourceID next to the Relevance
+        if 'ResourceID' not in fields:
+            fields.insert(0, 'ResourceID')
+        resources = hydrate_resources(cursor, [rid for rid, _ in hits], fields)
+        scores = dict(hits)
+        for resource in resources:
+            resource['Relevance'] = round(scores[resource['ResourceID']], 6)
+        return jsonify(resources)
+    except Exception as e:
+        print(f"Error searching resources: {e}")
+        return jsonify({"error": "Failed to search resources"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Full resource record with every subtype column and the rating totals
+RESOURCE_DETAIL_SQL = """
+        SELECT 
+            r.ResourceID,
+            r.Date,
+            r.DateFor,
+            r.Author,
+            r.Topic as Title,
+            r.Topic,
+            r.Keywords,
+            r.Rating,
+            r.Format,
+            r.isVerified,
+            n.Body,
+            w.Link as WebsiteUrl,
+            v.Duration,
+            v.Link as VideoUrl,
+            p.Link as PdfUrl,
+            p.Body as PdfBody,
+            i.Link as ImageUrl,
+            i.Size as ImageSize,
+            r.RatingCount,
+            CASE WHEN r.RatingCount > 0 THEN r.RatingSum / r.RatingCount END as Average_Rating
+        FROM resource r
+        LEFT JOIN note n ON r.ResourceID = n.ResourceID
+        LEFT JOIN website w ON r.ResourceID = w.ResourceID
+        LEFT JOIN video v ON r.ResourceID = v.ResourceID
+        LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
+        LEFT JOIN image i ON r.ResourceID = i.ResourceID
+"""
+
+# Consolidate URL field of a detail row
+def consolidate_resource_details(result):
+    if result.get('Format') == 'Website':
+        result['Url'] = result.get('WebsiteUrl') or result.get('Web_Address')
+    elif result.get('Format') == 'Video':
+        result['Url'] = result.get('VideoUrl')
+    elif result.get('Format') == 'Pdf':
+        result['Url'] = result.get('PdfUrl')
+    elif result.get('Format') == 'Image':
+        result['Url'] = result.get('ImageUrl')
+    elif result.get('Format') == 'Note':
+        result['Body'] = result.get('Body') or result.get('Note_Body')
+    return result
+
+# Most ResourceIDs one ?ids= lookup may ask for
+MAX_BATCH_IDS = 100
+
+# "3,1,3" -> [3, 1], raises ValueError with the message for a 400
+def parse_resource_ids(raw_ids):
+    try:
+        resource_ids = list(dict.fromkeys(int(part) for part in raw_ids.split(',') if part.strip()))
+    except ValueError:
+        raise ValueError("ids must be a comma separated list of ResourceIDs")
+    if not resource_ids or len(resource_ids) > MAX_BATCH_IDS:
+        raise ValueError(f"ids must list between 1 and {MAX_BATCH_IDS} ResourceIDs")
+    return resource_ids
+
+def resource_ids_query(resource_ids):
+    placeholders = ', '.join(['%s'] * len(resource_ids))
+    return RESOURCE_DETAIL_SQL + f" WHERE r.ResourceID IN ({placeholders})", tuple(resource_ids)
+
+def order_resources_by_ids(resource_ids, rows):
+    by_id = {row['ResourceID']: consolidate_resource_details(row) for row in rows}
+    return {
+        "resources": [by_id[rid] for rid in resource_ids if rid in by_id],
+        "missing": [rid for rid in resource_ids if rid not in by_id],
+    }
+
+# ?ids=3,1,2 on /api/resources: detail records for several resources in one query, in request order.
+# Averages come from the running totals on resource, so no rating aggregate is needed
+def get_resources_by_ids(raw_ids):
+    cursor = None
+    try:
+        try:
+            resource_ids = parse_resource_ids(raw_ids)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        cursor.execute(*resource_ids_query(resource_ids))
+        return jsonify(order_resources_by_ids(resource_ids, cursor.fetchall()))
+    except Exception as e:
+        print(f"Error fetching resources by id: {e}")
+        return jsonify({"error": "Failed to fetch resources"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Get single resource/note by ID
+@app.route('/api/resources/<int:resource_id>', methods=['GET'])
+@response_cache.cached(tags=lambda resource_id: [f'resource:{resource_id}'])
+def get_resource_details(resource_id):
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        cursor.execute(RESOURCE_DETAIL_SQL + " WHERE r.ResourceID = %s", (resource_id,))
+        result = cursor.fetchone()
+        
+        if not result:
+            return jsonify({"error": "Resource not found"}), 404
+        
+        return jsonify(consolidate_resource_details(result))
+    except Exception as e:
+        print(f"Error fetching resource details: {e}")
+        return jsonify({"error": "Failed to fetch resource details"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Create a new resource/note
+@app.route('/api/resources', methods=['POST'])
+def create_resource():
+    conn = None
+    cursor = None
+    author = None
+    try:
+        from datetime import datetime
+        data = request.get_json()
+        
+        # Required fields
+        author = data.get('Author')
+        topic = data.get('Topic')
+        format_type = data.get('Format')
+        
+        # DateFor defaults to today if not provided
+        date_for = data.get('DateFor') or datetime.now().strftime('%Y-%m-%d')
+        
+        # Optional fields
+        keywords = data.get('Keywords')
+        body = data.get('Body')
+        link = data.get('Link') or data.get('Url')
+        duration = data.get('Duration')
+        size = data.get('Size')
+        
+        if not all([author, topic, format_type]):
+            return jsonify({"error": "Missing required fields: Author, Topic, Format"}), 400
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        insert_query = """
+        INSERT INTO resource (Date, DateFor, Author, Topic, Keywords, Format)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        # Make sure the author exists, creating them as a student if not (no commit, for atomicity)
+        user_resolver.write_as(cursor, author, lambda: cursor.execute(
+            insert_query, (today, date_for, author, topic, keywords, format_type)))
+        # conn.commit() #Commented out for Atomicity -GW
+        
+        resource_id = cursor.lastrowid
+        
+        # Now insert format-specific data
+        if format_type == 'Note' and body:
+            cursor.execute("INSERT INTO note (ResourceID, Body) VALUES (%s, %s)", (resource_id, body))
+        elif format_type == 'Website' and link:
+            cursor.execute("INSERT INTO website (ResourceID, Link) VALUES (%s, %s)", (resource_id, link))
+        elif format_type == 'Pdf' and (link or body):
+            cursor.execute("INSERT INTO pdf (ResourceID, Body, Link) VALUES (%s, %s, %s)", (resource_id, body, link))
+        elif format_type == 'Image' and link:
+            cursor.execute("INSERT INTO image (ResourceID, Size, Link) VALUES (%s, %s, %s)", (resource_id, size, link))
+        elif format_type == 'Video' and link:
+            cursor.execute("INSERT INTO video (ResourceID, Duration, Link) VALUES (%s, %s, %s)", (resource_id, duration, link))
+        
+        # Tag the subject of the course (or subject) it was posted for, then any subjects
+        # named in Topic/Keywords
+        if data.get('CourseID'):
+            cursor.execute(RESOURCE_COURSE_SUBJECT_SQL, (resource_id, today, data.get('CourseID')))
+        elif data.get('Subject'):
+            cursor.execute(RESOURCE_SUBJECT_SQL, (resource_id, today, data.get('Subject')))
+        cursor.callproc('SP_Resource_Subject_Refresh', [resource_id, resource_id])
+        
+        # Add the list view row in the same transaction
+        cursor.callproc('SP_Resource_Summary_Refresh', [resource_id, resource_id])
+        
+        conn.commit() #need only the commit at end, keeps user from being created if note creation fails -GW
+        response_cache.invalidate('resources', 'users')
+        
+        if resource_index.built:
+            resource_index.add({
+                'ResourceID': resource_id,
+                'Topic': topic,
+                'Keywords': keywords,
+                'Author': author,
+                'Format': format_type,
+                'Rating': None,
+                'Body': body if format_type in ('Note', 'Pdf') else None,
+            })
+        
+        return jsonify({
+            "message": "Resource created successfully",
+            "resource_id": resource_id
+        }), 201
+        
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        # A cached UserID may be why the insert failed (user deleted since)
+        if author:
+            user_resolver.forget(author)
+        print(f"Error creating resource: {e}")
+        return jsonify({"error": f"Failed to create resource: {str(e)}"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Explicit subject tags: (ResourceID, Date, CourseID) and (ResourceID, Date, SubjectCode).
+# Unknown courses or subjects insert nothing
+RESOURCE_COURSE_SUBJECT_SQL = """
+    INSERT IGNORE INTO resource_subject (ResourceID, SubjectCode, Date)
+    SELECT %s, Subject, %s FROM course WHERE CourseID = %s
+"""
+RESOURCE_SUBJECT_SQL = """
+    INSERT IGNORE INTO resource_subject (ResourceID, SubjectCode, Date)
+    SELECT %s, Code, %s FROM subject WHERE Code = %s
+"""
+
+# Most resources one bulk request may create
+BULK_MAX_ITEMS = 1000
+# Rows per multi-row INSERT statement
+BULK_CHUNK_SIZE = 200
+
+RESOURCE_FORMATS = {'note': 'Note', 'video': 'Video', 'website': 'Website', 'pdf': 'Pdf', 'image': 'Image'}
+HTTP_LINK_RE = re.compile(r'^https?://')
+PDF_LINK_RE = re.compile(r'\.pdf$')
+IMAGE_LINK_RE = re.compile(r'\.(jpg|jpeg|png|gif)$')
+BULK_TEXT_FIELDS = ('Author', 'Topic', 'Format', 'Keywords', 'DateFor', 'Body', 'Link', 'Url', 'Subject')
+
+# Check one bulk item against the table constraints so a bad item is reported instead of
+# failing the whole transaction. Returns (row, None) or (None, error)
+def validate_bulk_resource(item, today):
+    if not isinstance(item, dict):
+        return None, "Item must be an object"
+    not_text = [f for f in BULK_TEXT_FIELDS if item.get(f) is not None and not isinstance(item[f], str)]
+    if not_text:
+        return None, f"{', '.join(not_text)} must be text"
+    course_id = item.get('CourseID')
+    if course_id is not None and (not isinstance(course_id, int) or isinstance(course_id, bool)):
+        return None, "CourseID must be an integer"
+    author = item.get('Author')
+    topic = item.get('Topic')
+    format_type = RESOURCE_FORMATS.get(str(item.get('Format') or '').lower())
+    if not all([author, topic, item.get('Format')]):
+        return None, "Missing required fields: Author, Topic, Format"
+    if not format_type:
+        return None, f"Format must be one of {', '.join(RESOURCE_FORMATS.values())}"
+    keywords = item.get('Keywords')
+    if len(author) > 50 or len(topic) > 25 or (keywords and len(keywords) > 25):
+        return None, "Author is limited to 50 characters, Topic and Keywords to 25"
+    date_for = item.get('DateFor') or today
+    try:
+        datetime.strptime(date_for, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None, "DateFor must be YYYY-MM-DD"
+    
+    body = item.get('Body')
+    link = item.get('Link') or item.get('Url')
+    if body and len(body) > 2048:
+        return None, "Body is limited to 2048 characters"
+    if link and (len(link) > 2048 or not HTTP_LINK_RE.search(link)):
+        return None, "Link must be an http(s) URL"
+    try:
+        duration = int(item['Duration']) if item.get('Duration') is not None else None
+        size = int(item['Size']) if item.get('Size') is not None else None
+    except (TypeError, ValueError):
+        return None, "Duration and Size must be integers"
+    
+    # Same child rows create_resource would insert
+    child = None
+    if format_type == 'Note' and body:
+        child = (body,)
+    elif format_type == 'Website' and link:
+        child = (link,)
+    elif format_type == 'Pdf' and (link or body):
+        if link and not PDF_LINK_RE.search(link):
+            return None, "Pdf Link must end in .pdf"
+        child = (body, link)
+    elif format_type == 'Image' and link:
+        if not IMAGE_LINK_RE.search(link):
+            return None, "Image Link must end in .jpg, .jpeg, .png or .gif"
+        if not size or size <= 0:
+            return None, "Image needs a positive Size"
+        child = (size, link)
+    elif format_type == 'Video' and link:
+        if not duration or duration <= 0:
+            return None, "Video needs a positive Duration"
+        child = (duration, link)
+    
+    return {
+        'Author': author,
+        'Topic': topic,
+        'Keywords': keywords,
+        'Format': format_type,
+        'DateFor': date_for,
+        'Body': body if format_type in ('Note', 'Pdf') else None,
+        'Subject': item.get('Subject'),
+        'CourseID': course_id,
+        'child': child,
+    }, None
+
+# Bulk items from a JSON array body, or one JSON object per line for application/x-ndjson
+def read_bulk_items():
+    if request.mimetype == 'application/x-ndjson':
+        items = []
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+        return items
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+# A multi-row VALUES insert takes its AUTO_INCREMENT values in one allocation, lastrowid first
+# and @@auto_increment_increment apart, in every innodb_autoinc_lock_mode. The rows are read
+# back anyway, so a server handing out other ids fails the request instead of attaching
+# children to someone else's resources
+def assign_bulk_resource_ids(cursor, chunk, step):
+    for offset, row in enumerate(chunk):
+        row['ResourceID'] = cursor.lastrowid + offset * step
+    placeholders = ', '.join(['%s'] * len(chunk))
+    cursor.execute(f"SELECT ResourceID, Author, Topic, Format FROM resource WHERE ResourceID IN ({placeholders})",
+                   tuple(row['ResourceID'] for row in chunk))
+    found = {rid: (author, topic, format_type) for rid, author, topic, format_type in cursor.fetchall()}
+    for row in chunk:
+        if found.get(row['ResourceID']) != (row['Author'], row['Topic'], row['Format']):
+            raise RuntimeError("Bulk insert ResourceIDs were not consecutive, check innodb_autoinc_lock_mode")
+
+# Ids -> sorted [(first, last)] runs of consecutive ids, so range procedures cover exactly those ids
+def id_runs(ids):
+    runs = []
+    for resource_id in sorted(ids):
+        if runs and resource_id == runs[-1][1] + 1:
+            runs[-1][1] = resource_id
+        else:
+            runs.append([resource_id, resource_id])
+    return [tuple(run) for run in runs]
+
+CHILD_INSERTS = {
+    'Note': "INSERT INTO note (ResourceID, Body) VALUES (%s, %s)",
+    'Website': "INSERT INTO website (ResourceID, Link) VALUES (%s, %s)",
+    'Pdf': "INSERT INTO pdf (ResourceID, Body, Link) VALUES (%s, %s, %s)",
+    'Image': "INSERT INTO image (ResourceID, Size, Link) VALUES (%s, %s, %s)",
+    'Video': "INSERT INTO video (ResourceID, Duration, Link) VALUES (%s, %s, %s)",
+}
+
+# Create many resources in one transaction.
+# Body: [{"Author", "Topic", "Format", ...}, ...] (same fields as POST /api/resources) or NDJSON.
+# Invalid items are reported and skipped; the valid ones are inserted together or not at all
+@app.route('/api/resources/bulk', methods=['POST'])
+def create_resources_bulk():
+    conn = None
+    cursor = None
+    try:
+        items = read_bulk_items()
+        if items is None:
+            return jsonify({"error": "Expected a JSON array or application/x-ndjson body"}), 400
+        if not items or len(items) > BULK_MAX_ITEMS:
+            return jsonify({"error": f"Send between 1 and {BULK_MAX_ITEMS} resources"}), 400
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        results = []
+        rows = []
+        for index, item in enumerate(items):
+            row, error = validate_bulk_resource(item, today) if item is not None else (None, "Invalid JSON")
+            if error:
+                results.append({"index": index, "ok": False, "error": error})
+            else:
+                row['index'] = index
+                rows.append(row)
+                results.append(None)
+        
+        if rows:
+            conn = mysql.connection
+            cursor = conn.cursor()
+            
+            # Resolve every author at once and create the missing ones as students
+            authors = sorted({row['Author'] for row in rows})
+            placeholders = ', '.join(['%s'] * len(authors))
+            cursor.execute(f"SELECT Name FROM user WHERE Name IN ({placeholders})", tuple(authors))
+            existing = {name for (name,) in cursor.fetchall()}
+            missing = [name for name in authors if name not in existing]
+            if missing:
+                cursor.executemany(
+                    "INSERT INTO user (Name, Courses, IsProfessor, Password) VALUES (%s, NULL, FALSE, 'defaultpass')",
+                    [(name,) for name in missing]
+                )
+                placeholders = ', '.join(['%s'] * len(missing))
+                cursor.execute(f"INSERT INTO student (UserID) SELECT UserID FROM user WHERE Name IN ({placeholders})",
+                               tuple(missing))
+            
+            # Statements are built per chunk rather than left to executemany's splitting,
+            # so each one's ids can be worked out from its lastrowid
+            cursor.execute("SELECT @@auto_increment_increment")
+            step = cursor.fetchone()[0]
+            for start in range(0, len(rows), BULK_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_CHUNK_SIZE]
+                values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(chunk))
+                params = []
+                for row in chunk:
+                    params.extend([today, row['DateFor'], row['Author'], row['Topic'], row['Keywords'], row['Format']])
+                cursor.execute(f"INSERT INTO resource (Date, DateFor, Author, Topic, Keywords, Format) VALUES {values}",
+                               tuple(params))
+                assign_bulk_resource_ids(cursor, chunk, step)
+            
+            for format_type, insert_query in CHILD_INSERTS.items():
+                children = [(row['ResourceID'],) + row['child'] for row in rows
+                            if row['Format'] == format_type and row['child']]
+                if children:
+                    cursor.executemany(insert_query, children)
+            
+            # Subject tags from course context, then from Topic/Keywords
+            course_tags = [(row['ResourceID'], today, row['CourseID']) for row in rows if row['CourseID']]
+            subject_tags = [(row['ResourceID'], today, row['Subject']) for row in rows
+                            if row['Subject'] and not row['CourseID']]
+            if course_tags:
+                cursor.executemany(RESOURCE_COURSE_SUBJECT_SQL, course_tags)
+            if subject_tags:
+                cursor.executemany(RESOURCE_SUBJECT_SQL, subject_tags)
+            # Subject tags and list view rows, only for the ids this request created: other
+            # writers' resources can sit between chunks (or between ids when the step is not 1)
+            for first_id, last_id in id_runs([row['ResourceID'] for row in rows]):
+                cursor.callproc('SP_Resource_Subject_Refresh', [first_id, last_id])
+                cursor.callproc('SP_Resource_Summary_Refresh', [first_id, last_id])
+            
+            conn.commit()
+            response_cache.invalidate('resources', 'users')
+            
+            for row in rows:
+                results[row['index']] = {"index": row['index'], "ok": True, "resource_id": row['ResourceID']}
+                if resource_index.built:
+                    resource_index.add({
+                        'ResourceID': row['ResourceID'],
+                        'Topic': row['Topic'],
+                        'Keywords': row['Keywords'],
+                        'Author': row['Author'],
+                        'Format': row['Format'],
+                        'Rating': None,
+                        'Body': row['Body'],
+                    })
+        
+        created = len(rows)
+        return jsonify({
+            "created": created,
+            "failed": len(items) - created,
+            "results": results,
+        }), 201 if created == len(items) else 207 if created else 400
+        
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"Error creating resources in bulk: {e}")
+        return jsonify({"error": f"Failed to create resources: {str(e)}"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Submit a rating for a resource
+@app.route('/api/resources/<int:resource_id>/ratings', methods=['POST'])
+def submit_rating(resource_id):
+    conn = None
+    cursor = None
+    poster = None
+    try:
+        data = request.get_json()
+        
+        poster = data.get('Poster')
+        score = data.get('Score')
+        date = data.get('Date')
+        
+        if not all([poster, score, date]):
+            return jsonify({"error": "Missing required fields"}), 400
+        
+        # Validate score range
+        try:
+            score_float = float(score)
+            if score_float < 0.0 or score_float > 5.0:
+                return jsonify({"error": "Score must be between 0.0 and 5.0"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid score format"}), 400
+        
+        # Write-behind mode: validate, spool and return; the flusher does the inserts in batches
+        if app.config['RATING_QUEUE_ENABLED']:
+            if len(poster) > 50:
+                return jsonify({"error": "Poster name too long"}), 400
+            try:
+                datetime.strptime(date, '%Y-%m-%d')
+            except (TypeError, ValueError):
+                return jsonify({"error": "Date must be YYYY-MM-DD"}), 400
+            rating_queue.enqueue({
+                "ResourceID": resource_id,
+                "Poster": poster,
+                "Score": round(score_float, 1),
+                "Date": date,
+            })
+            return jsonify({"message": "Rating queued"}), 202
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Make sure the poster exists, creating them as a student if not (no commit, for atomicity).
+        # Use stored procedure SP_Rating_Rate, which also updates RatingSum/RatingCount and Rating
+        user_resolver.write_as(cursor, poster, lambda: cursor.callproc('SP_Rating_Rate', [
+            resource_id,
+            poster,
+            score,
+            date
+        ]))
+        
+        # conn.commit() #Commented out for Atomicity -GW
+        
+        conn.commit() #need only the commit at end, keeps user from being created if rating fails -GW
+        response_cache.invalidate('resources', f'resource:{resource_id}', 'users')
+        
+        if resource_index.built:
+            cursor.execute("SELECT Rating FROM resource WHERE ResourceID = %s", (resource_id,))
+            rated = cursor.fetchone()
+            if rated:
+                resource_index.update_rating(resource_id, rated['Rating'])
+        
+        return jsonify({"message": "Rating submitted successfully"}), 201
+        
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        if poster:
+            user_resolver.forget(poster)
+        print(f"Error submitting rating: {e}")
+        return jsonify({"error": "Failed to submit rating"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Delete a resource (cascades to its subtype row and ratings)
+@app.route('/api/resources/<int:resource_id>', methods=['DELETE'])
+def delete_resource(resource_id):
+    conn = None
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        cursor.execute("DELETE FROM resource WHERE ResourceID = %s", (resource_id,))
+        conn.commit()
+        response_cache.invalidate('resources', f'resource:{resource_id}')
+        
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Resource not found"}), 404
+        
+        if resource_index.built:
+            resource_index.remove(resource_id)
+        
+        return jsonify({"message": f"Resource {resource_id} deleted successfully"}), 200
+    except Exception as e:
+        #Rollback implemented for Atomicity and Consistency in ACID - GW
+        if conn:
+            conn.rollback()
+        print(f"Error deleting resource: {e}")
+        return jsonify({"error": "Failed to delete resource"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Get ratings for a specific resource
+@app.route('/api/resources/<int:resource_id>/ratings', methods=['GET'])
+def get_resource_ratings(resource_id):
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        query = """
+        SELECT RatingID, Poster, Score, Date
+        FROM rating
+        WHERE ResourceID = %s
+        ORDER BY Date DESC
+        """
+        
+        cursor.execute(query, (resource_id,))
+        ratings = cursor.fetchall()
+        
+        return jsonify(ratings)
+    except Exception as e:
+        print(f"Error fetching ratings: {e}")
+        return jsonify({"error": "Failed to fetch ratings"}), 500
+    finally:
+        if cursor: cursor.close()
+
+
+# Walk IX_ResourceSubject_SubjectCode_Date for the subject, then read each summary row.
+# The summary row already has the subtype link as Url and a Snippet of the body
+SUBJECT_RESOURCES_SQL = """
+SELECT 
+    r.ResourceID,
+    r.Date,
+    r.DateFor,
+    r.Author,
+    r.Topic as Title,
+    r.Topic,
+    r.Keywords,
+    r.Rating,
+    r.Format,
+    r.isVerified,
+    r.Snippet,
+    r.Url
+FROM resource_subject rs
+JOIN resource_summary r ON r.ResourceID = rs.ResourceID
+WHERE rs.SubjectCode = %s
+"""
+
+# Subject page query (without its LIMIT) -> (query, params, limit), raises ValueError for a 400.
+# Shared with the ASGI mode (asgi.py)
+def plan_subject_page(subject_code, args):
+    after = args.get('after')
+    try:
+        limit = parse_page_limit(args.get('limit'))
+        after_key = decode_resource_cursor(after, RESOURCE_SORTS['date']) if after else None
+    except ValueError:
+        raise ValueError("Invalid pagination parameters, expected after=<cursor from next_cursor>&limit=N")
+    
+    query = SUBJECT_RESOURCES_SQL
+    params = [subject_code]
+    if after_key:
+        query += " AND (rs.Date < %s OR (rs.Date = %s AND rs.ResourceID < %s))"
+        params.extend([after_key[0], after_key[0], after_key[1]])
+    query += " ORDER BY rs.Date DESC, rs.ResourceID DESC"
+    return query, params, limit
+
+
+# Get resources by subject/course, newest first from the resource_subject tags
+# Keyset paginated like /api/resources: ?after=<Date,ResourceID>&limit=N, next_cursor in the envelope
+# ?stream=json|ndjson streams every tagged resource (or only ?limit= rows)
+@app.route('/api/subjects/<subject_code>/resources', methods=['GET'])
+@response_cache.cached(tags=lambda subject_code: ['resources'])
+def get_resources_by_subject(subject_code):
+    cursor = None
+    try:
+        try:
+            query, params, limit = plan_subject_page(subject_code, request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        
+        # Get subject name first
+        cursor.execute("SELECT Name FROM subject WHERE Code = %s", (subject_code,))
+        subject = cursor.fetchone()
+        
+        if not subject:
+            return jsonify({"error": "Subject not found"}), 404
+        
+        subject_name = subject['Name']
+        
+        stream_format = requested_stream_format()
+        if stream_format:
+            if 'limit' in request.args:
+                query += " LIMIT %s"
+                params.append(limit)
+            # JSON streams keep the {"subject", "code", "resources"} envelope
+            envelope = app.json.dumps({"code": subject_code, "subject": subject_name})
+            return stream_query(query, params, stream_format,
+                                prefix=envelope[:-1] + ', "resources": ', suffix='}')
+        
+        cursor.execute(*page_query(query, params, limit))
+        resources, next_cursor = finish_resource_page(cursor.fetchall(), limit, RESOURCE_SORTS['date'])
+        
+        response = jsonify({
+            "subject": subject_name,
+            "code": subject_code,
+            "resources": resources,
+            "next_cursor": next_cursor
+        })
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except Exception as e:
+        print(f"Error fetching resources by subject: {e}")
+        return jsonify({"error": "Failed to fetch resources"}), 500
+    finally:
+        if cursor: cursor.close()
+
+# Dump the full contents of the database with mysqldump
+def fullBackup():
+    with app.app_context():
+        sleep(0.1)
+        try:
+            today = date.today()
+            now = datetime.now()
+            current_time = now.strftime("%H:%M:%S")
+            command = ["mysqldump","--allow-keywords","--quick","--databases","LobsterNotes",
+                "--single-transaction","--force" "--dump-date","--insert-ignore",
+                "--user=admin","--password=admin","--port=3306","--routines",
+                "--triggers",f"--result-file=sql-commands-and-backend/database/mysql/backups/backup_{today}_{current_time}",
+                "--source-date=2","--flush-logs","--log-error=sql-commands-and-backend/database/mysql/backups/backup.err"]
+            subprocess.run(command,check=True)
+        except subprocess.CalledProcessError as err:
+            print(f"Error during mysql full backup: {err}")
+            print(f"Command: {' '.join(err.cmd)}")
+            print(f"Stderror: {err.stderr.decode()}")
+        except FileNotFoundError:
+            print("Error: mysqldump command not found.")
+        except Exception as err:
+            print(f"Unexpected error occured in mysql full backup: {err}")
+        return
+
+# Partial backup just consists of flushing all logs
+def partialBackup(cursor):
+    with app.app_context():
+        sleep(0.01)
+        cursor.execute("FLUSH LOGS")
+        return
+
+# Set to stop the backup thread, which takes one last full backup on the way out
+backup_stop = Event()
+backup_thread = None
+
+def backup():
+    with app.app_context():
+        backupConnection = mysql.connection
+        backupCursor = backupConnection.cursor(cursorclass=MySQLdb.cursors.DictCursor)
+        sleep(0.001)
+        fullBackup()
+        partialCounter = 0
+        while not backup_stop.wait(1800) and main_thread().is_alive(): # wakes every 30 minutes
+            partialBackup(backupCursor) # do partial backup every 30 mins
+            partialCounter += 1
+            if partialCounter >= 48:
+                # does a full backup every 24 hours
+                fullBackup()
+                partialCounter = 0
+        # In the case that the server shuts down:
+        # Do a final full backup, which includes flushing the logs
+        fullBackup()
+        return
+
+# Start the backup thread if it is not already running in this process (the development server).
+# Servers with several workers run run_backups() in a process of its own instead
+def start_backup():
+    global backup_thread
+    if backup_thread is None or not backup_thread.is_alive():
+        backup_stop.clear()
+        backup_thread = Thread(target=backup, kwargs={}, daemon=False)
+        backup_thread.start()
+    return backup_thread
+
+def stop_backup(timeout=None):
+    backup_stop.set()
+    if backup_thread is not None:
+        backup_thread.join(timeout)
+
+# Backup loop in the foreground of a process of its own, for servers with several workers:
+#   python3 -c 'import app; app.run_backups()'
+# SIGTERM or SIGINT stops it after the final full backup (see gunicorn.conf.py and run_asgi.sh)
+def run_backups():
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: backup_stop.set())
+    backup()
+
+
+#Runs app
+if __name__ == "__main__":
+    with app.app_context():
+        if app.config['SEARCH_INDEX_ENABLED']:
+            get_resource_index()
+            print(f"Search index built: {len(resource_index)} resources")
+        start_backup()
+        try:
+            app.run(debug=True, port=8080)
+        finally:
+            stop_backup()
         print("unix socket is",app.confi['MYSQL_UNIX_SOCKET'])
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+ASGI entry point for the Lobster Notes API.
+
+    hypercorn asgi:application --workers 4 --bind 0.0.0.0:8080   (see run_asgi.sh)
+
+The read routes that carry most of the traffic (the resource list,
+single resources and subject pages) are served by async Quart handlers
+on their own aiomysql pool, so one worker keeps many queries in flight
+on its event loop instead of parking a thread on each. They build their
+SQL with the same helpers as the Flask handlers in app.py and share its
+response cache, so ETags and invalidations are the same in both modes.
+
+Every other route (writes, search, facets, metrics) goes to the
+unchanged Flask app, run on a thread pool sized to the Flask connection
+pool. The async routes are timed by the same RequestMetrics, so /metrics
+and Server-Timing cover both.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiomysql
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, Response, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+import app as api
+from request_metrics import record_query, record_rows
+
+flask_app = api.app
+quart_app = Quart(__name__, static_folder=None)
+quart_app.json = flask_app.json_provider_class(quart_app)
+
+# Async pool settings. Each worker process opens its own pool
+quart_app.config['ASYNC_POOL_MIN_SIZE'] = int(os.environ.get('LOBSTER_ASYNC_POOL_MIN_SIZE', '1'))
+quart_app.config['ASYNC_POOL_SIZE'] = int(os.environ.get('LOBSTER_ASYNC_POOL_SIZE', '20'))
+quart_app.config['ASYNC_POOL_RECYCLE'] = int(os.environ.get('LOBSTER_ASYNC_POOL_RECYCLE', '3600'))
+# Largest request body handed to Flask (bulk uploads are the big ones)
+quart_app.config['WSGI_MAX_BODY_SIZE'] = int(os.environ.get('LOBSTER_WSGI_MAX_BODY_SIZE', str(64 * 1024 * 1024)))
+
+api.request_metrics.init_async_app(quart_app)
+
+
+@quart_app.before_serving
+async def open_pool():
+    config = flask_app.config
+    connect_kwargs = {
+        'host': config['MYSQL_HOST'],
+        'user': config['MYSQL_USER'],
+        'password': config['MYSQL_PASSWORD'],
+        'db': config['MYSQL_DB'],
+        'port': config['MYSQL_PORT'],
+        'charset': config['MYSQL_CHARSET'],
+        'autocommit': True,
+    }
+    if config['MYSQL_UNIX_SOCKET']:
+        connect_kwargs['unix_socket'] = config['MYSQL_UNIX_SOCKET']
+    quart_app.mysql_pool = await aiomysql.create_pool(
+        minsize=quart_app.config['ASYNC_POOL_MIN_SIZE'],
+        maxsize=quart_app.config['ASYNC_POOL_SIZE'],
+        pool_recycle=quart_app.config['ASYNC_POOL_RECYCLE'],
+        **connect_kwargs,
+    )
+    # One thread per Flask pool connection, so Flask requests never queue on the pool
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config['MYSQL_POOL_SIZE'], thread_name_prefix='flask'))
+
+
+@quart_app.after_serving
+async def close_pool():
+    quart_app.mysql_pool.close()
+    await quart_app.mysql_pool.wait_closed()
+
+
+# Same CORS headers flask_cors adds on the Flask side
+@quart_app.after_request
+async def add_cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor, Server-Timing'
+    return response
+
+
+@quart_app.route('/api/metrics/async-pool', methods=['GET'])
+async def async_pool_metrics():
+    pool = quart_app.mysql_pool
+    return jsonify({
+        "size": pool.size,
+        "free": pool.freesize,
+        "in_use": pool.size - pool.freesize,
+        "min_size": pool.minsize,
+        "max_size": pool.maxsize,
+    })
+
+
+# Reports the statement to request_metrics and the slow query log like the Flask cursors do
+async def execute_timed(cursor, query, params):
+    start = time.perf_counter()
+    try:
+        await cursor.execute(query, params)
+    finally:
+        record_query(cursor, 'execute', query, params, time.perf_counter() - start)
+
+
+async def fetch_all(query, params):
+    async with quart_app.mysql_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await execute_timed(cursor, query, tuple(params))
+            rows = await cursor.fetchall()
+            record_rows(len(rows))
+            return rows
+
+
+async def fetch_one(query, params):
+    rows = await fetch_all(query, params)
+    return rows[0] if rows else None
+
+
+# Async twin of app.load_cache_versions. It runs on its own autocommit connection, so a
+# write landing before the data query leaves the ETag older than the body, never newer
+async def load_cache_versions(tags):
+    return api.cache_versions_from_rows(await fetch_all(*api.cache_versions_query(tags)))
+
+
+# Async twin of app.stream_query: rows come off an unbuffered cursor in batches
+async def stream_query(query, params, fmt, transform=None, prefix='', suffix=''):
+    pool = quart_app.mysql_pool
+    conn = await pool.acquire()
+    cursor = None
+    try:
+        cursor = await conn.cursor(aiomysql.SSDictCursor)
+        # Execute before the first byte goes out so SQL errors still become a 500
+        await execute_timed(cursor, query, tuple(params))
+    except Exception:
+        conn.close()
+        pool.release(conn)
+        raise
+
+    async def generate():
+        try:
+            if fmt == 'json':
+                yield prefix + '['
+            first = True
+            while True:
+                rows = await cursor.fetchmany(api.STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                record_rows(len(rows))
+                chunk = []
+                for row in rows:
+                    text = quart_app.json.dumps(transform(row) if transform else row)
+                    if fmt == 'ndjson':
+                        chunk.append(text + '\n')
+                    else:
+                        chunk.append(text if first else ',' + text)
+                        first = False
+                yield ''.join(chunk)
+            if fmt == 'json':
+                yield ']' + suffix
+        finally:
+            await cursor.close()
+            pool.release(conn)
+
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+    return Response(generate(), mimetype=mimetype)
+
+
+# Same contract as app.get_resources
+@quart_app.route('/api/resources', methods=['GET'])
+@api.response_cache.cached_async(tags=lambda: ['resources'], version_loader=load_cache_versions)
+async def get_resources():
+    if 'ids' in request.args:
+        return await get_resources_by_ids(request.args['ids'])
+
+    try:
+        plan, error = api.plan_resource_list(request.args)
+        if error:
+            return jsonify({"error": error}), 400
+        query, params, limit = plan['query'], plan['params'], plan['limit']
+
+        stream_format = api.requested_stream_format(request)
+        if stream_format:
+            if 'limit' in request.args:
+                query += " LIMIT %s"
+                params.append(limit)
+            return await stream_query(query, params, stream_format, transform=plan['shape'])
+
+        rows = await fetch_all(*api.page_query(query, params, limit))
+        resources, next_cursor = api.finish_resource_page(rows, limit, plan['sort_key'], plan['shape'])
+
+        if plan['paged']:
+            response = jsonify({"resources": resources, "next_cursor": next_cursor})
+        else:
+            response = jsonify(resources)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except Exception as e:
+        print(f"Error fetching resources: {e}")
+        return jsonify({"error": "Failed to fetch resources"}), 500
+
+
+async def get_resources_by_ids(raw_ids):
+    try:
+        try:
+            resource_ids = api.parse_resource_ids(raw_ids)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        rows = await fetch_all(*api.resource_ids_query(resource_ids))
+        return jsonify(api.order_resources_by_ids(resource_ids, rows))
+    except Exception as e:
+        print(f"Error fetching resources by id: {e}")
+        return jsonify({"error": "Failed to fetch resources"}), 500
+
+
+@quart_app.route('/api/resources/<int:resource_id>', methods=['GET'])
+@api.response_cache.cached_async(tags=lambda resource_id: [f'resource:{resource_id}'],
+                                     version_loader=load_cache_versions)
+async def get_resource_details(resource_id):
+    try:
+        result = await fetch_one(api.RESOURCE_DETAIL_SQL + " WHERE r.ResourceID = %s", [resource_id])
+        if not result:
+            return jsonify({"error": "Resource not found"}), 404
+        return jsonify(api.consolidate_resource_details(result))
+    except Exception as e:
+        print(f"Error fetching resource details: {e}")
+        return jsonify({"error": "Failed to fetch resource details"}), 500
+
+
+@quart_app.route('/api/subjects/<subject_code>/resources', methods=['GET'])
+@api.response_cache.cached_async(tags=lambda subject_code: ['resources'],
+                                     version_loader=load_cache_versions)
+async def get_resources_by_subject(subject_code):
+    try:
+        try:
+            query, params, limit = api.plan_subject_page(subject_code, request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        subject = await fetch_one("SELECT Name FROM subject WHERE Code = %s", [subject_code])
+        if not subject:
+            return jsonify({"error": "Subject not found"}), 404
+        subject_name = subject['Name']
+
+        stream_format = api.requested_stream_format(request)
+        if stream_format:
+            if 'limit' in request.args:
+                query += " LIMIT %s"
+                params.append(limit)
+            envelope = quart_app.json.dumps({"code": subject_code, "subject": subject_name})
+            return await stream_query(query, params, stream_format,
+                                      prefix=envelope[:-1] + ', "resources": ', suffix='}')
+
+        rows = await fetch_all(*api.page_query(query, params, limit))
+        resources, next_cursor = api.finish_resource_page(rows, limit, api.RESOURCE_SORTS['date'])
+
+        response = jsonify({
+            "subject": subject_name,
+            "code": subject_code,
+            "resources": resources,
+            "next_cursor": next_cursor
+        })
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except Exception as e:
+        print(f"Error fetching resources by subject: {e}")
+        return jsonify({"error": "Failed to fetch resources"}), 500
+
+
+# Sends GET/HEAD requests for the routes above to Quart and everything else to Flask.
+# Lifespan events go to Quart so the async pool opens and closes with the server
+class Dispatcher:
+    def __init__(self, async_app, wsgi_app, max_body_size):
+        self.async_app = async_app
+        self.wsgi_app = AsyncioWSGIMiddleware(wsgi_app, max_body_size=max_body_size)
+        self.routes = async_app.url_map.bind('localhost')
+
+    def is_async(self, scope):
+        if scope['method'] not in ('GET', 'HEAD'):
+            return False
+        try:
+            self.routes.match(scope['path'], method=scope['method'])
+        except HTTPException:
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan' or (scope['type'] == 'http' and self.is_async(scope)):
+            await self.async_app(scope, receive, send)
+        else:
+            await self.wsgi_app(scope, receive, send)
+
+
+application = Dispatcher(quart_app, flask_app, quart_app.config['WSGI_MAX_BODY_SIZE'])
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Load test the REST API against a seeded local MySQL.
+
+    python3 bench_api.py seed --scale 100k [--init]
+    python3 bench_api.py run --url http://127.0.0.1:8080 --duration 60 --concurrency 16 -o results.json
+    python3 bench_api.py compare before.json after.json
+
+seed rebuilds the database with init_db.sh (--init), then inserts the
+generate_data.py dataset (users, courses, enrollments, resources of all
+five formats and Zipf-distributed ratings) at 10k, 100k or 1M resources.
+
+run drives a weighted mix of list, detail, subject, rating POST, course
+and roster requests from --concurrency threads against a running server
+(run.sh, run_prod.sh or run_asgi.sh) and writes RPS and p50/p95/p99 per
+endpoint to a JSON file with sorted keys, so two runs diff cleanly.
+Resource ids are drawn with the same Zipf skew as the ratings, so hot
+resources stay hot. Only 2xx and 304 responses count towards latency;
+anything else (a 4xx from a bad request included) is an error.
+
+compare prints the change per endpoint between two result files.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+import MySQLdb
+
+from generate_data import COLUMNS, FORMATS, WORDS, Zipf, generate, parse_scale
+
+socket_paths = [
+    os.path.expanduser('~/mysql.sock'),
+    '/tmp/mysql.sock',
+    '/var/run/mysqld/mysqld.sock',
+    '/var/run/mysqld/mysql.sock',
+]
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+INIT_SCRIPT = os.path.join(PROJECT_ROOT, 'sql-commands-and-backend', 'init_db.sh')
+
+# endpoint -> weight, see build_request for what each one sends
+DEFAULT_MIX = {
+    'resources_list': 30,
+    'resources_filtered': 10,
+    'resource_detail': 25,
+    'subject_resources': 10,
+    'rating_post': 10,
+    'course_detail': 8,
+    'course_roster': 7,
+}
+
+
+def connect():
+    socket_path = next((p for p in socket_paths if os.path.exists(p)), '/tmp/mysql.sock')
+    return MySQLdb.connect(host='localhost', user='admin', passwd='admin',
+                           db='lobsternotes', unix_socket=socket_path)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+# ---------- seeding ----------
+
+def insert_batches(conn, cursor, rows, batch_size=5000):
+    """Inserts generate_data.generate() rows with one executemany per table batch."""
+    batches = {table: [] for table in COLUMNS}
+    counts = {table: 0 for table in COLUMNS}
+
+    def flush(table):
+        columns = COLUMNS[table]
+        # Subjects may already exist; anything else colliding means the database was not fresh
+        verb = "INSERT IGNORE" if table == 'subject' else "INSERT"
+        cursor.executemany(f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+                           batches[table])
+        counts[table] += len(batches[table])
+        batches[table] = []
+
+    for table, row in rows:
+        batches[table].append(row)
+        if len(batches[table]) >= batch_size:
+            flush(table)
+            conn.commit()
+    for table in COLUMNS:
+        if batches[table]:
+            flush(table)
+    conn.commit()
+    return counts
+
+
+def seed(args):
+    if args.init:
+        print("Reinitializing the database with init_db.sh")
+        subprocess.run(['bash', INIT_SCRIPT], check=True)
+
+    resources = parse_scale(args.scale)
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        offsets = {}
+        for key, table, column in (('user', 'user', 'UserID'), ('course', 'course', 'CourseID'),
+                                   ('resource', 'resource', 'ResourceID'), ('rating', 'rating', 'RatingID')):
+            cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+            offsets[key] = cursor.fetchone()[0]
+        # Every row is generated consistent, so skip the per-row checks while loading
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+        start = time.perf_counter()
+        counts = insert_batches(conn, cursor, generate(resources, seed=args.seed, zipf_s=args.zipf, offsets=offsets))
+        for table, count in counts.items():
+            print(f"{table:<12}{count:>10} rows")
+        total = sum(counts.values())
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.execute("SET SESSION unique_checks = 1")
+
+        # Derived tables the API reads from
+        cursor.execute("CALL SP_Resource_Summary_Rebuild()")
+        cursor.execute("CALL SP_Resource_Subject_Refresh(0, 4294967295)")
+        # Loaded outside the API, so the cached responses have to be told
+        for tag in ('resources', 'courses', 'users'):
+            cursor.execute("CALL SP_Cache_Version_Bump(%s)", (tag,))
+        conn.commit()
+        print(f"Seeded {total} rows in {time.perf_counter() - start:.1f} s")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# ---------- load ----------
+
+class Target:
+    """What the request mix can point at, read from the seeded database."""
+
+    def __init__(self, zipf_s):
+        conn = connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT ResourceID FROM resource ORDER BY RatingCount DESC, ResourceID")
+            self.resource_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT CourseID FROM course")
+            self.course_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT Code FROM subject")
+            self.subjects = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT u.Name FROM user u JOIN student s ON u.UserID = s.UserID LIMIT 10000")
+            self.posters = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+        if not self.resource_ids or not self.course_ids or not self.posters:
+            raise SystemExit("The database has no resources, courses or students, run `bench_api.py seed` first")
+        # Most rated first, so the Zipf head lands on the resources people actually rate
+        self.zipf = Zipf(len(self.resource_ids), zipf_s)
+
+    def resource_id(self, rng):
+        return self.resource_ids[self.zipf.sample(rng)]
+
+
+def build_request(name, target, rng):
+    """(method, path, body) for one request of the named endpoint."""
+    if name == 'resources_list':
+        return 'GET', f"/api/resources?limit=20&sort={rng.choice(['date', 'date', 'rating', 'datefor'])}", None
+    if name == 'resources_filtered':
+        filters = rng.choice([f"search={rng.choice(WORDS)}", f"format={rng.choice(FORMATS)}",
+                              "min_rating=4", "verified=1", f"subject_code={rng.choice(target.subjects)}"])
+        return 'GET', f"/api/resources?limit=20&{filters}", None
+    if name == 'resource_detail':
+        return 'GET', f"/api/resources/{target.resource_id(rng)}", None
+    if name == 'subject_resources':
+        return 'GET', f"/api/subjects/{rng.choice(target.subjects)}/resources?limit=20", None
+    if name == 'rating_post':
+        body = {"Poster": rng.choice(target.posters), "Score": round(rng.uniform(0, 5), 1),
+                "Date": date.today().isoformat()}
+        return 'POST', f"/api/resources/{target.resource_id(rng)}/ratings", body
+    if name == 'course_detail':
+        return 'GET', f"/api/course/{rng.choice(target.course_ids)}", None
+    if name == 'course_roster':
+        return 'GET', f"/api/course/{rng.choice(target.course_ids)}/roster", None
+    raise ValueError(f"Unknown endpoint {name}")
+
+
+def parse_mix(value):
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown endpoint {name}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def worker(url, target, mix, deadline, results, lock, seed):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path, body = build_request(name, target, rng)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = 200 <= response.status < 300 or response.status == 304
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        elapsed = time.perf_counter() - start
+        if ok:
+            samples[name].append(elapsed)
+        else:
+            errors[name] += 1
+    conn.close()
+    with lock:
+        for name in names:
+            results['samples'].setdefault(name, []).extend(samples[name])
+            results['errors'][name] = results['errors'].get(name, 0) + errors[name]
+
+
+def summarize(samples, errors, duration):
+    if not samples:
+        return {"requests": 0, "errors": errors, "rps": 0.0}
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / duration, 2),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    target = Target(args.zipf)
+
+    if args.warmup > 0:
+        print(f"Warming up for {args.warmup} s")
+        warm = {'samples': {}, 'errors': {}}
+        threads = [threading.Thread(target=worker, args=(args.url, target, mix, time.monotonic() + args.warmup,
+                                                          warm, threading.Lock(), args.seed + i))
+                   for i in range(args.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    print(f"Running {args.concurrency} clients for {args.duration} s against {args.url}")
+    results = {'samples': {}, 'errors': {}}
+    lock = threading.Lock()
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=worker, args=(args.url, target, mix, deadline, results, lock, args.seed + 1000 + i))
+               for i in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.monotonic() - start
+
+    endpoints = {name: summarize(results['samples'].get(name, []), results['errors'].get(name, 0), duration)
+                 for name in mix}
+    all_samples = [s for samples in results['samples'].values() for s in samples]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started": datetime.now().isoformat(timespec='seconds'),
+            "url": args.url,
+            "duration_seconds": round(duration, 3),
+            "concurrency": args.concurrency,
+            "resources": len(target.resource_ids),
+            "courses": len(target.course_ids),
+            "zipf_s": args.zipf,
+            "mix": mix,
+        },
+        "endpoints": endpoints,
+        "total": summarize(all_samples, sum(results['errors'].values()), duration),
+    }
+
+    print(f"\n{'endpoint':<20}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in sorted(endpoints.items()) + [('total', report['total'])]:
+        print(f"{name:<20}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10.1f}"
+              f"{stats.get('p50_ms', 0):>10.2f}{stats.get('p95_ms', 0):>10.2f}{stats.get('p99_ms', 0):>10.2f}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nWrote {args.output}")
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    print(f"\n{'endpoint':<20}{'rps':>18}{'p50 ms':>20}{'p99 ms':>20}")
+
+    def change(old, new):
+        if not old:
+            return f"{new:>10.1f}"
+        return f"{new:>10.1f} {(new - old) / old * 100:+6.1f}%"
+
+    rows = sorted(set(before['endpoints']) | set(after['endpoints']))
+    for name in rows + ['total']:
+        old = before['total'] if name == 'total' else before['endpoints'].get(name, {})
+        new = after['total'] if name == 'total' else after['endpoints'].get(name, {})
+        print(f"{name:<20}{change(old.get('rps'), new.get('rps', 0)):>18}"
+              f"{change(old.get('p50_ms'), new.get('p50_ms', 0)):>20}{change(old.get('p99_ms'), new.get('p99_ms', 0)):>20}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load test the Lobster Notes API")
+    sub = p.add_subparsers(dest='command', required=True)
+
+    seed_parser = sub.add_parser('seed', help="Load a synthetic dataset into the local database")
+    seed_parser.add_argument('--scale', default='10k', help="Resources to generate: 10k, 100k, 1m or a number")
+    seed_parser.add_argument('--init', action='store_true', help="Rebuild the database with init_db.sh first")
+    seed_parser.add_argument('--seed', type=int, default=457)
+    seed_parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of ratings per resource")
+
+    run_parser = sub.add_parser('run', help="Drive the request mix and write a results file")
+    run_parser.add_argument('--url', default='http://127.0.0.1:8080')
+    run_parser.add_argument('--duration', type=float, default=30.0)
+    run_parser.add_argument('--warmup', type=float, default=5.0)
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--mix', help=f"name=weight,... from {', '.join(DEFAULT_MIX)}")
+    run_parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent for picking resources")
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('-o', '--output', default='bench_results.json')
+
+    compare_parser = sub.add_parser('compare', help="Compare two results files")
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+
+    args = p.parse_args()
+    if args.command == 'seed':
+        seed(args)
+    elif args.command == 'run':
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare the in-memory search index against the LIKE search query.
+
+Builds a ResourceIndex from the lobsternotes database, then times each
+query through the index (search + batched hydration) and through the
+original eight-way LIKE query. Prints mean and p95 latency per query.
+"""
+import argparse
+import os
+import time
+
+import MySQLdb
+import MySQLdb.cursors
+
+from search_index import ResourceIndex
+
+socket_paths = [
+    os.path.expanduser('~/mysql.sock'),
+    '/tmp/mysql.sock',
+    '/var/run/mysqld/mysqld.sock',
+    '/var/run/mysqld/mysql.sock',
+]
+
+DEFAULT_QUERIES = ['lin', 'linear', 'algebra', 'video', 'khan', 'intro', 'the']
+
+LIKE_SQL = """
+SELECT r.ResourceID, r.Date, r.DateFor, r.Author, r.Topic, r.Keywords, r.Rating, r.Format,
+       r.isVerified, n.Body, w.Link, v.Duration, v.Link, p.Link, i.Link, i.Size
+FROM resource r
+LEFT JOIN note n ON r.ResourceID = n.ResourceID
+LEFT JOIN website w ON r.ResourceID = w.ResourceID
+LEFT JOIN video v ON r.ResourceID = v.ResourceID
+LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
+LEFT JOIN image i ON r.ResourceID = i.ResourceID
+WHERE (r.Topic LIKE %s OR r.Keywords LIKE %s OR r.Author LIKE %s OR n.Body LIKE %s
+       OR w.Link LIKE %s OR v.Link LIKE %s OR p.Link LIKE %s OR i.Link LIKE %s)
+ORDER BY r.Date DESC
+LIMIT %s
+"""
+
+HYDRATE_SQL = """
+SELECT r.ResourceID, r.Date, r.DateFor, r.Author, r.Topic, r.Keywords, r.Rating, r.Format,
+       r.isVerified, n.Body, w.Link, v.Duration, v.Link, p.Link, i.Link, i.Size
+FROM resource r
+LEFT JOIN note n ON r.ResourceID = n.ResourceID
+LEFT JOIN website w ON r.ResourceID = w.ResourceID
+LEFT JOIN video v ON r.ResourceID = v.ResourceID
+LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
+LEFT JOIN image i ON r.ResourceID = i.ResourceID
+WHERE r.ResourceID IN ({})
+"""
+
+
+def connect():
+    socket_path = next((p for p in socket_paths if os.path.exists(p)), '/tmp/mysql.sock')
+    return MySQLdb.connect(host='localhost', user='admin', passwd='admin',
+                           db='lobsternotes', unix_socket=socket_path)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def time_runs(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sum(samples) / len(samples), percentile(samples, 0.95)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('queries', nargs='*', default=DEFAULT_QUERIES)
+    p.add_argument('--repeat', type=int, default=50)
+    p.add_argument('--limit', type=int, default=50)
+    args = p.parse_args()
+
+    conn = connect()
+    cursor = conn.cursor()
+
+    index = ResourceIndex()
+    start = time.perf_counter()
+    index.build(conn)
+    print(f"Built index over {len(index)} resources in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def run_index(q):
+        hits = index.search(q, limit=args.limit)
+        ids = [rid for rid, _ in hits]
+        if ids:
+            cursor.execute(HYDRATE_SQL.format(', '.join(['%s'] * len(ids))), tuple(ids))
+            cursor.fetchall()
+        return len(ids)
+
+    def run_like(q):
+        term = '%' + q + '%'
+        cursor.execute(LIKE_SQL, (term,) * 8 + (args.limit,))
+        return len(cursor.fetchall())
+
+    print(f"\n{'query':<16}{'index ms':>10}{'p95':>8}{'hits':>6}   {'LIKE ms':>10}{'p95':>8}{'hits':>6}   speedup")
+    for q in args.queries:
+        index_hits = run_index(q)
+        like_hits = run_like(q)
+        index_mean, index_p95 = time_runs(lambda: run_index(q), args.repeat)
+        like_mean, like_p95 = time_runs(lambda: run_like(q), args.repeat)
+        speedup = like_mean / index_mean if index_mean else float('inf')
+        print(f"{q:<16}{index_mean:>10.3f}{index_p95:>8.3f}{index_hits:>6}   "
+              f"{like_mean:>10.3f}{like_p95:>8.3f}{like_hits:>6}   {speedup:.1f}x")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Pooled MySQL connections for the Lobster Notes API.
+
+Drop-in replacement for flask_mysqldb: route handlers keep using
+`mysql.connection`, but the connection is checked out of a bounded pool
+on first use in an app context and handed back on teardown instead of
+being opened and closed for every request.
+"""
+import os
+import threading
+import time
+
+import MySQLdb
+from flask import g
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, raw, owner_pid):
+        self.raw = raw
+        self.owner_pid = owner_pid
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_thread = None
+
+
+class ConnectionPool:
+    def __init__(self, connect_kwargs, max_size=10, timeout=5.0,
+                 max_lifetime=3600.0, ping_interval=30.0):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        # Connections inherited through fork, see _check_fork
+        self._inherited = []
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle = []
+        self._size = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    # Connections inherited through fork (gunicorn workers) share the parent's socket.
+    # Closing one, or letting it be garbage collected (MySQLdb closes on dealloc), would
+    # send COM_QUIT on that socket and end the parent's session, so a child keeps them
+    # referenced in _inherited, never uses or closes them, and starts with an empty pool
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._inherited.extend(self._idle)
+            self._reset_state()
+
+    def _open(self):
+        raw = MySQLdb.connect(**self.connect_kwargs)
+        with self._cond:
+            self.created += 1
+        return PooledConnection(raw, self._pid)
+
+    # Called with self._cond held, which guards the counters and _inherited
+    def _discard(self, pooled):
+        self.discarded += 1
+        if pooled.owner_pid != os.getpid():
+            self._inherited.append(pooled)
+            return
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+
+    # Prefer the idle connection this thread used last, then the most recently used one
+    def _take_idle(self, thread_id):
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i].last_thread == thread_id:
+                return self._idle.pop(i)
+        return self._idle.pop()
+
+    # True if the connection is too old or no longer answers a ping
+    def _is_stale(self, pooled):
+        now = time.monotonic()
+        if self.max_lifetime and now - pooled.created_at > self.max_lifetime:
+            return True
+        if now - pooled.last_used > self.ping_interval:
+            try:
+                pooled.raw.ping()
+            except Exception:
+                return True
+        return False
+
+    def acquire(self):
+        thread_id = threading.get_ident()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            self._check_fork()
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+            pooled = self._take_idle(thread_id) if self._idle else None
+            if pooled is None:
+                # Reserve the slot before connecting outside the lock
+                self._size += 1
+            waited = time.monotonic() - start
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        try:
+            if pooled is not None and self._is_stale(pooled):
+                with self._cond:
+                    self._discard(pooled)
+                pooled = None
+            if pooled is None:
+                pooled = self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        pooled.last_thread = thread_id
+        return pooled
+
+    def release(self, pooled, broken=False):
+        with self._cond:
+            if pooled.owner_pid != self._pid:
+                # Checked out before a fork, not ours to return (or to close)
+                self._inherited.append(pooled)
+                return
+            if broken:
+                self._discard(pooled)
+                self._size -= 1
+            else:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.pop())
+                self._size -= 1
+
+    # stats() keys that only ever go up, exported to Prometheus as counters
+    STATS_COUNTERS = ("checkouts", "timeouts", "created", "discarded", "wait_seconds_total")
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "discarded": self.discarded,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+class MySQLPool:
+    def __init__(self, app=None):
+        self.pool = None
+        # Optional callable wrapping the raw connection handed to handlers (see request_metrics.py)
+        self.connection_wrapper = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_HOST', 'localhost')
+        app.config.setdefault('MYSQL_PORT', 3306)
+        app.config.setdefault('MYSQL_UNIX_SOCKET', None)
+        app.config.setdefault('MYSQL_CHARSET', 'utf8mb4')
+        app.config.setdefault('MYSQL_POOL_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 5.0)
+        app.config.setdefault('MYSQL_POOL_MAX_LIFETIME', 3600.0)
+        app.config.setdefault('MYSQL_POOL_PING_INTERVAL', 30.0)
+
+        connect_kwargs = {
+            'host': app.config['MYSQL_HOST'],
+            'user': app.config['MYSQL_USER'],
+            'passwd': app.config['MYSQL_PASSWORD'],
+            'db': app.config['MYSQL_DB'],
+            'port': app.config['MYSQL_PORT'],
+            'charset': app.config['MYSQL_CHARSET'],
+        }
+        if app.config['MYSQL_UNIX_SOCKET']:
+            connect_kwargs['unix_socket'] = app.config['MYSQL_UNIX_SOCKET']
+
+        self.pool = ConnectionPool(
+            connect_kwargs,
+            max_size=app.config['MYSQL_POOL_SIZE'],
+            timeout=app.config['MYSQL_POOL_TIMEOUT'],
+            max_lifetime=app.config['MYSQL_POOL_MAX_LIFETIME'],
+            ping_interval=app.config['MYSQL_POOL_PING_INTERVAL'],
+        )
+        app.teardown_appcontext(self.teardown)
+
+    # Same interface as flask_mysqldb: one connection per app context
+    @property
+    def connection(self):
+        if 'mysql_pooled' not in g:
+            g.mysql_pooled = self.pool.acquire()
+        if self.connection_wrapper is not None:
+            return self.connection_wrapper(g.mysql_pooled.raw)
+        return g.mysql_pooled.raw
+
+    # Roll back anything left uncommitted so the next borrower starts clean
+    def teardown(self, exception):
+        pooled = g.pop('mysql_pooled', None)
+        if pooled is None:
+            return
+        broken = False
+        try:
+            pooled.raw.rollback()
+        except Exception:
+            broken = True
+        self.pool.release(pooled, broken=broken)
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic Lobster Notes dataset for scale testing.
+
+    python3 generate_data.py csv --scale 1m -o /tmp/lobster-1m
+    mysql --local-infile=1 -u admin -padmin lobsternotes < /tmp/lobster-1m/load.sql
+
+    python3 generate_data.py json --scale 100k -o synthetic_scrape.json
+
+csv writes one file per table (users, students, professors, courses,
+teaches, enrolled, resources of all five formats and ratings) in the
+format LOAD DATA reads, plus a load.sql that loads them in foreign key
+order and rebuilds resource_summary and resource_subject. Ids start
+after --offsets (or after the highest ids in the local database with
+--from-db), so the files load on top of the init_db.sh sample data.
+
+json writes the scraper shape (Resource, Note, pdf, Image, Video,
+Website) that data_cleaner.py, validate.py and the importers read. That
+shape has no users, courses or ratings: every resource is credited to
+the scraper author the importers create, and Rating holds the average
+of the generated scores.
+
+Ratings follow a Zipf distribution over resources (a few resources get
+most of them), every row passes the CHECK constraints in
+`Lobster Notes Tables.sql` (check_row raises if a change here breaks
+one) and the output is the same for the same --scale, --seed and
+--zipf. Rows are generated as one stream, so memory stays flat at
+10^6+ resources.
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from datetime import date, timedelta
+
+socket_paths = [
+    os.path.expanduser('~/mysql.sock'),
+    '/tmp/mysql.sock',
+    '/var/run/mysqld/mysqld.sock',
+    '/var/run/mysqld/mysql.sock',
+]
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+SUBJECTS = [('CS', 'Computer Science'), ('MTH', 'Mathematics'), ('PHY', 'Physics'),
+            ('BIO', 'Biology'), ('CHE', 'Chemistry'), ('HIS', 'History'),
+            ('ENG', 'English'), ('ECO', 'Economics'), ('PSY', 'Psychology'), ('ART', 'Art')]
+FORMATS = ['Note', 'Video', 'Website', 'Pdf', 'Image']
+SESSIONS = ['Spring', 'Summer', 'Fall', 'Winter']
+WORDS = ['linear', 'algebra', 'calculus', 'vectors', 'matrix', 'proof', 'limits', 'graphs',
+         'sorting', 'recursion', 'entropy', 'cells', 'enzymes', 'markets', 'inflation', 'war',
+         'poetry', 'essay', 'memory', 'neurons', 'orbits', 'waves', 'bonds', 'acids', 'review']
+FIRST_NAMES = ['Alice', 'Bob', 'Carmen', 'David', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jamal',
+               'Kira', 'Liam', 'Maya', 'Noah', 'Olga', 'Priya', 'Quinn', 'Rosa', 'Sam', 'Tariq']
+LAST_NAMES = ['Johnson', 'Williams', 'Garcia', 'Nguyen', 'Smith', 'Okafor', 'Kowalski', 'Haddad',
+              'Tanaka', 'Moreau', 'Silva', 'Larsen', 'Patel', 'Cohen', 'Murphy', 'Rossi']
+COURSE_TITLES = ['Introduction to', 'Topics in', 'Advanced', 'Foundations of', 'Seminar in']
+SITES = ['https://www.khanacademy.org', 'https://ocw.mit.edu', 'https://en.wikipedia.org/wiki',
+         'https://example.edu']
+IMAGE_EXTENSIONS = ['png', 'jpg', 'jpeg', 'gif']
+
+# Author of every resource in the json output, the user the importers create
+SCRAPER_AUTHOR = 'khan accademy, lobster notes web scraper'
+
+# Tables in foreign key order with the columns generate() fills
+COLUMNS = {
+    'subject': ('Code', 'Name'),
+    'user': ('UserID', 'Name', 'Courses', 'Password', 'IsProfessor'),
+    'student': ('UserID',),
+    'professor': ('UserID', 'Badge'),
+    'course': ('CourseID', 'Section', 'Name', 'Session', 'Year', 'Subject', 'CatalogNumber', 'ProfessorID'),
+    'teaches': ('ProfessorID', 'CourseID'),
+    'enrolled': ('StudentID', 'CourseID'),
+    'resource': ('ResourceID', 'Date', 'DateFor', 'Author', 'Topic', 'Keywords', 'Rating',
+                 'RatingSum', 'RatingCount', 'Format', 'isVerified'),
+    'note': ('ResourceID', 'Body'),
+    'video': ('ResourceID', 'Duration', 'Link'),
+    'website': ('ResourceID', 'Link'),
+    'pdf': ('ResourceID', 'Body', 'Link'),
+    'image': ('ResourceID', 'Size', 'Link'),
+    'rating': ('RatingID', 'Poster', 'ResourceID', 'Score', 'Date'),
+}
+
+# ---------- constraints ----------
+
+HTTP_RE = re.compile(r'^https?://', re.I)
+PDF_RE = re.compile(r'\.pdf$', re.I)
+IMAGE_RE = re.compile(r'\.(jpg|jpeg|png|gif)$', re.I)
+SECTION_RE = re.compile(r'^[A-Za-z0-9]+$')
+
+
+def _text(limit, nullable=False):
+    return lambda v: (v is None and nullable) or (isinstance(v, str) and len(v) <= limit)
+
+
+# table -> (column, rule, predicate), mirroring the types and CHECKs in Lobster Notes Tables.sql
+CHECKS = {
+    'subject': [('Code', "char(3)", _text(3)), ('Name', "varchar(50) not null", _text(50))],
+    'user': [
+        ('Name', "varchar(50) not null", _text(50)),
+        ('Courses', "varchar(50)", _text(50, nullable=True)),
+        ('Password', "varchar(50) not null", _text(50)),
+    ],
+    'course': [
+        ('Section', "alphanumeric varchar(24)", lambda v: v is None or (len(v) <= 24 and SECTION_RE.match(v))),
+        ('Name', "varchar(50) not null", _text(50)),
+        ('Session', "Spring, Summer, Fall or Winter", lambda v: v in SESSIONS),
+        ('Year', "> 2000", lambda v: 2000 < v <= 9999),
+        ('Subject', "char(3)", _text(3)),
+        ('CatalogNumber', "numeric(3,0)", lambda v: v is None or 0 <= v <= 999),
+    ],
+    'resource': [
+        ('Author', "varchar(50) not null", _text(50)),
+        ('Topic', "varchar(25) not null", lambda v: isinstance(v, str) and 0 < len(v) <= 25),
+        ('Keywords', "varchar(25)", _text(25, nullable=True)),
+        ('Rating', "numeric(2,1)", lambda v: v is None or 0.0 <= v <= 9.9),
+        ('RatingSum', ">= 0", lambda v: v >= 0.0),
+        ('RatingCount', "unsigned", lambda v: v >= 0),
+        ('Format', "Note, Video, Website, Pdf or Image", lambda v: v in FORMATS),
+    ],
+    'rating': [
+        ('Poster', "varchar(50) not null", _text(50)),
+        ('Score', "between 0.0 and 5.0", lambda v: 0.0 <= v <= 5.0),
+    ],
+    'note': [('Body', "varchar(2048) not null", _text(2048))],
+    'pdf': [
+        ('Body', "varchar(2048)", _text(2048, nullable=True)),
+        ('Link', "http(s) link ending in .pdf", lambda v: v is None or (HTTP_RE.match(v) and PDF_RE.search(v))),
+    ],
+    'image': [
+        ('Size', "> 0", lambda v: v > 0),
+        ('Link', "http(s) link to a jpg, jpeg, png or gif", lambda v: v is None or (HTTP_RE.match(v) and IMAGE_RE.search(v))),
+    ],
+    'video': [
+        ('Duration', "> 0", lambda v: v > 0),
+        ('Link', "null or an http(s) link", lambda v: v is None or HTTP_RE.match(v)),
+    ],
+    'website': [('Link', "http(s) link", lambda v: isinstance(v, str) and HTTP_RE.match(v))],
+}
+
+_CHECK_INDEXES = {table: [(COLUMNS[table].index(column), column, rule, predicate)
+                          for column, rule, predicate in checks]
+                  for table, checks in CHECKS.items()}
+
+
+def check_row(table, row):
+    for index, column, rule, predicate in _CHECK_INDEXES.get(table, ()):
+        if not predicate(row[index]):
+            raise ValueError(f"{table}.{column} must be {rule}, got {row[index]!r} in {row!r}")
+
+
+# ---------- generation ----------
+
+def parse_scale(value):
+    value = value.lower()
+    return SCALES[value] if value in SCALES else int(value)
+
+
+# Draws ranks 0..n-1 with P(k) proportional to 1 / (k + 1) ** s
+class Zipf:
+    def __init__(self, n, s=1.1, rng=random):
+        self.rng = rng
+        total = 0.0
+        self.cumulative = []
+        for k in range(n):
+            total += 1.0 / (k + 1) ** s
+            self.cumulative.append(total)
+        self.total = total
+
+    def sample(self, rng=None):
+        return bisect.bisect_left(self.cumulative, (rng or self.rng).random() * self.total)
+
+
+def _rating_draws(count, zipf, order, students, seed):
+    """(resource id, poster index, score, days ago) for each rating, the same on every call."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield (order[zipf.sample(rng)], rng.randrange(students),
+               round(min(5.0, max(0.0, rng.gauss(3.8, 1.0))), 1), rng.randrange(365))
+
+
+def generate(resources, seed=457, zipf_s=1.1, offsets=None, today=None):
+    """Yields (table, row) for a dataset of `resources` resources, rows matching COLUMNS[table].
+
+    Tables come out interleaved (a resource is followed by its subtype row),
+    but a row never precedes the rows it references. offsets maps
+    user/course/resource/rating to the highest id already in the database."""
+    offsets = offsets or {}
+    user_base = offsets.get('user', 0)
+    course_base = offsets.get('course', 0)
+    resource_base = offsets.get('resource', 0)
+    rating_base = offsets.get('rating', 0)
+    today = today or date.today()
+    rng = random.Random(seed)
+    students = max(100, resources // 20)
+    professors = max(5, students // 50)
+    courses = professors * 3
+    ratings = resources * 3
+
+    for subject in SUBJECTS:
+        yield 'subject', subject
+
+    def course_subject(cid):
+        return SUBJECTS[cid % len(SUBJECTS)][0]
+
+    # Students take four courses each; their Courses column lists the subjects
+    enrollments = [sorted(rng.sample(range(course_base + 1, course_base + courses + 1), min(4, courses)))
+                   for _ in range(students)]
+    names = []
+    for i in range(students):
+        uid = user_base + i + 1
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {uid}"
+        names.append(name)
+        subjects = ','.join(sorted({course_subject(cid) for cid in enrollments[i]}))
+        yield 'user', (uid, name, subjects, 'password', False)
+        yield 'student', (uid,)
+    for i in range(professors):
+        uid = user_base + students + i + 1
+        name = f"Dr. {rng.choice(LAST_NAMES)} {uid}"
+        names.append(name)
+        taught = ','.join(sorted({course_subject(course_base + i * 3 + c) for c in range(1, 4)}))
+        yield 'user', (uid, name, taught, 'password', True)
+        yield 'professor', (uid, rng.random() < 0.3)
+
+    for i in range(1, courses + 1):
+        cid = course_base + i
+        code, subject_name = SUBJECTS[cid % len(SUBJECTS)]
+        prof_id = user_base + students + 1 + (i - 1) // 3
+        catalog = 100 + cid % 900
+        yield 'course', (cid, f"{rng.randint(1, 9):02d}", f"{rng.choice(COURSE_TITLES)} {subject_name}"[:50],
+                         rng.choice(SESSIONS), rng.randint(2015, today.year), code, catalog, prof_id)
+        yield 'teaches', (prof_id, cid)
+    for i, course_ids in enumerate(enrollments):
+        for cid in course_ids:
+            yield 'enrolled', (user_base + i + 1, cid)
+    del enrollments
+
+    # A first pass over the ratings gives every resource row its totals;
+    # the second pass below replays the same draws to emit the rating rows
+    zipf = Zipf(resources, zipf_s)
+    order = list(range(resource_base + 1, resource_base + resources + 1))
+    rng.shuffle(order)
+    score_sums = array('d', bytes(8 * resources))
+    score_counts = array('L', bytes(array('L').itemsize * resources))
+    rating_seed = rng.randrange(2 ** 32)
+    for resource_id, _, score, _ in _rating_draws(ratings, zipf, order, students, rating_seed):
+        score_sums[resource_id - resource_base - 1] += score
+        score_counts[resource_id - resource_base - 1] += 1
+
+    for rid in range(resource_base + 1, resource_base + resources + 1):
+        fmt = FORMATS[rid % len(FORMATS)]
+        code = SUBJECTS[rid % len(SUBJECTS)][0]
+        word = rng.choice(WORDS)
+        topic = f"{code} {word} {rid % 1000}"[:25]
+        keywords = ', '.join(rng.sample(WORDS, 2))[:25] if rng.random() < 0.9 else None
+        created = today - timedelta(days=rng.randrange(3 * 365))
+        score_sum, count = round(score_sums[rid - resource_base - 1], 1), score_counts[rid - resource_base - 1]
+        rating = round(score_sum / count, 1) if count else None
+        yield 'resource', (rid, created, created + timedelta(days=rng.randrange(30)),
+                           names[rng.randrange(students + professors)], topic, keywords,
+                           rating, score_sum, count, fmt, rng.random() < 0.2)
+
+        slug = f"{code.lower()}/{word}-{rid}"
+        if fmt == 'Note':
+            text = ' '.join(rng.choices(WORDS, k=rng.randint(20, 200)))
+            yield 'note', (rid, (text.capitalize() + '.')[:2048])
+        elif fmt == 'Video':
+            link = f"https://www.youtube.com/watch?v={rid:011x}" if rng.random() < 0.95 else None
+            yield 'video', (rid, rng.randint(30, 3600), link)
+        elif fmt == 'Website':
+            yield 'website', (rid, f"{rng.choice(SITES)}/{slug}")
+        elif fmt == 'Pdf':
+            body = f"Lecture notes on {word} for {code}" if rng.random() < 0.5 else None
+            yield 'pdf', (rid, body, f"{rng.choice(SITES)}/{slug}.pdf")
+        else:
+            yield 'image', (rid, rng.randint(10_000, 5_000_000),
+                            f"{rng.choice(SITES)}/img/{slug}.{rng.choice(IMAGE_EXTENSIONS)}")
+    del score_sums, score_counts
+
+    for i, (resource_id, poster, score, days_ago) in enumerate(
+            _rating_draws(ratings, zipf, order, students, rating_seed), start=rating_base + 1):
+        yield 'rating', (i, names[poster], resource_id, score, today - timedelta(days=days_ago))
+
+
+def checked(rows):
+    for table, row in rows:
+        check_row(table, row)
+        yield table, row
+
+
+# ---------- csv / LOAD DATA ----------
+
+CSV_SPECIAL_RE = re.compile(r'[,"\\\n\r]')
+
+
+# One field as LOAD DATA reads it with the options in load_data_sql: \N for NULL,
+# quotes around anything with a separator, backslash escapes inside
+def csv_field(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, date):
+        return value.isoformat()
+    value = str(value)
+    if CSV_SPECIAL_RE.search(value):
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+        return f'"{value}"'
+    return value
+
+
+def load_data_sql(path, table, columns):
+    path = os.path.abspath(path).replace('\\', '\\\\').replace("'", "\\'")
+    # Subjects may already exist from the sample data
+    ignore = ' IGNORE' if table == 'subject' else ''
+    return (f"LOAD DATA LOCAL INFILE '{path}'{ignore} INTO TABLE {table}\n"
+            f"  CHARACTER SET utf8mb4\n"
+            f"  FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\'\n"
+            f"  LINES TERMINATED BY '\\n'\n"
+            f"  IGNORE 1 LINES\n"
+            f"  ({', '.join(columns)});\n")
+
+
+def write_csv(rows, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    files, counts = {}, {}
+    try:
+        for table, row in rows:
+            f = files.get(table)
+            if f is None:
+                f = files[table] = open(os.path.join(out_dir, f"{table}.csv"), 'w', encoding='utf-8', newline='')
+                f.write(','.join(COLUMNS[table]) + '\n')
+                counts[table] = 0
+            f.write(','.join(map(csv_field, row)) + '\n')
+            counts[table] += 1
+    finally:
+        for f in files.values():
+            f.close()
+
+    with open(os.path.join(out_dir, 'load.sql'), 'w', encoding='utf-8') as f:
+        f.write("-- Generated by generate_data.py, run with: mysql --local-infile=1 ... lobsternotes < load.sql\n")
+        # Rows are consistent by construction, so skip the per-row checks while loading
+        f.write("SET SESSION foreign_key_checks = 0;\nSET SESSION unique_checks = 0;\n")
+        f.write("\n")
+        for table in COLUMNS:
+            if table in counts:
+                f.write(load_data_sql(os.path.join(out_dir, f"{table}.csv"), table, COLUMNS[table]) + '\n')
+        f.write("SET SESSION foreign_key_checks = 1;\nSET SESSION unique_checks = 1;\n\n")
+        f.write("-- Derived tables the API reads from\n")
+        f.write("CALL SP_Resource_Summary_Rebuild();\nCALL SP_Resource_Subject_Refresh(0, 4294967295);\n\n")
+        f.write("-- Tell the API workers their cached responses are out of date\n")
+        f.write("CALL SP_Cache_Version_Bump('resources');\nCALL SP_Cache_Version_Bump('courses');\n"
+                "CALL SP_Cache_Version_Bump('users');\n")
+    return counts
+
+
+# ---------- scraper json ----------
+
+# generate() table -> (scraper section, keys in the order the scrapers write them)
+JSON_SECTIONS = {
+    'resource': ('Resource', ('ResourceID', 'Date', 'DateFor', 'Author', 'Topic', 'Keywords',
+                              'Rating', 'Format', 'isVerified')),
+    'note': ('Note', ('ResourceID', 'Body')),
+    'pdf': ('pdf', ('ResourceID', 'Link', 'Body')),
+    'image': ('Image', ('ResourceID', 'Link', 'Size')),
+    'video': ('Video', ('ResourceID', 'Duration', 'Link')),
+    'website': ('Website', ('ResourceID', 'Link')),
+}
+
+
+def scraper_row(table, row):
+    values = dict(zip(COLUMNS[table], row))
+    if table == 'resource':
+        values['Date'] = values['Date'].isoformat()
+        values['DateFor'] = values['DateFor'].isoformat()
+        values['Author'] = SCRAPER_AUTHOR
+    elif table == 'pdf' and values['Body'] is None:
+        # data_cleaner.py always gives a pdf a Body, falling back to its link
+        values['Body'] = values['Link']
+    return {key: values[key] for key in JSON_SECTIONS[table][1]}
+
+
+def write_json(rows, out_path):
+    """Streams each section to a temp file, then joins them into one scraper-shaped document."""
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    counts = {section: 0 for section, _ in JSON_SECTIONS.values()}
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        parts = {section: open(os.path.join(tmp, section), 'w+', encoding='utf-8')
+                 for section, _ in JSON_SECTIONS.values()}
+        try:
+            for table, row in rows:
+                if table not in JSON_SECTIONS:
+                    continue
+                section = JSON_SECTIONS[table][0]
+                f = parts[section]
+                f.write((',\n' if counts[section] else '\n') + json.dumps(scraper_row(table, row), ensure_ascii=False))
+                counts[section] += 1
+
+            with open(out_path, 'w', encoding='utf-8') as out:
+                out.write('{')
+                for i, (section, f) in enumerate(parts.items()):
+                    out.write(f'{"," if i else ""}\n"{section}": [')
+                    f.seek(0)
+                    shutil.copyfileobj(f, out)
+                    out.write('\n]' if counts[section] else ']')
+                out.write('\n}\n')
+        finally:
+            for f in parts.values():
+                f.close()
+    return counts
+
+
+# ---------- cli ----------
+
+def parse_offsets(value):
+    offsets = {}
+    for part in filter(None, (value or '').split(',')):
+        key, _, number = part.partition('=')
+        if key not in ('user', 'course', 'resource', 'rating'):
+            raise SystemExit(f"Unknown offset {key}, expected user, course, resource or rating")
+        offsets[key] = int(number)
+    return offsets
+
+
+def database_offsets():
+    import MySQLdb
+
+    socket_path = next((p for p in socket_paths if os.path.exists(p)), '/tmp/mysql.sock')
+    conn = MySQLdb.connect(host='localhost', user='admin', passwd='admin',
+                           db='lobsternotes', unix_socket=socket_path)
+    cursor = conn.cursor()
+    try:
+        offsets = {}
+        for key, table, column in (('user', 'user', 'UserID'), ('course', 'course', 'CourseID'),
+                                   ('resource', 'resource', 'ResourceID'), ('rating', 'rating', 'RatingID')):
+            cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+            offsets[key] = int(cursor.fetchone()[0])
+        return offsets
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generate a synthetic Lobster Notes dataset")
+    p.add_argument('format', choices=['csv', 'json'], help="csv files for LOAD DATA or one scraper-shaped JSON file")
+    p.add_argument('-o', '--output', required=True, help="Directory for csv, file for json")
+    p.add_argument('--scale', default='10k', help="Resources to generate: 10k, 100k, 1m or a number")
+    p.add_argument('--seed', type=int, default=457)
+    p.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of ratings per resource")
+    p.add_argument('--offsets', help="Highest existing ids, e.g. user=3,course=1,resource=0,rating=0")
+    p.add_argument('--from-db', action='store_true', help="Read the offsets from the local database")
+    p.add_argument('--no-check', action='store_true', help="Skip checking rows against the table constraints")
+    args = p.parse_args()
+
+    offsets = database_offsets() if args.from_db else parse_offsets(args.offsets)
+    rows = generate(parse_scale(args.scale), seed=args.seed, zipf_s=args.zipf, offsets=offsets)
+    if not args.no_check:
+        rows = checked(rows)
+
+    start = time.perf_counter()
+    try:
+        counts = write_csv(rows, args.output) if args.format == 'csv' else write_json(rows, args.output)
+    except ValueError as e:
+        print(f"Error generating data: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    for name, count in counts.items():
+        print(f"{name:<12}{count:>10} rows")
+    total = sum(counts.values())
+    print(f"Wrote {total} rows to {args.output} in {elapsed:.1f} s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+gunicorn settings for running the API in production (see run_prod.sh).
+
+    gunicorn -c gunicorn.conf.py app:app
+
+app.py is imported once in the master (preload_app) and the workers are
+forked from it, so routes, config and the optional search index are
+set up a single time. Workers are recycled after max_requests (plus
+jitter so they do not all restart together) and get graceful_timeout
+seconds to finish in-flight requests. Backups run in a process of their
+own (app.run_backups), started by the master once it is listening and
+stopped after the workers when the server shuts down, so no worker and
+no forked copy of the master ever backs up.
+
+With the search index enabled each worker keeps its own copy. Writes
+served by another worker reach it through the periodic version check in
+app.get_resource_index (LOBSTER_SEARCH_INDEX_CHECK_INTERVAL).
+
+Send SIGHUP to roll the workers onto new settings. With preload_app the
+application code itself is only reloaded by a full restart.
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+bind = os.environ.get('LOBSTER_BIND', '127.0.0.1:8080')
+workers = int(os.environ.get('LOBSTER_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# app.py reads this to refuse per-process cache versions with more than one worker
+os.environ['LOBSTER_WORKERS'] = str(workers)
+# Threads per worker; keep at or below MYSQL_POOL_SIZE in app.py so threads never wait on the pool
+threads = int(os.environ.get('LOBSTER_THREADS', '4'))
+worker_class = 'gthread'
+preload_app = os.environ.get('LOBSTER_PRELOAD', '1') == '1'
+
+# Graceful recycling
+max_requests = int(os.environ.get('LOBSTER_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.environ.get('LOBSTER_MAX_REQUESTS_JITTER', '500'))
+graceful_timeout = int(os.environ.get('LOBSTER_GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.environ.get('LOBSTER_TIMEOUT', '60'))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+proc_name = 'lobsternotes'
+
+backup_process = None
+
+
+# Runs in the master once it is listening, before any worker serves a request
+def when_ready(server):
+    global backup_process
+    import app
+    with app.app.app_context():
+        if app.app.config['SEARCH_INDEX_ENABLED'] and preload_app:
+            # Built before the fork so workers share the pages copy-on-write
+            app.get_resource_index()
+            server.log.info(f"Search index built: {len(app.resource_index)} resources")
+    # A child process rather than a thread: threads do not survive the fork, and a
+    # non-daemon thread in the master would hold up its exit
+    backup_process = subprocess.Popen([sys.executable, '-c', 'import app; app.run_backups()'],
+                                      cwd=os.path.dirname(os.path.abspath(app.__file__)))
+    server.log.info(f"Backups running in pid {backup_process.pid}")
+
+
+# Flush queued ratings before a recycled or stopping worker exits
+def worker_exit(server, worker):
+    import app
+    app.rating_queue.stop()
+
+
+# Stop backups once the workers are gone; run_backups takes a final full backup on SIGTERM
+def on_exit(server):
+    if backup_process is None or backup_process.poll() is not None:
+        return
+    backup_process.terminate()
+    try:
+        backup_process.wait(timeout=graceful_timeout)
+    except subprocess.TimeoutExpired:
+        server.log.warning(f"Backup process {backup_process.pid} still running after {graceful_timeout}s")
@@ -0,0 +1,385 @@
+"""
+Write-behind ingestion for rating submissions.
+
+submit_rating validates a rating and enqueues it; a background thread
+flushes batches with one multi-row INSERT into rating and one running
+total update per touched ResourceID. Every queued rating is first
+appended to a local spool file so a crash before the flush loses
+nothing: the next process replays whatever was not yet committed.
+Delivery is at-least-once, so a crash between the database commit and
+the spool checkpoint can replay that batch.
+
+A flush that fails because of the connection or the server (MySQL down,
+pool timeout, lock wait) is retried with exponential backoff up to
+max_backoff seconds between attempts, for as long as it takes. A flush
+that fails because of its rows (an integrity or data error) is retried
+one rating per transaction, and only the ratings that fail on their own
+are moved to ratings-rejected.jsonl in the spool directory, so one bad
+rating cannot hold up or take down the ones around it.
+
+Request threads append to the spool under the queue lock but fsync
+outside it. One fsync covers every rating written before it started, so
+concurrent submissions share it (group commit) instead of queueing
+behind each other's disk writes.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from user_resolver import UserResolver, error_code
+
+# Errors caused by the rows themselves: the same batch would fail again however often it is retried
+ROW_ERROR_CLASSES = ('IntegrityError', 'DataError')
+ER_SIGNAL_EXCEPTION = 1644            # SIGNAL from a stored procedure
+ER_CHECK_CONSTRAINT_VIOLATED = 3819
+ROW_ERROR_CODES = (ER_SIGNAL_EXCEPTION, ER_CHECK_CONSTRAINT_VIOLATED)
+
+
+def is_row_error(error):
+    if any(cls.__name__ in ROW_ERROR_CLASSES for cls in type(error).__mro__):
+        return True
+    return error_code(error) in ROW_ERROR_CODES
+
+
+class RatingQueue:
+    def __init__(self, pool, spool_dir, batch_size=200, flush_interval=1.0, fsync=True, on_flush=None,
+                 max_backoff=30.0, user_resolver=None):
+        self.pool = pool
+        self.spool_dir = spool_dir
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.max_backoff = max_backoff
+        # Posters are resolved (and created) the same way as on the synchronous write paths
+        self.user_resolver = user_resolver or UserResolver()
+
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._thread = None
+        self._pid = None
+        self._spool = None
+        self._seq = 0
+        self._stopping = False
+        # Spool lines written and fsynced by this process, for group commit
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def _spool_path(self, pid):
+        return os.path.join(self.spool_dir, f"ratings-{pid}.spool")
+
+    def _done_path(self, pid):
+        return os.path.join(self.spool_dir, f"ratings-{pid}.done")
+
+    def _reject_path(self):
+        return os.path.join(self.spool_dir, "ratings-rejected.jsonl")
+
+    # Ratings in a spool file after its last committed sequence number
+    def _read_uncommitted(self, pid):
+        done = 0
+        try:
+            with open(self._done_path(pid), 'r') as f:
+                done = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            pass
+        records = []
+        try:
+            with open(self._spool_path(pid), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    if record['seq'] > done:
+                        records.append(record['rating'])
+        except OSError:
+            pass
+        return records
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    # Start the flusher in this process, adopting spools left by dead processes
+    def _start(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._pid = os.getpid()
+        self._pending = deque()
+        self._seq = 0
+        self._written = self._synced = 0
+        self._spool = open(self._spool_path(self._pid), 'a', encoding='utf-8')
+
+        replay = self._read_uncommitted(self._pid)
+        orphans = []
+        for path in glob.glob(os.path.join(self.spool_dir, 'ratings-*.spool')):
+            try:
+                pid = int(os.path.basename(path)[len('ratings-'):-len('.spool')])
+            except ValueError:
+                continue
+            if pid != self._pid and not self._pid_alive(pid):
+                replay.extend(self._read_uncommitted(pid))
+                orphans.append(pid)
+
+        self._truncate_spool()
+        for rating in replay:
+            self._append(rating)
+        if replay and self.fsync:
+            os.fsync(self._spool.fileno())
+            self._synced = self._written
+        for pid in orphans:
+            for path in (self._spool_path(pid), self._done_path(pid)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if replay:
+            print(f"Rating queue replaying {len(replay)} spooled ratings")
+
+        self._thread = threading.Thread(target=self._run, name='rating-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    # Caller holds _cond; the line reaches the disk with the next _sync
+    def _append(self, rating):
+        self._seq += 1
+        self._spool.write(json.dumps({'seq': self._seq, 'rating': rating}) + '\n')
+        self._spool.flush()
+        self._written += 1
+        self._pending.append((self._seq, rating))
+
+    # fsync the spool up to at least line `written`. Whoever gets the lock syncs everything
+    # written so far, so the threads that waited on it find their lines already on disk
+    def _sync(self, written):
+        with self._sync_lock:
+            if self._synced >= written:
+                return
+            with self._cond:
+                target = self._written
+                fd = self._spool.fileno()
+            os.fsync(fd)
+            self._synced = target
+
+    def _truncate_spool(self):
+        self._spool.seek(0)
+        self._spool.truncate()
+        self._seq = 0
+        self._write_done(0)
+
+    def _write_done(self, seq):
+        tmp = self._done_path(self._pid) + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(str(seq))
+        os.replace(tmp, self._done_path(self._pid))
+
+    # rating: {"ResourceID", "Poster", "Score", "Date"}, already validated
+    def enqueue(self, rating):
+        with self._cond:
+            if self._pid != os.getpid():
+                # First use in this process (or a forked worker)
+                self._start()
+            self._append(rating)
+            written = self._written
+            self.enqueued += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        if self.fsync:
+            self._sync(written)
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            with self._cond:
+                if backoff and not self._stopping:
+                    self._cond.wait(backoff)
+                if not self._pending and not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                if len(self._pending) < self.batch_size and not self._stopping:
+                    # Give a partial batch the rest of the interval to fill up
+                    self._cond.wait(self.flush_interval)
+                batch = [self._pending[i] for i in range(min(self.batch_size, len(self._pending)))]
+                stopping = self._stopping
+            if not batch:
+                if stopping:
+                    return
+                continue
+            try:
+                self._flush(batch)
+                backoff = 0.0
+            except Exception as e:
+                # The database is unreachable or refused the transaction: keep the batch and retry
+                with self._cond:
+                    self.failures += 1
+                if stopping:
+                    # Still in the spool, the next process replays it
+                    print(f"Rating queue stopping with {len(self._pending)} unflushed ratings spooled: {e}")
+                    return
+                backoff = min(self.max_backoff, max(self.flush_interval, backoff * 2))
+                print(f"Error flushing rating batch, retrying in {backoff:.1f} s: {e}")
+
+    def _flush(self, batch):
+        start = time.monotonic()
+        ratings = [rating for _, rating in batch]
+        try:
+            valid = self._write(ratings)
+        except Exception as e:
+            if not is_row_error(e):
+                raise
+            with self._cond:
+                self.failures += 1
+            print(f"Rating batch refused ({e}), writing its ratings one at a time")
+            # A poster deleted since it was cached fails the batch too; look them up again
+            for poster in {r['Poster'] for r in ratings}:
+                self.user_resolver.forget(poster)
+            self._flush_each(batch)
+            return
+        self._finish(batch, valid, time.monotonic() - start)
+
+    # One transaction per rating, so only the ratings that fail on their own are rejected.
+    # A connection error here propagates and the rest of the batch is retried with backoff
+    def _flush_each(self, batch):
+        for item in batch:
+            start = time.monotonic()
+            try:
+                valid = self._write([item[1]])
+            except Exception as e:
+                if not is_row_error(e):
+                    raise
+                self._reject(item, e)
+                continue
+            self._finish([item], valid, time.monotonic() - start)
+
+    # Writes ratings in one transaction and returns the ones whose resource still exists
+    def _write(self, ratings):
+        pooled = self.pool.acquire()
+        conn = pooled.raw
+        cursor = None
+        broken = False
+        try:
+            cursor = conn.cursor()
+            # Ratings for resources deleted since they were queued are dropped
+            resource_ids = sorted({r['ResourceID'] for r in ratings})
+            placeholders = ', '.join(['%s'] * len(resource_ids))
+            cursor.execute(f"SELECT ResourceID FROM resource WHERE ResourceID IN ({placeholders})", tuple(resource_ids))
+            existing = {row[0] for row in cursor.fetchall()}
+            valid = [r for r in ratings if r['ResourceID'] in existing]
+
+            if valid:
+                for name in sorted({r['Poster'] for r in valid}):
+                    self.user_resolver.resolve(cursor, name)
+                cursor.executemany(
+                    "INSERT INTO rating (ResourceID, Poster, Score, Date) VALUES (%s, %s, %s, %s)",
+                    [(r['ResourceID'], r['Poster'], r['Score'], r['Date']) for r in valid]
+                )
+
+                # One running total update per touched resource, through the same procedure
+                # SP_Rating_Rate uses, which also carries the new average into resource_summary
+                totals = {}
+                for r in valid:
+                    score_sum, count = totals.get(r['ResourceID'], (0.0, 0))
+                    totals[r['ResourceID']] = (score_sum + float(r['Score']), count + 1)
+                for rid, (score_sum, count) in totals.items():
+                    cursor.execute("CALL SP_Rating_Totals_Add(%s, %s, %s)", (rid, round(score_sum, 1), count))
+            conn.commit()
+            return valid
+        except Exception as e:
+            # After a row error the connection is still good once rolled back
+            broken = not is_row_error(e)
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self.pool.release(pooled, broken=broken)
+
+    # Checkpoint a committed batch and count it
+    def _finish(self, batch, valid, elapsed):
+        with self._cond:
+            self._complete(batch)
+            self.flushed += len(valid)
+            self.dropped += len(batch) - len(valid)
+            self.batches += 1
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            self.total_flush_seconds += elapsed
+
+        if self.on_flush and valid:
+            try:
+                self.on_flush(sorted({r['ResourceID'] for r in valid}))
+            except Exception as e:
+                print(f"Error in rating flush callback: {e}")
+
+    # Drop a handled batch from the head of the queue and checkpoint the spool. Caller holds _cond
+    def _complete(self, batch):
+        for _ in batch:
+            self._pending.popleft()
+        if self._pending:
+            self._write_done(batch[-1][0])
+        else:
+            self._truncate_spool()
+
+    # Move a rating the database refuses on its own to the reject file so later ratings can flush
+    def _reject(self, item, error):
+        rejected_at = datetime.now().isoformat(timespec='seconds')
+        with open(self._reject_path(), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'rating': item[1], 'error': str(error), 'rejected_at': rejected_at}) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        with self._cond:
+            self._complete([item])
+            self.rejected += 1
+        print(f"Rejected rating {item[1]!r}: {error}, see {self._reject_path()}")
+
+    # Flush what is queued and stop the flusher (registered with atexit)
+    def stop(self, timeout=10.0):
+        with self._cond:
+            if self._thread is None or self._pid != os.getpid():
+                return
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    # stats() keys that only ever go up, exported to Prometheus as counters
+    STATS_COUNTERS = ("enqueued", "flushed", "dropped", "batches", "failures", "rejected")
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "batch_size": self.batch_size,
+                "flush_interval_seconds": self.flush_interval,
+                "last_flush_seconds": round(self.last_flush_seconds, 6),
+                "max_flush_seconds": round(self.max_flush_seconds, 6),
+                "avg_flush_seconds": round(self.total_flush_seconds / self.batches, 6) if self.batches else 0.0,
+            }
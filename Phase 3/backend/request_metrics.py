@@ -0,0 +1,351 @@
+"""
+Per-request latency and database timing for the Flask API.
+
+RequestMetrics times every request and, through the cursors handed out
+by mysql.connection, every execute / executemany / callproc it runs.
+For each route it keeps a latency histogram, a histogram of the time
+spent in the database, and totals for queries, rows fetched and
+response bytes. /metrics renders them in the Prometheus text format and
+every response carries a Server-Timing header:
+
+    Server-Timing: app;dur=12.4, db;dur=9.8;desc="3 queries"
+
+Streamed responses are recorded when the stream closes, so their
+latency, rows and bytes cover the whole body; their Server-Timing header
+only covers the work done before the first byte.
+
+init_async_app() adds the same hooks to the Quart app in asgi.py. Its
+aiomysql queries are not MySQLdb cursors, so asgi.py reports them with
+record_query() / record_rows(), and the request state lives in a
+context variable instead of flask.g.
+
+Metrics are per process: under gunicorn each worker reports its own.
+"""
+import contextvars
+import threading
+import time
+
+from flask import g, has_app_context, request
+
+# Upper bounds in seconds, Prometheus' default buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    # Cumulative (le, count) pairs, ending with +Inf
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield repr(bound), total
+        yield '+Inf', self.count
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.db_time = Histogram()
+        self.requests_by_status = {}
+        self.queries = 0
+        self.rows = 0
+        self.response_bytes = 0
+
+
+# Counters for one request, kept on flask.g
+class RequestState:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.response_bytes = 0
+
+
+# State of the Quart request being handled; Flask requests keep theirs on flask.g
+_async_state = contextvars.ContextVar('request_metrics', default=None)
+
+
+def server_timing(state):
+    elapsed = time.perf_counter() - state.start
+    return f'app;dur={elapsed * 1000:.1f}, db;dur={state.db_seconds * 1000:.1f};desc="{state.queries} queries"'
+
+
+# Adds timing to any MySQLdb cursor class. executemany and callproc can call
+# execute internally, so only the outermost call is counted
+class TimedCursorMixin:
+    _timing_depth = 0
+
+    def _timed(self, kind, method, query, args):
+        if self._timing_depth:
+            return method(query, args)
+        self._timing_depth += 1
+        start = time.perf_counter()
+        try:
+            return method(query, args)
+        finally:
+            self._timing_depth -= 1
+            record_query(self, kind, query, args, time.perf_counter() - start)
+
+    def execute(self, query, args=None):
+        return self._timed('execute', super().execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed('executemany', super().executemany, query, args)
+
+    def callproc(self, procname, args=()):
+        return self._timed('callproc', super().callproc, procname, args)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            record_rows(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size)
+        record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        record_rows(len(rows))
+        return rows
+
+
+# Functions called with (cursor, kind, query, args, seconds) after every timed statement,
+# kind being 'execute', 'executemany' or 'callproc' (query is then the procedure name)
+query_observers = []
+
+_timed_classes = {}
+_timed_classes_lock = threading.Lock()
+
+
+def timed_cursor_class(cursorclass):
+    timed = _timed_classes.get(cursorclass)
+    if timed is None:
+        with _timed_classes_lock:
+            timed = _timed_classes.setdefault(
+                cursorclass, type('Timed' + cursorclass.__name__, (TimedCursorMixin, cursorclass), {}))
+    return timed
+
+
+# Stand-in for a MySQLdb connection whose cursors are timed
+class TimedConnection:
+    def __init__(self, raw):
+        self._raw = raw
+
+    def cursor(self, cursorclass=None):
+        return self._raw.cursor(timed_cursor_class(cursorclass or self._raw.cursorclass))
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def _request_state():
+    state = _async_state.get()
+    if state is not None:
+        return state
+    if has_app_context():
+        return g.get('request_metrics')
+    return None
+
+
+def record_query(cursor, kind, query, args, seconds):
+    state = _request_state()
+    if state is not None:
+        state.queries += 1
+        state.db_seconds += seconds
+    for observer in query_observers:
+        try:
+            observer(cursor, kind, query, args, seconds)
+        except Exception as e:
+            print(f"Error in query observer: {e}")
+
+
+def record_rows(count):
+    state = _request_state()
+    if state is not None:
+        state.rows += count
+
+
+class RequestMetrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._routes = {}       # (method, route) -> RouteStats
+        self._collectors = []   # (prefix, function returning a stats dict)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, pool=None):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        if pool is not None:
+            pool.connection_wrapper = TimedConnection
+
+    # Same hooks for a Quart app. They have to be coroutines: Quart runs plain functions on a
+    # thread, where the context variable set for the request would not be seen
+    def init_async_app(self, app):
+        app.before_request(self.before_async_request)
+        app.after_request(self.after_async_request)
+
+    # Export a component's stats() dict as <prefix>_<key>. Keys named in counters only ever go
+    # up and are exported as counters with a _total suffix, everything else as a gauge
+    def add_collector(self, prefix, stats, counters=()):
+        self._collectors.append((prefix, stats, frozenset(counters)))
+
+    def before_request(self):
+        g.request_metrics = RequestState()
+
+    def after_request(self, response):
+        state = g.get('request_metrics')
+        if state is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        key = (request.method, route)
+        status = response.status_code
+
+        response.headers['Server-Timing'] = server_timing(state)
+
+        if response.is_streamed:
+            # Rows fetched while streaming still land on this state through g
+            response.response = self._count_bytes(response.response, state)
+        else:
+            state.response_bytes = response.calculate_content_length() or 0
+        response.call_on_close(lambda: self._record(key, status, state))
+        return response
+
+    async def before_async_request(self):
+        _async_state.set(RequestState())
+
+    async def after_async_request(self, response):
+        from quart import request as async_request
+        from quart.wrappers.response import DataBody, IterableBody
+
+        state = _async_state.get()
+        if state is None:
+            return response
+        route = async_request.url_rule.rule if async_request.url_rule else 'unmatched'
+        key = (async_request.method, route)
+        response.headers['Server-Timing'] = server_timing(state)
+
+        if isinstance(response.response, DataBody):
+            state.response_bytes = len(response.response.data)
+            self._record(key, response.status_code, state)
+        else:
+            response.response = IterableBody(self._count_bytes_async(response.response, key, response.status_code, state))
+        return response
+
+    async def _count_bytes_async(self, body, key, status, state):
+        try:
+            async with body as chunks:
+                async for chunk in chunks:
+                    state.response_bytes += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                    yield chunk
+        finally:
+            self._record(key, status, state)
+
+    @staticmethod
+    def _count_bytes(body, state):
+        try:
+            for chunk in body:
+                state.response_bytes += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        finally:
+            # Closing the inner iterator lets stream_with_context pop its request context
+            if hasattr(body, 'close'):
+                body.close()
+
+    def _record(self, key, status, state):
+        elapsed = time.perf_counter() - state.start
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.latency.observe(elapsed)
+            stats.db_time.observe(state.db_seconds)
+            stats.requests_by_status[status] = stats.requests_by_status.get(status, 0) + 1
+            stats.queries += state.queries
+            stats.rows += state.rows
+            stats.response_bytes += state.response_bytes
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    # ---------- Prometheus text format ----------
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+            def labels(method, route, **extra):
+                pairs = [('method', method), ('route', route)] + list(extra.items())
+                return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in pairs) + '}'
+
+            def histogram(name, help_text, attr):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), stats in routes:
+                    hist = getattr(stats, attr)
+                    for le, count in hist.cumulative():
+                        lines.append(f"{name}_bucket{labels(method, route, le=le)} {count}")
+                    lines.append(f"{name}_sum{labels(method, route)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{labels(method, route)} {hist.count}")
+
+            def counter(name, help_text, attr):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, route), stats in routes:
+                    lines.append(f"{name}{labels(method, route)} {getattr(stats, attr)}")
+
+            histogram('lobster_http_request_duration_seconds', "Request latency by route", 'latency')
+            histogram('lobster_http_request_db_seconds', "Database time per request by route", 'db_time')
+
+            lines.append("# HELP lobster_http_requests_total Requests by route and status")
+            lines.append("# TYPE lobster_http_requests_total counter")
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.requests_by_status.items()):
+                    lines.append(f"lobster_http_requests_total{labels(method, route, status=status)} {count}")
+
+            counter('lobster_http_db_queries_total', "Statements executed by route", 'queries')
+            counter('lobster_http_db_rows_total', "Rows fetched by route", 'rows')
+            counter('lobster_http_response_bytes_total', "Response body bytes by route", 'response_bytes')
+
+        for prefix, stats, counters in self._collectors:
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Error collecting {prefix} metrics: {e}")
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                if key in counters:
+                    name = f"{prefix}_{key}" if key.endswith('_total') else f"{prefix}_{key}_total"
+                    lines.append(f"# TYPE {name} counter")
+                else:
+                    name = f"{prefix}_{key}"
+                    lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Rebuild or check the resource_summary read model.
+
+resource_summary is a materialized copy of the resource_summary_source
+view that the list endpoints read instead of joining the five subtype
+tables. The write paths and ImportData keep it current; this tool
+rebuilds it from scratch or reports rows that have drifted. rebuild
+also re-derives the keyword subject tags in resource_subject.
+
+    python3 resource_summary.py rebuild
+    python3 resource_summary.py check [--fix]
+
+check exits with status 1 when it finds missing, orphaned or stale rows
+(and --fix was not given).
+"""
+import argparse
+import os
+import sys
+import time
+
+import MySQLdb
+
+socket_paths = [
+    os.path.expanduser('~/mysql.sock'),
+    '/tmp/mysql.sock',
+    '/var/run/mysqld/mysqld.sock',
+    '/var/run/mysqld/mysql.sock',
+]
+
+SUMMARY_COLUMNS = ['Date', 'DateFor', 'Author', 'Topic', 'Keywords', 'Format', 'Rating',
+                   'RatingCount', 'isVerified', 'Url', 'Duration', 'ImageSize', 'Snippet']
+
+MISSING_SQL = """
+SELECT src.ResourceID
+FROM resource_summary_source src
+LEFT JOIN resource_summary s ON src.ResourceID = s.ResourceID
+WHERE s.ResourceID IS NULL
+"""
+
+ORPHANED_SQL = """
+SELECT s.ResourceID
+FROM resource_summary s
+LEFT JOIN resource r ON s.ResourceID = r.ResourceID
+WHERE r.ResourceID IS NULL
+"""
+
+# <=> so NULL = NULL counts as equal
+STALE_SQL = """
+SELECT s.ResourceID
+FROM resource_summary s
+JOIN resource_summary_source src ON src.ResourceID = s.ResourceID
+WHERE NOT ({})
+""".format(' AND '.join(f"s.{c} <=> src.{c}" for c in SUMMARY_COLUMNS))
+
+
+def connect():
+    socket_path = next((p for p in socket_paths if os.path.exists(p)), '/tmp/mysql.sock')
+    return MySQLdb.connect(host='localhost', user='admin', passwd='admin',
+                           db='lobsternotes', unix_socket=socket_path)
+
+
+def rebuild(conn):
+    cursor = conn.cursor()
+    try:
+        start = time.perf_counter()
+        cursor.execute("CALL SP_Resource_Summary_Rebuild()")
+        # Tags only get added, so course tags survive a rebuild
+        cursor.execute("CALL SP_Resource_Subject_Refresh(0, 4294967295)")
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM resource_summary")
+        count = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM resource_subject")
+        tags = cursor.fetchone()[0]
+        print(f"Rebuilt resource_summary: {count} rows, {tags} subject tags in {time.perf_counter() - start:.2f} s")
+    finally:
+        cursor.close()
+
+
+def check(conn, fix=False, show=20):
+    cursor = conn.cursor()
+    try:
+        problems = {}
+        for name, query in (('missing', MISSING_SQL), ('orphaned', ORPHANED_SQL), ('stale', STALE_SQL)):
+            cursor.execute(query)
+            problems[name] = [row[0] for row in cursor.fetchall()]
+            ids = problems[name]
+            preview = ', '.join(str(rid) for rid in ids[:show]) + (' ...' if len(ids) > show else '')
+            print(f"{name:<10}{len(ids):>8}   {preview}")
+
+        if not any(problems.values()):
+            print("resource_summary is consistent")
+            return True
+        if not fix:
+            return False
+
+        # Orphans disappear with their resource; refreshing the others rewrites them from the view
+        cursor.executemany("DELETE FROM resource_summary WHERE ResourceID = %s",
+                           [(rid,) for rid in problems['orphaned']])
+        for rid in sorted(set(problems['missing']) | set(problems['stale'])):
+            cursor.execute("CALL SP_Resource_Summary_Refresh(%s, %s)", (rid, rid))
+        conn.commit()
+        print(f"Repaired {sum(len(ids) for ids in problems.values())} rows")
+        return True
+    finally:
+        cursor.close()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Rebuild or check the resource_summary table")
+    sub = p.add_subparsers(dest='command', required=True)
+    sub.add_parser('rebuild', help="Rebuild resource_summary from resource_summary_source")
+    check_parser = sub.add_parser('check', help="Compare resource_summary with resource_summary_source")
+    check_parser.add_argument('--fix', action='store_true', help="Refresh the rows that differ")
+    check_parser.add_argument('--show', type=int, default=20, help="ResourceIDs to print per problem")
+    args = p.parse_args()
+
+    conn = connect()
+    try:
+        if args.command == 'rebuild':
+            rebuild(conn)
+        elif not check(conn, fix=args.fix, show=args.show):
+            sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,448 @@
+"""
+Response cache for read endpoints with tag-based invalidation.
+
+Cached GET responses are keyed on path + query string and carry the
+version of every tag they depend on ("resources", "course:3", ...).
+Write handlers call invalidate() with the tags they touch, which bumps
+those versions so older entries stop matching. Entries also expire after
+a TTL.
+
+Given a variant function (app.requested_stream_format), the representation
+the request negotiated from its Accept header is part of the key as well,
+and every response carries Vary: Accept.
+
+The same tag versions drive conditional GET: each response gets a
+strong ETag built from the cache key and its tag versions, plus a
+Last-Modified from the newest invalidation of those tags. A matching
+If-None-Match / If-Modified-Since is answered with a 304 before the
+handler runs, so no query or serialization happens.
+
+Entries live in an in-process LRU. Given a shared_path, tag versions and
+entries are also kept in a local SQLite file so that every worker on the
+host sees the same invalidations and hands out the same ETags; expired
+entries are purged from it once per TTL. The async handlers make their
+SQLite calls on a small thread pool so they never block the event loop.
+
+Given a version_loader, tag versions come from the database instead:
+the loader returns {tag: (version, modified_at)} from the cache_version
+table, one row per tag, so "resource:3" changes without touching the
+ETag of any other resource. invalidate() then hands the tags to the
+version_bumper, which the write handlers reach once they have committed;
+tools writing outside the API bump the rows themselves. Versions read
+from the database are reused for version_refresh seconds, so a burst of
+reads costs one version query per tag rather than one per request; a
+worker drops its own copy on invalidate() and sees its writes at once.
+If the loader fails the request runs uncached and without validators.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, request
+
+# Response headers worth replaying from the cache
+CACHED_HEADERS = ('Content-Type', 'X-Next-Cursor')
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, ttl=30.0, shared_path=None, enabled=True, version_loader=None,
+                 variant=None, version_bumper=None, version_refresh=1.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_path = shared_path
+        self.enabled = enabled
+        # With conditional off as well as enabled, responses carry no validators at all
+        self.conditional = True
+        self.version_loader = version_loader
+        # Function of the sorted tags a write touched, bumping their database versions
+        self.version_bumper = version_bumper
+        # Seconds a version read from the database is reused for; 0 reads it on every request
+        self.version_refresh = version_refresh
+        # Function of the request returning the negotiated representation, or None for the default
+        self.variant = variant
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires, tag_versions, status, headers, body)
+        self._versions = {}             # tag -> (version, modified_at)
+        self._db_versions = OrderedDict()   # tag -> (read_at, (version, modified_at)), database mode
+        # Bumped by every invalidate(), so a version read that raced a write is not kept
+        self._db_generation = 0
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._executor = None
+        # Versions restart at 0 with the process, so ETags also carry the start time
+        self.epoch = time.time()
+        if shared_path:
+            self._init_shared()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.version_errors = 0
+
+    # ---------- shared store ----------
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.shared_path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _init_shared(self):
+        db = self._db()
+        db.execute("CREATE TABLE IF NOT EXISTS tag_version (tag TEXT PRIMARY KEY, version INTEGER NOT NULL, modified REAL NOT NULL)")
+        db.execute("""CREATE TABLE IF NOT EXISTS entry (
+            key TEXT PRIMARY KEY, expires REAL NOT NULL, tag_versions TEXT NOT NULL,
+            status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL)""")
+        db.execute("CREATE INDEX IF NOT EXISTS entry_expires ON entry (expires)")
+        # All workers share the epoch of whichever one created the store
+        db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+        db.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('epoch', ?)", (self.epoch,))
+        self.epoch = db.execute("SELECT value FROM meta WHERE name = 'epoch'").fetchone()[0]
+
+    # ---------- tag versions ----------
+
+    # Returns (versions, last_modified) for a set of tags
+    def tag_state(self, tags):
+        tags = sorted(set(tags))
+        if self.version_loader is not None:
+            known, stale, generation = self._known_versions(tags)
+            if stale:
+                self._learn_versions(known, stale, self.version_loader(stale), generation)
+            return self.database_state(tags, known)
+        if not self.shared_path:
+            with self._lock:
+                states = [self._versions.get(tag, (0, self.epoch)) for tag in tags]
+        else:
+            placeholders = ', '.join(['?'] * len(tags))
+            rows = {tag: (version, modified) for tag, version, modified in self._db().execute(
+                f"SELECT tag, version, modified FROM tag_version WHERE tag IN ({placeholders})", tags).fetchall()}
+            states = [rows.get(tag, (0, self.epoch)) for tag in tags]
+        versions = tuple(version for version, _ in states)
+        last_modified = max([modified for _, modified in states] + [self.epoch])
+        return versions, last_modified
+
+    # (versions, last_modified) from the {tag: (version, modified_at)} a version loader returned
+    @staticmethod
+    def database_state(tags, rows):
+        states = [rows.get(tag, (0, 0.0)) for tag in tags]
+        return tuple(version for version, _ in states), max([modified for _, modified in states] + [0.0])
+
+    # Database versions still fresh enough to reuse, the tags that have to be read, and the generation they were read at
+    def _known_versions(self, tags):
+        now = time.monotonic()
+        known, stale = {}, []
+        with self._lock:
+            for tag in tags:
+                memo = self._db_versions.get(tag)
+                if memo is not None and now - memo[0] < self.version_refresh:
+                    known[tag] = memo[1]
+                else:
+                    stale.append(tag)
+            return known, stale, self._db_generation
+
+    # Adds the loaded rows of the stale tags to known, keeping them unless a write came in meanwhile
+    def _learn_versions(self, known, stale, rows, generation):
+        now = time.monotonic()
+        with self._lock:
+            keep = self.version_refresh > 0 and generation == self._db_generation
+            for tag in stale:
+                known[tag] = rows.get(tag, (0, 0.0))
+                if keep:
+                    self._db_versions[tag] = (now, known[tag])
+                    self._db_versions.move_to_end(tag)
+            while len(self._db_versions) > self.max_entries:
+                self._db_versions.popitem(last=False)
+
+    def tag_versions(self, tags):
+        return self.tag_state(tags)[0]
+
+    def invalidate(self, *tags):
+        if not tags:
+            return
+        if self.version_loader is not None:
+            self._bump_database(sorted(set(tags)))
+            return
+        now = time.time()
+        with self._lock:
+            self.invalidations += 1
+            for tag in tags:
+                self._versions[tag] = (self._versions.get(tag, (0, now))[0] + 1, now)
+        if self.shared_path:
+            self._db().executemany(
+                "INSERT INTO tag_version (tag, version, modified) VALUES (?, 1, ?) "
+                "ON CONFLICT(tag) DO UPDATE SET version = version + 1, modified = excluded.modified",
+                [(tag, now) for tag in set(tags)])
+
+    # One version_bumper call for everything a write touched; the versions this worker read are dropped afterwards
+    def _bump_database(self, tags):
+        try:
+            if self.version_bumper is not None:
+                self.version_bumper(tags)
+        except Exception as e:
+            with self._lock:
+                self.version_errors += 1
+            print(f"Response cache versions not bumped for {', '.join(tags)}: {e}")
+        with self._lock:
+            self.invalidations += 1
+            self._db_generation += 1
+            for tag in tags:
+                self._db_versions.pop(tag, None)
+
+    # Strong validator for one cache key at the given tag versions
+    def make_etag(self, key, versions):
+        # Database versions never restart, so they need no epoch
+        salt = 'db' if self.version_loader is not None else self.epoch
+        digest = hashlib.sha1(f"{salt}|{key}|{versions}".encode('utf-8')).hexdigest()
+        return digest[:32]
+
+    # ---------- entries ----------
+
+    def get(self, key, versions):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now and entry[1] == versions:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+        if self.shared_path:
+            row = self._db().execute(
+                "SELECT expires, tag_versions, status, headers, body FROM entry WHERE key = ?", (key,)).fetchone()
+            if row and row[0] > now and row[1] == json.dumps(versions):
+                entry = (row[0], versions, row[2], [tuple(h) for h in json.loads(row[3])], row[4])
+                self._store_local(key, entry)
+                return entry
+        return None
+
+    def set(self, key, versions, status, headers, body, ttl=None):
+        entry = (time.time() + (ttl or self.ttl), versions, status, headers, body)
+        self._store_local(key, entry)
+        if self.shared_path:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO entry (key, expires, tag_versions, status, headers, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry[0], json.dumps(versions), status, json.dumps(headers), body))
+            self._purge_expired(db)
+
+    # Entries are only replaced by key, so without this the shared file keeps every key ever seen
+    def _purge_expired(self, db):
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < self.ttl:
+                return
+            self._last_purge = now
+        db.execute("DELETE FROM entry WHERE expires <= ?", (now,))
+
+    def _store_local(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared_path:
+            self._db().execute("DELETE FROM entry")
+
+    # stats() keys that only ever go up, exported to Prometheus as counters
+    STATS_COUNTERS = ("hits", "misses", "not_modified", "invalidations", "version_errors")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "shared": bool(self.shared_path),
+                "versions": "database" if self.version_loader is not None else "shared" if self.shared_path else "process",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+                "version_errors": self.version_errors,
+            }
+
+    # ---------- route decorator ----------
+
+    # Cache key, tag versions, ETag and Last-Modified for the current request.
+    # state is the tag_state() of tags when the caller already has it
+    def _validators(self, req, tags, state=None):
+        key = req.path + '?' + '&'.join(
+            f"{k}={v}" for k, v in sorted(req.args.items(multi=True)))
+        variant = self.variant(req) if self.variant is not None else None
+        if variant:
+            key += '#' + variant
+        # Versions are read before the handler runs, so a write that lands
+        # mid-request leaves this entry and its ETag already out of date
+        versions, last_modified = state or self.tag_state(tags)
+        etag = self.make_etag(key, versions)
+        last_modified = datetime.fromtimestamp(int(last_modified) + 1, timezone.utc)
+        return key, versions, etag, last_modified
+
+    # The request is served without the cache when its tag versions cannot be read
+    def _versions_failed(self, error):
+        with self._lock:
+            self.version_errors += 1
+            first = self.version_errors == 1
+        if first:
+            print(f"Response cache bypassed, tag versions unavailable: {error}")
+
+    # 304 for the request, or None
+    def _not_modified(self, req, response_class, etag, last_modified):
+        if not is_not_modified(etag, last_modified, req):
+            return None
+        with self._lock:
+            self.not_modified += 1
+        response = response_class(status=304)
+        set_validators(response, etag, last_modified)
+        return response
+
+    # Response for a cache entry, or None on a miss
+    def _hit(self, response_class, entry, etag, last_modified):
+        if entry is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        response = response_class(entry[4], status=entry[2], headers=entry[3])
+        response.headers['X-Cache'] = 'HIT'
+        set_validators(response, etag, last_modified)
+        return response
+
+    # Runs fn on the cache's own threads when it touches the shared store, so the event loop never waits on SQLite
+    async def _off_loop(self, fn, *args):
+        if not self.shared_path:
+            return fn(*args)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='response-cache')
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @staticmethod
+    def _cacheable(response):
+        return not isinstance(response, tuple) and getattr(response, 'status_code', None) == 200 \
+            and not getattr(response, 'is_streamed', False)
+
+    def _remember(self, response, body, key, versions, ttl):
+        with self._lock:
+            self.misses += 1
+        headers = [(h, response.headers[h]) for h in CACHED_HEADERS if h in response.headers]
+        self.set(key, versions, response.status_code, headers, body, ttl)
+        response.headers['X-Cache'] = 'MISS'
+
+    # Responses differ by Accept once a variant function is set, so shared caches must key on it too
+    def _add_vary(self, response):
+        if self.variant is not None and not isinstance(response, tuple):
+            response.vary.add('Accept')
+        return response
+
+    # tags: function of the view kwargs returning the tags the response depends on
+    def cached(self, tags, ttl=None):
+        def decorator(view):
+            def serve(*args, **kwargs):
+                if request.method != 'GET' or not (self.enabled or self.conditional):
+                    return view(*args, **kwargs)
+
+                try:
+                    key, versions, etag, last_modified = self._validators(request, tags(**kwargs))
+                except Exception as e:
+                    self._versions_failed(e)
+                    return view(*args, **kwargs)
+                response = self._not_modified(request, Response, etag, last_modified)
+                if response is None and self.enabled:
+                    response = self._hit(Response, self.get(key, versions), etag, last_modified)
+                if response is not None:
+                    return response
+
+                response = view(*args, **kwargs)
+                if not self._cacheable(response):
+                    return response
+                set_validators(response, etag, last_modified)
+                if self.enabled:
+                    self._remember(response, response.get_data(), key, versions, ttl)
+                return response
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                return self._add_vary(serve(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    # Same as cached() for the async Quart handlers in asgi.py, sharing entries and tag versions.
+    # version_loader: async twin of self.version_loader, awaited instead of it
+    def cached_async(self, tags, ttl=None, version_loader=None):
+        from quart import Response as AsyncResponse, request as async_request
+        from quart.wrappers.response import DataBody
+
+        def decorator(view):
+            async def serve(*args, **kwargs):
+                if async_request.method != 'GET' or not (self.enabled or self.conditional):
+                    return await view(*args, **kwargs)
+
+                try:
+                    if version_loader is not None and self.version_loader is not None:
+                        db_tags = sorted(set(tags(**kwargs)))
+                        known, stale, generation = self._known_versions(db_tags)
+                        if stale:
+                            self._learn_versions(known, stale, await version_loader(stale), generation)
+                        state = self.database_state(db_tags, known)
+                    else:
+                        state = await self._off_loop(self.tag_state, tags(**kwargs))
+                    key, versions, etag, last_modified = self._validators(async_request, tags(**kwargs), state)
+                except Exception as e:
+                    self._versions_failed(e)
+                    return await view(*args, **kwargs)
+                response = self._not_modified(async_request, AsyncResponse, etag, last_modified)
+                if response is None and self.enabled:
+                    entry = await self._off_loop(self.get, key, versions)
+                    response = self._hit(AsyncResponse, entry, etag, last_modified)
+                if response is not None:
+                    return response
+
+                response = await view(*args, **kwargs)
+                # Streamed bodies are async generators, only buffered ones are kept
+                if not self._cacheable(response) or not isinstance(response.response, DataBody):
+                    return response
+                set_validators(response, etag, last_modified)
+                if self.enabled:
+                    await self._off_loop(self._remember, response, await response.get_data(), key, versions, ttl)
+                return response
+
+            @wraps(view)
+            async def wrapper(*args, **kwargs):
+                return self._add_vary(await serve(*args, **kwargs))
+            return wrapper
+        return decorator
+
+
+# If-None-Match wins over If-Modified-Since when both are sent
+def is_not_modified(etag, last_modified, req=request):
+    if req.if_none_match:
+        return req.if_none_match.contains(etag)
+    if req.if_modified_since:
+        return last_modified <= req.if_modified_since
+    return False
+
+
+# Clients must revalidate every time, which is cheap now that it can end in a 304
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
@@ -0,0 +1,49 @@
+#!/bin/bash
+# Production launcher for the ASGI mode (asgi.py) under hypercorn.
+#   LOBSTER_WORKERS          worker processes (default: one per CPU)
+#   LOBSTER_BIND             address to listen on (default: 127.0.0.1:8080)
+#   LOBSTER_ASYNC_POOL_SIZE  async MySQL connections per worker (default: 20)
+# Each worker also keeps the Flask pool (MYSQL_POOL_SIZE in app.py) for the routes Flask serves.
+# Backups run in one process next to the workers (app.run_backups), stopped when hypercorn exits
+SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/../.." && pwd)"
+
+# Activate virtual environment if it exists
+if [ -f "$PROJECT_ROOT/lobsterenv/bin/activate" ]; then
+    source "$PROJECT_ROOT/lobsterenv/bin/activate"
+fi
+
+# Set LD_LIBRARY_PATH if mysql lib exists
+if [ -d "$PROJECT_ROOT/../mysql/lib" ]; then
+    export LD_LIBRARY_PATH="$PROJECT_ROOT/../mysql/lib:$LD_LIBRARY_PATH"
+fi
+
+WORKERS="${LOBSTER_WORKERS:-$(nproc 2>/dev/null || echo 2)}"
+export LOBSTER_WORKERS="$WORKERS"
+BIND="${LOBSTER_BIND:-127.0.0.1:8080}"
+
+cd "$SCRIPT_DIR"
+python3 -c 'import app; app.run_backups()' &
+BACKUP_PID=$!
+
+hypercorn asgi:application \
+    --workers "$WORKERS" \
+    --bind "$BIND" \
+    --worker-class asyncio \
+    --keep-alive 5 \
+    --graceful-timeout 30 \
+    --access-logfile - \
+    "$@" &
+SERVER_PID=$!
+
+# Pass TERM/INT on to hypercorn, then stop the backups once it has shut down
+trap 'kill -TERM $SERVER_PID 2>/dev/null' TERM INT
+wait $SERVER_PID
+STATUS=$?
+while kill -0 $SERVER_PID 2>/dev/null; do
+    wait $SERVER_PID
+    STATUS=$?
+done
+kill -TERM $BACKUP_PID 2>/dev/null
+wait $BACKUP_PID
+exit $STATUS
@@ -0,0 +1,22 @@
+#!/bin/bash
+# Production launcher: runs app.py under gunicorn with the settings in gunicorn.conf.py.
+#   LOBSTER_WORKERS       worker processes (default: 2 * CPUs + 1)
+#   LOBSTER_THREADS       threads per worker (default: 4)
+#   LOBSTER_BIND          address to listen on (default: 127.0.0.1:8080)
+#   LOBSTER_MAX_REQUESTS  requests before a worker is recycled (default: 5000)
+# kill -HUP <master pid> rolls the workers gracefully, kill -TERM stops the server
+SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/../.." && pwd)"
+
+# Activate virtual environment if it exists
+if [ -f "$PROJECT_ROOT/lobsterenv/bin/activate" ]; then
+    source "$PROJECT_ROOT/lobsterenv/bin/activate"
+fi
+
+# Set LD_LIBRARY_PATH if mysql lib exists
+if [ -d "$PROJECT_ROOT/../mysql/lib" ]; then
+    export LD_LIBRARY_PATH="$PROJECT_ROOT/../mysql/lib:$LD_LIBRARY_PATH"
+fi
+
+cd "$SCRIPT_DIR"
+exec gunicorn -c gunicorn.conf.py app:app "$@"
@@ -0,0 +1,221 @@
+"""
+In-memory inverted index for resource search.
+
+Tokenizes Topic, Keywords, Author and note/pdf bodies into postings lists
+and ranks matches with BM25. The last query word is prefix matched so the
+index can serve search-as-you-type. Results are ResourceIDs only; the API
+hydrates them from MySQL in one batched query.
+"""
+import math
+import re
+import threading
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r'\w+')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Field weights, applied as term frequency multipliers
+FIELD_WEIGHTS = {
+    'Topic': 3.0,
+    'Keywords': 2.0,
+    'Author': 1.0,
+    'Body': 1.0,
+}
+
+# Bound the work a one or two letter prefix can cause
+MAX_PREFIX_EXPANSIONS = 64
+
+# Rows the index is built from, one per resource
+LOAD_QUERY = """
+SELECT
+    r.ResourceID,
+    r.Topic,
+    r.Keywords,
+    r.Author,
+    r.Format,
+    r.Rating,
+    COALESCE(n.Body, p.Body) as Body
+FROM resource r
+LEFT JOIN note n ON r.ResourceID = n.ResourceID
+LEFT JOIN pdf p ON r.ResourceID = p.ResourceID
+"""
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+# The subject filter matches whole words, as SP_Resource_Subject_Refresh tags resources:
+# "art" matches "Art history" but not "Partial"
+def subject_pattern(subject):
+    return re.compile(r'(?<!\w)' + re.escape(subject.lower()) + r'(?!\w)')
+
+
+class ResourceIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.built = False
+        self._postings = {}     # term -> {ResourceID: weighted tf}
+        self._vocab = []        # sorted terms, for prefix lookups
+        self._docs = {}         # ResourceID -> {"length", "terms", "format", "subject_text", "rating"}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    # Build from the resource tables, replacing anything already indexed
+    def build(self, conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(LOAD_QUERY)
+            columns = [col[0] for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        # Indexed on the side and swapped in, so a rebuild never holds up searches
+        fresh = ResourceIndex()
+        for row in rows:
+            fresh._add(row)
+        with self._lock:
+            self._postings = fresh._postings
+            self._vocab = sorted(fresh._postings)
+            self._docs = fresh._docs
+            self._total_length = fresh._total_length
+            self.built = True
+
+    # Index or re-index one resource row (ResourceID, Topic, Keywords, Author, Format, Rating, Body)
+    def add(self, row):
+        with self._lock:
+            self._remove(row['ResourceID'])
+            for term in self._add(row):
+                i = bisect_left(self._vocab, term)
+                if i == len(self._vocab) or self._vocab[i] != term:
+                    self._vocab.insert(i, term)
+
+    def remove(self, resource_id):
+        with self._lock:
+            for term in self._remove(resource_id):
+                i = bisect_left(self._vocab, term)
+                if i < len(self._vocab) and self._vocab[i] == term:
+                    del self._vocab[i]
+
+    def update_rating(self, resource_id, rating):
+        with self._lock:
+            doc = self._docs.get(resource_id)
+            if doc is not None:
+                doc['rating'] = rating
+
+    # Returns the terms that were new to the vocabulary
+    def _add(self, row):
+        resource_id = row['ResourceID']
+        tf = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(row.get(field)):
+                tf[token] = tf.get(token, 0.0) + weight
+        length = sum(tf.values())
+        self._docs[resource_id] = {
+            'length': length,
+            'terms': list(tf),
+            'format': (row.get('Format') or '').lower(),
+            'subject_text': ' '.join(filter(None, [row.get('Topic'), row.get('Keywords')])).lower(),
+            'rating': row.get('Rating'),
+        }
+        self._total_length += length
+        new_terms = []
+        for term, freq in tf.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                new_terms.append(term)
+            postings[resource_id] = freq
+        return new_terms
+
+    # Returns the terms that no longer have any postings
+    def _remove(self, resource_id):
+        doc = self._docs.pop(resource_id, None)
+        if doc is None:
+            return []
+        self._total_length -= doc['length']
+        dropped = []
+        for term in doc['terms']:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(resource_id, None)
+            if not postings:
+                del self._postings[term]
+                dropped.append(term)
+        return dropped
+
+    def _expand_prefix(self, prefix):
+        start = bisect_left(self._vocab, prefix)
+        terms = []
+        for term in self._vocab[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        if len(terms) > MAX_PREFIX_EXPANSIONS:
+            terms.sort(key=lambda t: len(self._postings[t]), reverse=True)
+            terms = terms[:MAX_PREFIX_EXPANSIONS]
+        return terms
+
+    # BM25 score of each document for one query token (best of its prefix expansions)
+    def _token_scores(self, terms, doc_count, avg_length):
+        scores = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for resource_id, freq in postings.items():
+                norm = K1 * (1 - B + B * self._docs[resource_id]['length'] / avg_length)
+                score = idf * freq * (K1 + 1) / (freq + norm)
+                if score > scores.get(resource_id, 0.0):
+                    scores[resource_id] = score
+        return scores
+
+    # All query words must match; the last one is treated as a prefix when prefix=True.
+    # Returns [(ResourceID, score)] best first
+    def search(self, query, limit=50, prefix=True, format_type=None, subject=None, min_rating=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            doc_count = len(self._docs)
+            if doc_count == 0:
+                return []
+            avg_length = (self._total_length / doc_count) or 1.0
+
+            combined = None
+            for i, token in enumerate(tokens):
+                is_last = i == len(tokens) - 1
+                terms = self._expand_prefix(token) if prefix and is_last else [token]
+                scores = self._token_scores(terms, doc_count, avg_length)
+                if combined is None:
+                    combined = scores
+                else:
+                    combined = {rid: combined[rid] + s for rid, s in scores.items() if rid in combined}
+                if not combined:
+                    return []
+
+            format_type = format_type.lower() if format_type else None
+            subject = subject_pattern(subject) if subject else None
+            results = []
+            for resource_id, score in combined.items():
+                doc = self._docs[resource_id]
+                if format_type and doc['format'] != format_type:
+                    continue
+                if subject and not subject.search(doc['subject_text']):
+                    continue
+                if min_rating is not None and (doc['rating'] is None or float(doc['rating']) < min_rating):
+                    continue
+                results.append((resource_id, score))
+
+        results.sort(key=lambda item: (-item[1], -item[0]))
+        return results[:limit]
@@ -0,0 +1,243 @@
+"""
+Slow query capture for the API (opt-in with LOBSTER_SLOW_QUERY_MS).
+
+SlowQueryLog is a query observer for the timed cursors in
+request_metrics.py. Any statement slower than the threshold is logged
+and folded into an entry for its fingerprint: the SQL with literals and
+placeholders replaced by ? and IN lists collapsed, so the same query
+with different arguments lands in the same entry. Each entry keeps the
+count, total time, p50/p95/p99 over recent samples, the shape of the
+parameters (types and lengths, never the values) and the latest
+EXPLAIN FORMAT=JSON plan.
+
+EXPLAIN runs on a background thread with its own pool connection, at
+most once per fingerprint every explain_interval seconds, so the request
+that was slow does not pay for it. Only SELECT statements are explained.
+"""
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+
+COMMENT_RE = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+VALUES_LIST_RE = re.compile(r'(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+')
+SPACE_RE = re.compile(r'\s+')
+
+
+# Normalized SQL: one line, literals and placeholders as ?, IN (...) and VALUES lists collapsed
+def fingerprint(query):
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    sql = COMMENT_RE.sub(' ', query)
+    sql = STRING_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    sql = VALUES_LIST_RE.sub(r'\1, ...', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint_id(sql):
+    return hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
+
+
+def value_shape(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, (int, float, Decimal)):
+        return type(value).__name__
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    if isinstance(value, (date, datetime)):
+        return type(value).__name__
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(value_shape(v) for v in value) + ']'
+    return type(value).__name__
+
+
+# Types and lengths of the arguments; executemany batches report the row count and first row
+def params_shape(args, many=False):
+    if args is None:
+        return None
+    if many:
+        rows = list(args)
+        return f"{len(rows)} x {value_shape(rows[0])}" if rows else "0 rows"
+    if isinstance(args, dict):
+        return {k: value_shape(v) for k, v in sorted(args.items())}
+    return value_shape(args)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class SlowQuery:
+    def __init__(self, sql, max_samples):
+        self.sql = sql
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=max_samples)
+        self.params_shape = None
+        self.first_seen = time.time()
+        self.last_seen = self.first_seen
+        self.explain = None
+        self.explained_at = 0.0
+        self.explain_error = None
+
+
+class SlowQueryLog:
+    def __init__(self, pool=None, threshold=0.1, explain=True, explain_interval=300.0,
+                 max_fingerprints=500, max_samples=1000, log=True):
+        self.pool = pool
+        self.threshold = threshold
+        self.explain = explain and pool is not None
+        self.explain_interval = explain_interval
+        self.max_fingerprints = max_fingerprints
+        self.max_samples = max_samples
+        self.log = log
+
+        self._lock = threading.Lock()
+        self._entries = {}      # fingerprint id -> SlowQuery
+        self._explains = queue.Queue(maxsize=100)
+        self._thread = None
+        self._pid = None
+
+        self.captured = 0
+        self.evicted = 0
+        self.explains_dropped = 0
+
+    # Query observer, see request_metrics.query_observers
+    def observe(self, cursor, kind, query, args, seconds):
+        if seconds < self.threshold:
+            return
+        many = kind == 'executemany'
+        if kind == 'callproc':
+            query = f"CALL {query}({', '.join(['%s'] * len(args or ()))})"
+        sql = fingerprint(query)
+        fid = fingerprint_id(sql)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(fid)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # Drop the fingerprint that has been quiet the longest
+                    oldest = min(self._entries, key=lambda k: self._entries[k].last_seen)
+                    del self._entries[oldest]
+                    self.evicted += 1
+                entry = self._entries[fid] = SlowQuery(sql, self.max_samples)
+            entry.count += 1
+            entry.total_seconds += seconds
+            entry.max_seconds = max(entry.max_seconds, seconds)
+            entry.samples.append(seconds)
+            entry.params_shape = params_shape(args, many)
+            entry.last_seen = now
+            self.captured += 1
+            want_explain = self.explain and not many and sql.lower().startswith(('select', 'with', '(select')) \
+                and now - entry.explained_at >= self.explain_interval
+            if want_explain:
+                entry.explained_at = now
+        if self.log:
+            print(f"Slow query {seconds * 1000:.1f} ms [{fid}] {sql[:300]}")
+        if want_explain:
+            self._queue_explain(fid, query, args)
+
+    # ---------- EXPLAIN sampling ----------
+
+    def _queue_explain(self, fid, query, args):
+        with self._lock:
+            if self._pid != os.getpid():
+                # First use in this process (or a forked worker)
+                self._pid = os.getpid()
+                self._explains = queue.Queue(maxsize=100)
+                self._thread = threading.Thread(target=self._run_explains, name='slow-query-explain', daemon=True)
+                self._thread.start()
+        try:
+            self._explains.put_nowait((fid, query, args))
+        except queue.Full:
+            with self._lock:
+                self.explains_dropped += 1
+
+    def _run_explains(self):
+        while True:
+            fid, query, args = self._explains.get()
+            try:
+                plan, error = self._explain(query, args), None
+            except Exception as e:
+                plan, error = None, str(e)
+            with self._lock:
+                entry = self._entries.get(fid)
+                if entry is not None:
+                    entry.explain = plan
+                    entry.explain_error = error
+
+    def _explain(self, query, args):
+        pooled = self.pool.acquire()
+        conn = pooled.raw
+        cursor = conn.cursor()
+        broken = False
+        try:
+            cursor.execute("EXPLAIN FORMAT=JSON " + query, args)
+            return json.loads(cursor.fetchone()[0])
+        finally:
+            cursor.close()
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            self.pool.release(pooled, broken=broken)
+
+    # ---------- reporting ----------
+
+    def report(self, limit=50, sort='total'):
+        keys = {
+            'total': lambda e: e.total_seconds,
+            'count': lambda e: e.count,
+            'max': lambda e: e.max_seconds,
+            'recent': lambda e: e.last_seen,
+        }
+        with self._lock:
+            entries = sorted(self._entries.items(), key=lambda item: keys[sort](item[1]), reverse=True)[:limit]
+            return {
+                "threshold_ms": round(self.threshold * 1000, 3),
+                "captured": self.captured,
+                "fingerprints": len(self._entries),
+                "evicted": self.evicted,
+                "explains_dropped": self.explains_dropped,
+                "queries": [{
+                    "fingerprint": fid,
+                    "sql": entry.sql,
+                    "count": entry.count,
+                    "total_ms": round(entry.total_seconds * 1000, 3),
+                    "mean_ms": round(entry.total_seconds / entry.count * 1000, 3),
+                    "p50_ms": round(percentile(entry.samples, 0.50) * 1000, 3),
+                    "p95_ms": round(percentile(entry.samples, 0.95) * 1000, 3),
+                    "p99_ms": round(percentile(entry.samples, 0.99) * 1000, 3),
+                    "max_ms": round(entry.max_seconds * 1000, 3),
+                    "params_shape": entry.params_shape,
+                    "first_seen": datetime.fromtimestamp(entry.first_seen).isoformat(timespec='seconds'),
+                    "last_seen": datetime.fromtimestamp(entry.last_seen).isoformat(timespec='seconds'),
+                    "explain": entry.explain,
+                    "explain_error": entry.explain_error,
+                } for fid, entry in entries],
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.captured = 0
+            self.evicted = 0
+            self.explains_dropped = 0
@@ -0,0 +1,62 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('MySQLdb')
+import bench_api
+from generate_data import Zipf
+
+
+def make_target():
+    target = bench_api.Target.__new__(bench_api.Target)
+    target.resource_ids = list(range(1, 101))
+    target.course_ids = [1, 2, 3]
+    target.subjects = ['COS', 'MAT']
+    target.posters = ['ada', 'grace']
+    target.zipf = Zipf(len(target.resource_ids), 1.1)
+    return target
+
+
+def request_sequence(seed, count=200):
+    target, rng = make_target(), random.Random(seed)
+    return [bench_api.build_request(name, target, rng)[:2]
+            for name in ['resource_detail', 'rating_post', 'resources_list'] * (count // 3)]
+
+
+def test_the_same_seed_gives_the_same_requests():
+    random.seed(1)
+    first = request_sequence(457)
+    random.seed(2)
+    assert request_sequence(457) == first
+    assert request_sequence(458) != first
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """Answers GET /<status> with that status."""
+
+    def do_GET(self):
+        self.send_response(int(self.path.strip('/')))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.parametrize('status, ok', [(200, True), (304, True), (404, False), (409, False), (500, False)])
+def test_only_success_and_not_modified_count_as_samples(status, ok, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StatusHandler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    monkeypatch.setattr(bench_api, 'build_request', lambda name, target, rng: ('GET', f'/{status}', None))
+    results = {'samples': {}, 'errors': {}}
+    try:
+        bench_api.worker(f'http://127.0.0.1:{server.server_address[1]}', make_target(), {'resource_detail': 1},
+                         time.monotonic() + 0.05, results, threading.Lock(), seed=1)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert bool(results['samples']['resource_detail']) is ok
+    assert bool(results['errors']['resource_detail']) is not ok
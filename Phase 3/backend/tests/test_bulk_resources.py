@@ -0,0 +1,82 @@
+import pytest
+
+pytest.importorskip('MySQLdb')
+import app as api
+
+TODAY = '2025-05-01'
+
+
+def validate(**item):
+    return api.validate_bulk_resource(dict({'Author': 'ada', 'Topic': 'graphs', 'Format': 'note'}, **item), TODAY)
+
+
+def test_valid_note():
+    row, error = validate(Body='text', CourseID=3)
+    assert error is None
+    assert row['Format'] == 'Note' and row['DateFor'] == TODAY
+    assert row['child'] == ('text',) and row['CourseID'] == 3
+
+
+@pytest.mark.parametrize('field, value', [('Author', 12), ('Topic', ['a']), ('Keywords', {'k': 1}),
+                                          ('Body', 5), ('Link', 1.5), ('DateFor', 20250101)])
+def test_non_string_fields_are_an_item_error(field, value):
+    row, error = validate(**{field: value})
+    assert row is None
+    assert error == f"{field} must be text"
+
+
+@pytest.mark.parametrize('course_id', ['3', True, 1.0])
+def test_course_id_must_be_an_integer(course_id):
+    assert validate(CourseID=course_id) == (None, "CourseID must be an integer")
+
+
+@pytest.mark.parametrize('item, message', [
+    ({'Author': ''}, "Missing required fields"),
+    ({'Format': 'podcast'}, "Format must be one of"),
+    ({'Topic': 'x' * 26}, "Topic and Keywords to 25"),
+    ({'DateFor': '05/01/2025'}, "DateFor must be YYYY-MM-DD"),
+    ({'Format': 'video', 'Link': 'https://v/1'}, "positive Duration"),
+    ({'Format': 'image', 'Link': 'https://i/1.bmp', 'Size': 3}, "must end in"),
+])
+def test_constraint_violations(item, message):
+    row, error = validate(**item)
+    assert row is None and message in error
+
+
+class FakeCursor:
+    def __init__(self, lastrowid, stored):
+        self.lastrowid = lastrowid
+        self.stored = stored
+        self.executed = []
+
+    def execute(self, query, params):
+        self.executed.append((query, params))
+        self.rows = [(rid,) + self.stored[rid] for rid in params if rid in self.stored]
+
+    def fetchall(self):
+        return self.rows
+
+
+def chunk(*topics):
+    return [{'Author': 'ada', 'Topic': topic, 'Format': 'Note'} for topic in topics]
+
+
+def test_ids_follow_lastrowid_and_the_increment():
+    rows = chunk('a', 'b', 'c')
+    cursor = FakeCursor(11, {11: ('ada', 'a', 'Note'), 13: ('ada', 'b', 'Note'), 15: ('ada', 'c', 'Note')})
+    api.assign_bulk_resource_ids(cursor, rows, 2)
+    assert [row['ResourceID'] for row in rows] == [11, 13, 15]
+    assert cursor.executed[0][1] == (11, 13, 15)
+
+
+def test_interleaved_ids_fail_the_request():
+    # Another session took 12, so the third row really got 13
+    cursor = FakeCursor(10, {10: ('ada', 'a', 'Note'), 11: ('ada', 'b', 'Note'), 12: ('bob', 'x', 'Pdf')})
+    with pytest.raises(RuntimeError):
+        api.assign_bulk_resource_ids(cursor, chunk('a', 'b', 'c'), 1)
+
+
+def test_refresh_runs_cover_only_the_created_ids():
+    # Two chunks with another writer's 13-19 in between, then an increment of 2
+    assert api.id_runs([21, 20, 10, 11, 12]) == [(10, 12), (20, 21)]
+    assert api.id_runs([11, 13, 15]) == [(11, 11), (13, 13), (15, 15)]
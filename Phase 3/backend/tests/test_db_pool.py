@@ -0,0 +1,87 @@
+import gc
+import weakref
+
+import pytest
+
+MySQLdb = pytest.importorskip('MySQLdb')
+import db_pool
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def ping(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(db_pool.MySQLdb, 'connect', lambda **kwargs: FakeConnection(), raising=False)
+    return ConnectionPool({}, max_size=2, timeout=0.05)
+
+
+def fork(monkeypatch):
+    # What a forked child sees: the same pool object under a new pid
+    child_pid = db_pool.os.getpid() + 1
+    monkeypatch.setattr(db_pool.os, 'getpid', lambda: child_pid)
+
+
+def test_released_connection_is_reused(pool):
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert pool.stats()['created'] == 1
+
+
+def test_pool_is_bounded(pool):
+    pool.acquire()
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_broken_connection_is_closed_and_frees_its_slot(pool):
+    pooled = pool.acquire()
+    pool.release(pooled, broken=True)
+    assert pooled.raw.closed
+    assert pool.stats()['size'] == 0
+
+
+def test_stale_connection_is_replaced_on_acquire(pool):
+    stale = pool.acquire()
+    pool.release(stale)
+    pool.max_lifetime = 0.001
+    stale.created_at -= 1
+    fresh = pool.acquire()
+    assert fresh is not stale and stale.raw.closed
+    stats = pool.stats()
+    assert stats['discarded'] == 1 and stats['created'] == 2 and stats['size'] == 1
+
+
+def test_child_keeps_inherited_connections_open_and_referenced(pool, monkeypatch):
+    pooled = pool.acquire()
+    pool.release(pooled)
+    raw = weakref.ref(pooled.raw)
+    fork(monkeypatch)
+    del pooled
+
+    fresh = pool.acquire()
+    gc.collect()
+    assert raw() is not None and not raw().closed
+    assert fresh.raw is not raw()
+    pool.close_all()
+    assert not raw().closed
+
+
+def test_connection_checked_out_before_fork_is_not_closed(pool, monkeypatch):
+    pooled = pool.acquire()
+    fork(monkeypatch)
+    pool.release(pooled, broken=True)
+    assert not pooled.raw.closed
+    assert pool.stats()['size'] == 0
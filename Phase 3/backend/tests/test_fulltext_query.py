@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('MySQLdb')
+import app as api
+from werkzeug.datastructures import MultiDict
+
+
+def test_plain_words_are_required_prefixes():
+    assert api.build_fulltext_query('linear algebra') == '+linear* +algebra*'
+
+
+def test_short_words_are_dropped():
+    assert api.build_fulltext_query('db of sql') == '+sql*'
+    assert api.build_fulltext_query('db io') is None
+
+
+def test_boolean_syntax_passes_through():
+    assert api.build_fulltext_query('"binary tree"') == '"binary tree"'
+    assert api.build_fulltext_query('graphs -dfs') == 'graphs -dfs'
+
+
+def test_url_fragments_use_like():
+    assert api.build_fulltext_query('youtube.com') is None
+    assert api.build_fulltext_query('https://example.org/x') is None
+    from_sql, _, where_sql, params, ranked = api.build_resource_filters(MultiDict({'search': 'lecture1.pdf'}))
+    assert not ranked
+    assert 'r.Url LIKE %s' in where_sql and params == ['%lecture1.pdf%']
+
+
+def test_ranked_search_binds_query_per_match():
+    from_sql, _, _, params, ranked = api.build_resource_filters(MultiDict({'search': 'recursion'}))
+    assert ranked
+    assert from_sql.count('AGAINST (%s IN BOOLEAN MODE)') == 6
+    assert params[:6] == ['+recursion*'] * 6
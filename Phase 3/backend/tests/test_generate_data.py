@@ -0,0 +1,142 @@
+import json
+import re
+import random
+from collections import Counter, defaultdict
+from datetime import date
+
+import pytest
+
+from generate_data import (COLUMNS, FORMATS, SCRAPER_AUTHOR, Zipf, check_row, checked, csv_field,
+                           generate, parse_scale, write_csv, write_json)
+
+TODAY = date(2026, 1, 15)
+
+
+def dataset(resources=200, **kwargs):
+    return list(generate(resources, today=TODAY, **kwargs))
+
+
+def test_zipf_ranks_are_in_range_and_skewed_to_the_head():
+    zipf = Zipf(50, 1.1)
+    rng = random.Random(1)
+    counts = Counter(zipf.sample(rng) for _ in range(20000))
+    assert set(counts) <= set(range(50))
+    assert counts[0] > counts[1] > counts[10] > counts[49]
+    # P(0) / P(1) is 2 ** s
+    assert counts[0] / counts[1] == pytest.approx(2 ** 1.1, rel=0.1)
+
+
+def test_zipf_samples_follow_the_rng_they_are_given():
+    zipf = Zipf(1000, 1.3)
+    first = [zipf.sample(random.Random(7)) for _ in range(5)]
+    random.seed(99)
+    assert [zipf.sample(random.Random(7)) for _ in range(5)] == first
+    seeded = Zipf(1000, 1.3, rng=random.Random(3))
+    again = Zipf(1000, 1.3, rng=random.Random(3))
+    assert [seeded.sample() for _ in range(20)] == [again.sample() for _ in range(20)]
+
+
+def test_every_generated_row_passes_the_checks():
+    rows = list(checked(generate(300, today=TODAY)))
+    tables = Counter(table for table, _ in rows)
+    assert tables['resource'] == 300
+    assert tables['rating'] == 900
+    assert {row[COLUMNS['resource'].index('Format')] for table, row in rows if table == 'resource'} == set(FORMATS)
+    assert all(len(row) == len(COLUMNS[table]) for table, row in rows)
+
+
+@pytest.mark.parametrize('table, column, value, rule', [
+    ('resource', 'Topic', 'x' * 26, 'varchar(25) not null'),
+    ('resource', 'Topic', '', 'varchar(25) not null'),
+    ('resource', 'Format', 'Audio', 'Note, Video, Website, Pdf or Image'),
+    ('rating', 'Score', 5.5, 'between 0.0 and 5.0'),
+    ('course', 'Session', 'Autumn', 'Spring, Summer, Fall or Winter'),
+    ('course', 'Section', 'A-1', 'alphanumeric varchar(24)'),
+    ('pdf', 'Link', 'https://example.com/notes.doc', 'http(s) link ending in .pdf'),
+    ('image', 'Link', 'ftp://example.com/a.png', 'http(s) link to a jpg, jpeg, png or gif'),
+    ('video', 'Duration', 0, '> 0'),
+])
+def test_check_row_names_the_broken_constraint(table, column, value, rule):
+    row = next(row for t, row in dataset(50) if t == table)
+    row = list(row)
+    row[COLUMNS[table].index(column)] = value
+    with pytest.raises(ValueError, match=re.escape(f"{table}.{column} must be {rule},")):
+        check_row(table, tuple(row))
+
+
+def test_same_seed_gives_the_same_dataset():
+    assert dataset(seed=1) == dataset(seed=1)
+    assert dataset(seed=1) != dataset(seed=2)
+
+
+def test_resource_totals_match_the_rating_rows():
+    rows = dataset()
+    sums, counts = defaultdict(float), Counter()
+    for table, row in rows:
+        if table == 'rating':
+            _, _, resource_id, score, _ = row
+            sums[resource_id] += score
+            counts[resource_id] += 1
+    columns = COLUMNS['resource']
+    for table, row in rows:
+        if table == 'resource':
+            values = dict(zip(columns, row))
+            assert values['RatingCount'] == counts[values['ResourceID']]
+            assert values['RatingSum'] == pytest.approx(sums[values['ResourceID']], abs=0.05)
+    # A Zipf head: the most rated resource has many times the median
+    ordered = sorted(counts.values(), reverse=True)
+    assert ordered[0] >= 10 * ordered[len(ordered) // 2]
+
+
+def test_rows_never_precede_what_they_reference_and_ids_start_after_offsets():
+    offsets = {'user': 3, 'course': 1, 'resource': 10, 'rating': 4}
+    seen = defaultdict(set)
+    for table, row in generate(100, offsets=offsets, today=TODAY):
+        if table == 'student':
+            assert row[0] in seen['user']
+        elif table == 'enrolled':
+            assert row[0] in seen['student'] and row[1] in seen['course']
+        elif table in ('note', 'video', 'website', 'pdf', 'image'):
+            assert row[0] in seen['resource']
+        elif table == 'rating':
+            assert row[2] in seen['resource']
+        seen[table].add(row[0])
+    assert min(seen['user']) == 4
+    assert min(seen['course']) == 2
+    assert min(seen['resource']) == 11
+    assert min(seen['rating']) == 5
+
+
+def test_parse_scale():
+    assert parse_scale('1M') == 1_000_000
+    assert parse_scale('2500') == 2500
+
+
+def test_csv_fields_are_escaped_the_way_load_data_reads_them():
+    assert csv_field(None) == '\\N'
+    assert csv_field(True) == '1'
+    assert csv_field(date(2025, 1, 2)) == '2025-01-02'
+    assert csv_field('plain') == 'plain'
+    assert csv_field('a, "b"\nc\\') == '"a, \\"b\\"\\nc\\\\"'
+
+
+def test_write_csv_emits_a_file_per_table_and_a_load_script(tmp_path):
+    counts = write_csv(generate(50, today=TODAY), str(tmp_path))
+    assert counts['resource'] == 50
+    with open(tmp_path / 'resource.csv', encoding='utf-8') as f:
+        assert f.readline().rstrip('\n') == ','.join(COLUMNS['resource'])
+        assert sum(1 for _ in f) == 50
+    script = (tmp_path / 'load.sql').read_text()
+    assert script.index('INTO TABLE user') < script.index('INTO TABLE resource') < script.index('INTO TABLE rating')
+    assert "CALL SP_Cache_Version_Bump('resources');" in script
+
+
+def test_write_json_produces_the_scraper_shape(tmp_path):
+    path = tmp_path / 'scrape.json'
+    counts = write_json(generate(50, today=TODAY), str(path))
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert list(data) == ['Resource', 'Note', 'pdf', 'Image', 'Video', 'Website']
+    assert {section: len(rows) for section, rows in data.items()} == counts
+    assert len(data['Resource']) == 50
+    assert all(row['Author'] == SCRAPER_AUTHOR for row in data['Resource'])
+    assert all(row['Body'] for row in data['pdf'])
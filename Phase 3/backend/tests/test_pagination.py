@@ -0,0 +1,96 @@
+from datetime import date
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+pytest.importorskip('MySQLdb')
+import app as api
+
+
+def test_page_limit_defaults_and_bounds():
+    assert api.parse_page_limit(None) == api.DEFAULT_PAGE_SIZE
+    assert api.parse_page_limit('') == api.DEFAULT_PAGE_SIZE
+    assert api.parse_page_limit('10') == 10
+    assert api.parse_page_limit(str(api.MAX_PAGE_SIZE * 10)) == api.MAX_PAGE_SIZE
+    with pytest.raises(ValueError):
+        api.parse_page_limit('0')
+    with pytest.raises(ValueError):
+        api.parse_page_limit('ten')
+
+
+def test_cursor_round_trip():
+    sort_key = api.RESOURCE_SORTS['date']
+    row = {'Date': date(2025, 3, 1), 'ResourceID': 42}
+    cursor = api.encode_resource_cursor(row, sort_key)
+    assert cursor == '2025-03-01,42'
+    assert api.decode_resource_cursor(cursor, sort_key) == (date(2025, 3, 1), 42)
+
+
+def test_unrated_rows_encode_as_minus_one():
+    sort_key = api.RESOURCE_SORTS['rating']
+    cursor = api.encode_resource_cursor({'Rating': None, 'ResourceID': 7}, sort_key)
+    assert api.decode_resource_cursor(cursor, sort_key) == (-1.0, 7)
+
+
+def test_bad_cursors_are_rejected():
+    sort_key = api.RESOURCE_SORTS['date']
+    with pytest.raises(ValueError):
+        api.decode_resource_cursor('2025-03-01', sort_key)
+    with pytest.raises(ValueError):
+        api.decode_resource_cursor('yesterday,1', sort_key)
+
+
+def test_seek_predicate_nests_tie_breakers():
+    sql, params = api.build_seek_predicate(('Date', 'ResourceID'), (date(2025, 3, 1), 42))
+    assert sql == "(r.Date < %s OR (r.Date = %s AND r.ResourceID < %s))"
+    assert params == [date(2025, 3, 1), date(2025, 3, 1), 42]
+    sql, _ = api.build_seek_predicate(('Date', 'ResourceID'), (date(2025, 3, 1), 42), descending=False)
+    assert '<' not in sql
+
+
+def test_page_query_fetches_one_extra_row():
+    assert api.page_query("SELECT 1", [5], 10) == ("SELECT 1 LIMIT %s", (5, 11))
+
+
+def test_finish_page_sets_next_cursor_only_when_more_rows():
+    sort_key = api.RESOURCE_SORTS['date']
+    rows = [{'Date': date(2025, 1, d), 'ResourceID': d} for d in (3, 2, 1)]
+    page, next_cursor = api.finish_resource_page(rows, 2, sort_key)
+    assert [r['ResourceID'] for r in page] == [3, 2]
+    assert next_cursor == '2025-01-02,2'
+    page, next_cursor = api.finish_resource_page(rows, 3, sort_key)
+    assert len(page) == 3 and next_cursor is None
+
+
+def test_list_without_limit_gets_the_default_page():
+    plan, error = api.plan_resource_list(MultiDict())
+    assert error is None
+    assert not plan['paged'] and plan['limit'] == api.DEFAULT_PAGE_SIZE
+    query, params = api.page_query(plan['query'], plan['params'], plan['limit'])
+    assert query.endswith(' LIMIT %s') and params[-1] == api.DEFAULT_PAGE_SIZE + 1
+
+
+def test_limit_is_capped():
+    plan, _ = api.plan_resource_list(MultiDict({'limit': '100000'}))
+    assert plan['limit'] == api.MAX_PAGE_SIZE
+
+
+def test_paged_list_seeks_past_cursor():
+    plan, error = api.plan_resource_list(MultiDict({'limit': '20', 'after': '2025-03-01,42'}))
+    assert error is None
+    assert plan['paged'] and plan['limit'] == 20
+    assert 'r.Date < %s' in plan['query']
+    assert plan['params'][-3:] == [date(2025, 3, 1), date(2025, 3, 1), 42]
+
+
+def test_plan_rejects_bad_pagination():
+    plan, error = api.plan_resource_list(MultiDict({'after': 'nope'}))
+    assert plan is None and 'pagination' in error
+
+
+def test_subject_page_without_limit_gets_the_default_page():
+    _, _, limit = api.plan_subject_page('CS', MultiDict())
+    assert limit == api.DEFAULT_PAGE_SIZE
+    _, params, limit = api.plan_subject_page('CS', MultiDict({'limit': '5', 'after': '2025-03-01,42'}))
+    assert limit == 5
+    assert params == ['CS', date(2025, 3, 1), date(2025, 3, 1), 42]
@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from rating_queue import RatingQueue
+
+BAD_RESOURCE = 13
+
+
+class IntegrityError(Exception):
+    pass
+
+
+class OperationalError(Exception):
+    pass
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        self.db.statements.append(query)
+        if query.startswith('SELECT ResourceID FROM resource'):
+            self.rows = [(rid,) for rid in params]
+        elif query.startswith('SELECT UserID FROM user'):
+            self.rows = [(self.db.users[params[0]],)] if params[0] in self.db.users else []
+        elif query.startswith('INSERT INTO user'):
+            self.lastrowid = self.db.users[params[0]] = len(self.db.users) + 1
+        elif query.startswith('CALL SP_Rating_Totals_Add'):
+            if params[0] == BAD_RESOURCE:
+                raise IntegrityError(1452, 'foreign key constraint fails')
+            self.db.staged_totals.append(params)
+
+    def executemany(self, query, rows):
+        if 'INSERT INTO rating' in query:
+            self.db.staged_inserts.extend(rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.inserted = []
+        self.totals = []
+        self.commits = 0
+        self.staged_inserts = []
+        self.staged_totals = []
+        self.users = {'ada': 1}
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.inserted += self.staged_inserts
+        self.totals += self.staged_totals
+        self.commits += 1
+        self.rollback()
+
+    def rollback(self):
+        self.staged_inserts, self.staged_totals = [], []
+
+
+class FakePool:
+    def __init__(self, db):
+        self.db = db
+        self.down = 0   # acquires left that fail as if MySQL were down
+
+    def acquire(self):
+        if self.down:
+            self.down -= 1
+            raise OperationalError(2002, "Can't connect to local MySQL server")
+        return type('Pooled', (), {'raw': self.db})()
+
+    def release(self, pooled, broken=False):
+        pass
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    db = FakeDB()
+    queue = RatingQueue(FakePool(db), str(tmp_path), batch_size=10, flush_interval=0.01,
+                        fsync=False, max_backoff=0.05)
+    queue.db = db
+    yield queue
+    queue.stop()
+
+
+def rating(resource_id, score=4.0):
+    return {'ResourceID': resource_id, 'Poster': 'ada', 'Score': score, 'Date': '2025-01-01'}
+
+
+def test_batch_totals_go_through_the_shared_procedure(queue):
+    queue.enqueue(rating(1, 4.0))
+    queue.enqueue(rating(1, 3.0))
+    queue.enqueue(rating(2, 5.0))
+    wait_for(lambda: queue.stats()['flushed'] == 3)
+    assert sorted(queue.db.totals) == [(1, 7.0, 2), (2, 5.0, 1)]
+    assert len(queue.db.inserted) == 3
+
+
+def test_only_the_rating_that_fails_on_its_own_is_rejected(queue, tmp_path):
+    queue.enqueue(rating(1, 4.0))
+    queue.enqueue(rating(BAD_RESOURCE))
+    queue.enqueue(rating(2, 5.0))
+    wait_for(lambda: queue.stats()['rejected'] == 1 and queue.stats()['flushed'] == 2)
+    assert queue.stats()['queue_depth'] == 0
+    assert sorted(queue.db.totals) == [(1, 4.0, 1), (2, 5.0, 1)]
+
+    rejected = [json.loads(line) for line in (tmp_path / 'ratings-rejected.jsonl').read_text().splitlines()]
+    assert [r['rating']['ResourceID'] for r in rejected] == [BAD_RESOURCE]
+    assert 'foreign key' in rejected[0]['error']
+
+    # Ratings behind the rejected one still land
+    queue.enqueue(rating(3))
+    wait_for(lambda: queue.stats()['flushed'] == 3)
+
+
+def test_rejected_ratings_are_not_replayed(queue, tmp_path):
+    queue.enqueue(rating(BAD_RESOURCE))
+    wait_for(lambda: queue.stats()['rejected'] == 1)
+    assert queue._read_uncommitted(queue._pid) == []
+
+
+def test_flusher_survives_the_database_being_down(queue, tmp_path):
+    queue.pool.down = 6
+    for score in (1.0, 2.0, 3.0):
+        queue.enqueue(rating(1, score))
+    wait_for(lambda: queue.stats()['flushed'] == 3)
+    stats = queue.stats()
+    assert stats['failures'] == 6 and stats['rejected'] == 0
+    assert queue.db.totals == [(1, 6.0, 3)]
+    assert not (tmp_path / 'ratings-rejected.jsonl').exists()
+    assert queue._thread.is_alive()
+
+
+def test_spool_fsync_runs_outside_the_queue_lock(tmp_path, monkeypatch):
+    queue = RatingQueue(FakePool(FakeDB()), str(tmp_path), batch_size=10, flush_interval=0.01)
+    lock_free = []
+    fsync = os.fsync
+
+    def checking_fsync(fd):
+        # Another request thread can take the queue lock while this one waits on the disk
+        probe = threading.Thread(target=lambda: lock_free.append(queue._cond.acquire(blocking=False)
+                                                                 and (queue._cond.release() or True)))
+        probe.start()
+        probe.join()
+        fsync(fd)
+    monkeypatch.setattr('rating_queue.os.fsync', checking_fsync)
+    try:
+        queue.enqueue(rating(1))
+        assert lock_free == [True]
+        assert queue._synced == queue._written == 1
+        # Already on disk: a caller that wrote before the last fsync does not sync again
+        queue._sync(1)
+        assert lock_free == [True]
+    finally:
+        queue.stop()
+
+
+def test_posters_are_resolved_like_the_synchronous_write_paths(queue):
+    queue.enqueue(rating(1))
+    queue.enqueue(dict(rating(2), Poster='grace'))
+    wait_for(lambda: queue.stats()['flushed'] == 2)
+    statements = queue.db.statements
+    # Existing users are selected, only the missing one is inserted, nothing is INSERT IGNOREd
+    assert statements.count("INSERT INTO user (Name, Courses, IsProfessor, Password) VALUES (%s, NULL, FALSE, 'defaultpass')") == 1
+    assert statements.count("INSERT INTO student (UserID) VALUES (%s)") == 1
+    assert not any('INSERT IGNORE' in q for q in statements)
+    assert queue.db.users == {'ada': 1, 'grace': 2}
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from quart import Quart, Response, jsonify
+
+from request_metrics import RequestMetrics, record_query, record_rows
+
+
+def make_async_app(metrics):
+    app = Quart(__name__)
+    metrics.init_async_app(app)
+
+    @app.route('/api/resources/<int:resource_id>')
+    async def resource(resource_id):
+        record_query(None, 'execute', 'SELECT 1', (), 0.002)
+        record_rows(1)
+        return jsonify(id=resource_id)
+
+    @app.route('/api/resources')
+    async def resources():
+        async def generate():
+            for i in range(3):
+                record_rows(1)
+                yield f'{{"id": {i}}}\n'
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    return app
+
+
+def stats_for(metrics, route):
+    return metrics._routes[('GET', route)]
+
+
+def test_async_routes_get_server_timing_and_route_stats():
+    metrics = RequestMetrics()
+    client = make_async_app(metrics).test_client()
+    response = asyncio.run(client.get('/api/resources/3'))
+    assert response.headers['Server-Timing'].endswith('desc="1 queries"')
+    stats = stats_for(metrics, '/api/resources/<int:resource_id>')
+    assert stats.queries == 1 and stats.rows == 1
+    assert stats.requests_by_status == {200: 1}
+    assert stats.response_bytes == len(b'{"id":3}\n')
+
+
+def test_async_streams_are_recorded_when_the_body_is_done():
+    metrics = RequestMetrics()
+    client = make_async_app(metrics).test_client()
+
+    async def fetch():
+        response = await client.get('/api/resources')
+        return await response.get_data()
+
+    body = asyncio.run(fetch())
+    stats = stats_for(metrics, '/api/resources')
+    assert stats.response_bytes == len(body)
+    assert stats.rows == 3
+    assert stats.latency.count == 1
+
+
+def test_async_routes_show_up_in_prometheus_output():
+    metrics = RequestMetrics()
+    client = make_async_app(metrics).test_client()
+    asyncio.run(client.get('/api/resources/1'))
+    text = metrics.render_prometheus()
+    assert 'lobster_http_requests_total{method="GET",route="/api/resources/<int:resource_id>",status="200"} 1' in text
+
+
+def test_collectors_export_declared_counters_with_a_total_suffix():
+    metrics = RequestMetrics()
+    stats = {'hits': 7, 'entries': 3, 'enabled': True, 'wait_seconds_total': 0.5, 'versions': 'database'}
+    metrics.add_collector('lobster_cache', lambda: stats, counters=('hits', 'wait_seconds_total'))
+    lines = metrics.render_prometheus().splitlines()
+    assert lines[lines.index('# TYPE lobster_cache_hits_total counter') + 1] == 'lobster_cache_hits_total 7'
+    assert lines[lines.index('# TYPE lobster_cache_wait_seconds_total counter') + 1] == 'lobster_cache_wait_seconds_total 0.5'
+    assert lines[lines.index('# TYPE lobster_cache_entries gauge') + 1] == 'lobster_cache_entries 3'
+    assert lines[lines.index('# TYPE lobster_cache_enabled gauge') + 1] == 'lobster_cache_enabled 1'
+    assert not any('versions' in line for line in lines)
+
+
+def test_declared_counters_are_stats_keys(tmp_path):
+    pytest.importorskip('MySQLdb')
+    from db_pool import ConnectionPool
+    from rating_queue import RatingQueue
+    from response_cache import ResponseCache
+    from user_resolver import UserResolver
+
+    pool = ConnectionPool({})
+    for component in (pool, RatingQueue(pool, str(tmp_path)), ResponseCache(), UserResolver()):
+        assert set(component.STATS_COUNTERS) <= set(component.stats())
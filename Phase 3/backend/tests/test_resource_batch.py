@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('MySQLdb')
+import app as api
+
+
+def test_ids_are_deduplicated_in_request_order():
+    assert api.parse_resource_ids('3,1,3, 2,') == [3, 1, 2]
+
+
+@pytest.mark.parametrize('raw', ['', ',', 'a,b', ','.join(str(i) for i in range(api.MAX_BATCH_IDS + 1))])
+def test_bad_id_lists_are_rejected(raw):
+    with pytest.raises(ValueError):
+        api.parse_resource_ids(raw)
+
+
+def test_one_placeholder_per_id():
+    query, params = api.resource_ids_query([5, 9])
+    assert query.endswith("WHERE r.ResourceID IN (%s, %s)")
+    assert params == (5, 9)
+
+
+def test_rows_follow_the_request_and_unknown_ids_are_missing():
+    rows = [{'ResourceID': 1, 'Format': 'Video', 'VideoUrl': 'https://v/1'},
+            {'ResourceID': 3, 'Format': 'Website', 'WebsiteUrl': 'https://w/3'}]
+    result = api.order_resources_by_ids([3, 2, 1], rows)
+    assert [r['ResourceID'] for r in result['resources']] == [3, 1]
+    assert [r['Url'] for r in result['resources']] == ['https://w/3', 'https://v/1']
+    assert result['missing'] == [2]
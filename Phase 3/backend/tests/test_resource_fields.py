@@ -0,0 +1,53 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+pytest.importorskip('MySQLdb')
+import app as api
+
+
+def test_missing_fields_give_the_compact_projection():
+    assert api.parse_resource_fields(None) == list(api.COMPACT_RESOURCE_FIELDS)
+    assert 'Body' not in api.parse_resource_fields('')
+
+
+def test_all_fields():
+    assert api.parse_resource_fields('all') == list(api.RESOURCE_FIELDS)
+    assert api.parse_resource_fields('*') == list(api.RESOURCE_FIELDS)
+
+
+def test_requested_fields_keep_their_order():
+    assert api.parse_resource_fields('Url, Title ,Rating') == ['Url', 'Title', 'Rating']
+
+
+def test_unknown_or_empty_fields_are_rejected():
+    with pytest.raises(ValueError, match='Password'):
+        api.parse_resource_fields('Title,Password')
+    with pytest.raises(ValueError):
+        api.parse_resource_fields(',')
+
+
+def test_only_body_joins_the_note_table():
+    select_sql, join_sql = api.build_resource_select(['Title', 'Url'])
+    assert select_sql == "SELECT r.Topic as Title, r.Url"
+    assert join_sql == ''
+    _, join_sql = api.build_resource_select(['Title', 'Body'])
+    assert join_sql == api.RESOURCE_JOINS['note']
+
+
+def test_internal_fields_are_selected_then_dropped():
+    selected, shape = api.with_internal_fields(['Title', 'Format'], ['Date', 'ResourceID'])
+    assert selected == ['Title', 'Format', 'Date', 'ResourceID']
+    row = shape({'Title': 't', 'Format': 'Video', 'Date': '2025-01-01', 'ResourceID': 3})
+    assert row == {'Title': 't', 'Format': 'video'}
+
+
+def test_list_plan_selects_cursor_columns_without_returning_them():
+    plan, error = api.plan_resource_list(MultiDict({'fields': 'Title', 'limit': '5'}))
+    assert error is None
+    assert 'r.Date' in plan['query'] and 'r.ResourceID' in plan['query']
+    assert plan['shape']({'Title': 't', 'Date': None, 'ResourceID': 1}) == {'Title': 't'}
+
+
+def test_list_plan_reports_bad_fields():
+    plan, error = api.plan_resource_list(MultiDict({'fields': 'Nope'}))
+    assert plan is None and 'Nope' in error
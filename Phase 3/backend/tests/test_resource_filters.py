@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+pytest.importorskip('MySQLdb')
+import app as api
+
+
+def filters(**args):
+    return api.build_resource_filters(MultiDict(args))
+
+
+def test_no_filters():
+    from_sql, joins, where_sql, params, ranked = filters()
+    assert from_sql == api.RESOURCE_LIST_FROM
+    assert where_sql == "1=1"
+    assert params == [] and not ranked
+
+
+def test_filters_and_their_params_line_up():
+    _, _, where_sql, params, _ = filters(format='Video', topic='graphs', min_rating='4', verified='1',
+                                         date_from='2025-01-01', subject_code='CS')
+    assert where_sql.count('%s') == len(params)
+    assert "LOWER(r.Format) = LOWER(%s)" in where_sql
+    assert "r.isVerified = TRUE" in where_sql
+    assert "rs.SubjectCode = %s" in where_sql
+    assert params == ['%graphs%', 'Video', 'CS', 4.0, date(2025, 1, 1)]
+
+
+def test_unverified_includes_unknown():
+    _, _, where_sql, _, _ = filters(verified='0')
+    assert "(r.isVerified IS NULL OR r.isVerified = FALSE)" in where_sql
+
+
+@pytest.mark.parametrize('args', [{'verified': 'maybe'}, {'min_rating': 'high'}, {'date_to': 'tomorrow'}])
+def test_bad_filters_raise(args):
+    with pytest.raises(ValueError):
+        filters(**args)
+
+
+def test_bad_filters_become_a_400_message():
+    plan, error = api.plan_resource_list(MultiDict({'verified': 'maybe'}))
+    assert plan is None and error.startswith('Invalid filter')
+
+
+def test_sort_and_order():
+    plan, _ = api.plan_resource_list(MultiDict({'sort': 'rating', 'order': 'asc'}))
+    assert plan['query'].rstrip().endswith('ASC') and 'ORDER BY' in plan['query']
+    assert plan['sort_key'] == api.RESOURCE_SORTS['rating']
+
+
+def test_relevance_needs_a_search():
+    plan, error = api.plan_resource_list(MultiDict({'sort': 'relevance'}))
+    assert plan is None and 'relevance needs a search' in error
+    _, error = api.plan_resource_list(MultiDict({'sort': 'date', 'order': 'sideways'}))
+    assert error is not None
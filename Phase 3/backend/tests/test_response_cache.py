@@ -0,0 +1,306 @@
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=2, ttl=30.0)
+
+
+def make_app(cache, calls):
+    app = Flask(__name__)
+
+    @app.route('/api/resources')
+    @cache.cached(lambda: ['resources'])
+    def resources():
+        calls.append('resources')
+        return jsonify(calls=len(calls))
+
+    @app.route('/api/resource/<int:resource_id>')
+    @cache.cached(lambda resource_id: ['resource:%d' % resource_id])
+    def resource(resource_id):
+        calls.append(resource_id)
+        return jsonify(id=resource_id)
+
+    return app
+
+
+def test_second_request_is_served_from_cache(cache):
+    calls = []
+    client = make_app(cache, calls).test_client()
+    first = client.get('/api/resources')
+    second = client.get('/api/resources')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert calls == ['resources']
+    assert cache.stats()['hits'] == 1
+
+
+def test_query_string_order_does_not_change_the_key(cache):
+    calls = []
+    client = make_app(cache, calls).test_client()
+    client.get('/api/resources?b=2&a=1')
+    assert client.get('/api/resources?a=1&b=2').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/resources?a=1').headers['X-Cache'] == 'MISS'
+
+
+def test_invalidate_only_drops_entries_with_that_tag(cache):
+    calls = []
+    client = make_app(cache, calls).test_client()
+    client.get('/api/resources')
+    client.get('/api/resource/1')
+    cache.invalidate('resource:1')
+    assert client.get('/api/resources').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/resource/1').headers['X-Cache'] == 'MISS'
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    calls = []
+    client = make_app(cache, calls).test_client()
+    client.get('/api/resource/1')
+    client.get('/api/resource/2')
+    client.get('/api/resource/1')
+    client.get('/api/resource/3')
+    assert client.get('/api/resource/1').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/resource/2').headers['X-Cache'] == 'MISS'
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    calls = []
+    client = make_app(cache, calls).test_client()
+    client.get('/api/resources')
+    now = time.time()
+    monkeypatch.setattr('response_cache.time.time', lambda: now + 31)
+    assert client.get('/api/resources').headers['X-Cache'] == 'MISS'
+
+
+def test_etag_changes_with_tag_versions(cache):
+    etag = cache.make_etag('/api/resources?', cache.tag_versions(['resources']))
+    assert etag == cache.make_etag('/api/resources?', cache.tag_versions(['resources']))
+    cache.invalidate('resources')
+    assert etag != cache.make_etag('/api/resources?', cache.tag_versions(['resources']))
+    assert etag != cache.make_etag('/api/resources?limit=5', (0,))
+
+
+def test_matching_if_none_match_gets_304_without_running_the_view(cache):
+    calls = []
+    client = make_app(cache, calls).test_client()
+    etag = client.get('/api/resources').headers['ETag']
+    response = client.get('/api/resources', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert calls == ['resources']
+
+    cache.invalidate('resources')
+    assert client.get('/api/resources', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_disabled_cache_still_answers_conditional_requests():
+    cache = ResponseCache(enabled=False)
+    calls = []
+    client = make_app(cache, calls).test_client()
+    etag = client.get('/api/resources').headers['ETag']
+    assert client.get('/api/resources').headers.get('X-Cache') is None
+    assert client.get('/api/resources', headers={'If-None-Match': etag}).status_code == 304
+    assert len(calls) == 2
+
+
+def test_shared_store_is_seen_by_another_process(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first, second = ResponseCache(shared_path=path), ResponseCache(shared_path=path)
+    first.set('/api/resources?', first.tag_versions(['resources']), 200, [], b'[]')
+    assert second.get('/api/resources?', second.tag_versions(['resources'])) is not None
+    assert first.make_etag('k', (0,)) == second.make_etag('k', (0,))
+
+    second.invalidate('resources')
+    assert first.tag_versions(['resources']) == (1,)
+    assert first.get('/api/resources?', first.tag_versions(['resources'])) is None
+
+
+class FakeVersionTable:
+    """Stands in for the cache_version table the API and the import tools bump."""
+
+    def __init__(self):
+        self.rows = {'resources': (1, 1000.0), 'courses': (1, 1000.0), 'users': (1, 1000.0)}
+        self.reads = []
+        self.bumps = []
+        self.fail = False
+
+    def bump(self, tag):
+        version, modified = self.rows.get(tag, (0, 1000.0))
+        self.rows[tag] = (version + 1, modified + 1)
+
+    def bump_all(self, tags):
+        self.bumps.append(tags)
+        if self.fail:
+            raise RuntimeError("Lock wait timeout exceeded")
+        for tag in tags:
+            self.bump(tag)
+
+    def load(self, tags):
+        self.reads.append(tags)
+        if self.fail:
+            raise RuntimeError("Table 'lobsternotes.cache_version' doesn't exist")
+        return {tag: self.rows[tag] for tag in tags if tag in self.rows}
+
+
+def database_cache(table, version_refresh=0):
+    return ResponseCache(version_loader=table.load, version_bumper=table.bump_all, version_refresh=version_refresh)
+
+
+def test_row_tags_have_their_own_database_version():
+    table = FakeVersionTable()
+    cache = database_cache(table)
+    client = make_app(cache, []).test_client()
+    for path in ('/api/resources', '/api/resource/1', '/api/resource/2'):
+        client.get(path)
+    cache.invalidate('resource:1', 'resources', 'resource:1')
+    assert table.bumps == [['resource:1', 'resources']]
+    assert client.get('/api/resource/2').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/resource/1').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/resources').headers['X-Cache'] == 'MISS'
+
+
+def test_database_versions_are_reused_until_the_worker_writes():
+    table = FakeVersionTable()
+    cache = database_cache(table, version_refresh=60)
+    client = make_app(cache, []).test_client()
+    etag = client.get('/api/resources').headers['ETag']
+    assert client.get('/api/resources', headers={'If-None-Match': etag}).status_code == 304
+    assert table.reads == [['resources']]
+    # This worker's own write is seen by its next request
+    cache.invalidate('resources')
+    assert client.get('/api/resources', headers={'If-None-Match': etag}).status_code == 200
+    assert table.reads == [['resources'], ['resources']]
+
+
+def test_failed_bump_is_counted():
+    table = FakeVersionTable()
+    cache = database_cache(table)
+    table.fail = True
+    cache.invalidate('users')
+    assert cache.stats()['version_errors'] == 1
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_database_versions_are_shared_by_every_worker():
+    table = FakeVersionTable()
+    workers = [database_cache(table), database_cache(table)]
+    clients = [make_app(cache, []).test_client() for cache in workers]
+    etag = clients[0].get('/api/resource/1').headers['ETag']
+    # A write from outside the API (bulk_import.py, the mysql client) bumps the row
+    table.bump('resource:1')
+    for client in clients:
+        assert client.get('/api/resource/1', headers={'If-None-Match': etag}).status_code == 200
+    fresh = clients[0].get('/api/resource/1').headers['ETag']
+    assert clients[1].get('/api/resource/1', headers={'If-None-Match': fresh}).status_code == 304
+    assert table.reads[0] == ['resource:1']
+
+
+def test_database_last_modified_comes_from_the_table():
+    table = FakeVersionTable()
+    client = make_app(database_cache(table), []).test_client()
+    response = client.get('/api/resources')
+    assert response.last_modified.timestamp() == 1001
+
+
+def test_unreadable_versions_serve_the_view_uncached():
+    table = FakeVersionTable()
+    table.fail = True
+    cache = database_cache(table)
+    calls = []
+    client = make_app(cache, calls).test_client()
+    for _ in range(2):
+        response = client.get('/api/resources')
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers and 'X-Cache' not in response.headers
+    assert calls == ['resources', 'resources']
+    assert cache.stats()['version_errors'] == 2
+
+
+def test_cache_without_validators_passes_requests_through():
+    cache = ResponseCache(enabled=False)
+    cache.conditional = False
+    client = make_app(cache, []).test_client()
+    response = client.get('/api/resources')
+    assert 'ETag' not in response.headers and 'Last-Modified' not in response.headers
+
+
+def test_shared_store_purges_expired_entries(tmp_path, monkeypatch):
+    cache = ResponseCache(ttl=30.0, shared_path=str(tmp_path / 'cache.sqlite'))
+    cache.set('/a?', (0,), 200, [], b'a')
+    now = time.time()
+    monkeypatch.setattr('response_cache.time.time', lambda: now + 31)
+    cache.set('/b?', (0,), 200, [], b'b')
+    keys = [row[0] for row in cache._db().execute("SELECT key FROM entry").fetchall()]
+    assert keys == ['/b?']
+
+
+def accept_variant(req):
+    return 'ndjson' if req.accept_mimetypes.best == 'application/x-ndjson' else None
+
+
+def test_negotiated_format_is_part_of_the_key_and_etag():
+    cache = ResponseCache(variant=accept_variant)
+    calls = []
+    client = make_app(cache, calls).test_client()
+    ndjson = {'Accept': 'application/x-ndjson'}
+    etag = client.get('/api/resources').headers['ETag']
+    response = client.get('/api/resources', headers=ndjson)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.headers['ETag'] != etag
+    assert client.get('/api/resources', headers=dict(ndjson, **{'If-None-Match': etag})).status_code == 200
+    assert client.get('/api/resources').headers['X-Cache'] == 'HIT'
+    assert len(calls) == 2
+
+
+def test_responses_vary_on_accept_once_a_variant_is_set(cache):
+    client = make_app(cache, []).test_client()
+    assert 'Vary' not in client.get('/api/resources').headers
+
+    cache.variant = accept_variant
+    miss = client.get('/api/resource/1')
+    hit = client.get('/api/resource/1')
+    not_modified = client.get('/api/resource/1', headers={'If-None-Match': hit.headers['ETag']})
+    for response in (miss, hit, not_modified):
+        assert response.headers['Vary'] == 'Accept'
+
+
+def test_async_handlers_use_the_shared_store_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+
+    from quart import Quart, jsonify as async_jsonify
+
+    cache = ResponseCache(shared_path=str(tmp_path / 'cache.sqlite'))
+    app = Quart(__name__)
+    calls = []
+
+    @app.route('/api/resources')
+    @cache.cached_async(tags=lambda: ['resources'])
+    async def resources():
+        calls.append(1)
+        return async_jsonify(calls=len(calls))
+
+    loop_thread = []
+    get = cache.get
+
+    def recording_get(*args):
+        loop_thread.append(threading.current_thread().name)
+        return get(*args)
+    cache.get = recording_get
+
+    async def run():
+        client = app.test_client()
+        first = await client.get('/api/resources')
+        second = await client.get('/api/resources')
+        return first.headers['X-Cache'], second.headers['X-Cache']
+
+    assert asyncio.run(run()) == ('MISS', 'HIT')
+    assert calls == [1]
+    assert all(name.startswith('response-cache') for name in loop_thread)
@@ -0,0 +1,89 @@
+from search_index import ResourceIndex, tokenize
+
+
+class FakeCursor:
+    description = [(name,) for name in ('ResourceID', 'Topic', 'Keywords', 'Author', 'Format', 'Rating', 'Body')]
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+
+ROWS = [
+    (1, 'Binary Trees', 'data structures', 'Ada', 'Note', 4.5, 'A binary tree has two children'),
+    (2, 'Graph Search', 'bfs dfs', 'Grace', 'Video', 3.0, None),
+    (3, 'Sorting', 'binary search, data structures', 'Alan', 'Note', None, 'merge sort and quicksort'),
+]
+
+
+def built_index():
+    index = ResourceIndex()
+    index.build(FakeConnection(ROWS))
+    return index
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize('Binary-Tree, 2nd ed.') == ['binary', 'tree', '2nd', 'ed']
+    assert tokenize(None) == []
+
+
+def test_topic_matches_outrank_keyword_matches():
+    results = built_index().search('binary')
+    assert [rid for rid, _ in results] == [1, 3]
+
+
+def test_all_words_must_match_and_last_is_a_prefix():
+    index = built_index()
+    assert sorted(rid for rid, _ in index.search('data struct')) == [1, 3]
+    assert index.search('data struct', prefix=False) == []
+    assert index.search('graph binary') == []
+
+
+def test_filters():
+    index = built_index()
+    assert [rid for rid, _ in index.search('binary', format_type='NOTE', min_rating=4)] == [1]
+    assert [rid for rid, _ in index.search('binary', subject='sorting')] == [3]
+
+
+def test_subject_filter_matches_whole_words():
+    index = built_index()
+    index.add({'ResourceID': 4, 'Topic': 'Partial binary fractions', 'Keywords': 'math', 'Format': 'Note'})
+    index.add({'ResourceID': 5, 'Topic': 'Binary art', 'Keywords': 'pixel', 'Format': 'Image'})
+    assert [rid for rid, _ in index.search('binary', subject='Art')] == [5]
+    assert index.search('binary', subject='sort') == []
+
+
+def test_add_remove_and_rating_updates():
+    index = built_index()
+    index.add({'ResourceID': 4, 'Topic': 'Quantum basics', 'Format': 'Note'})
+    assert [rid for rid, _ in index.search('quant')] == [4]
+    index.remove(4)
+    assert index.search('quant') == []
+    assert len(index) == 3
+    index.update_rating(3, 5.0)
+    assert [rid for rid, _ in index.search('binary', min_rating=4.5)] == [1, 3]
+
+
+def test_rebuild_replaces_what_was_indexed():
+    index = built_index()
+    index.add({'ResourceID': 4, 'Topic': 'Quantum basics', 'Format': 'Note'})
+    index.build(FakeConnection(ROWS[1:]))
+    assert index.search('quant') == []
+    assert [rid for rid, _ in index.search('binary')] == [3]
+    assert len(index) == 2
@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip('MySQLdb')
+import app as api
+
+
+@pytest.fixture
+def index_app(monkeypatch):
+    builds = []
+    versions = {'resources': (1, 1000.0)}
+    monkeypatch.setitem(api.app.config, 'SEARCH_INDEX_ENABLED', True)
+    monkeypatch.setitem(api.app.config, 'SEARCH_INDEX_CHECK_INTERVAL', 60.0)
+    monkeypatch.setattr(api, 'search_index_state', {"version": None, "checked": 0.0})
+    monkeypatch.setattr(api.resource_index, 'built', False)
+    monkeypatch.setattr(api.resource_index, 'build', lambda conn: (builds.append(1), setattr(api.resource_index, 'built', True)))
+    monkeypatch.setattr(api, 'load_cache_versions', lambda tags: dict(versions))
+    monkeypatch.setattr(api.MySQLPool, 'connection', None)
+    now = [5000.0]
+    monkeypatch.setattr(api, 'monotonic', lambda: now[0])
+    return builds, versions, now
+
+
+def test_index_is_rebuilt_once_the_database_version_moves(index_app):
+    builds, versions, now = index_app
+    api.get_resource_index()
+    api.get_resource_index()
+    assert builds == [1]
+
+    # Another worker wrote: nothing happens until the next check is due
+    versions['resources'] = (2, 1001.0)
+    now[0] += 30
+    api.get_resource_index()
+    assert builds == [1]
+    now[0] += 30
+    api.get_resource_index()
+    assert builds == [1, 1]
+    assert api.search_index_state['version'] == (2, 1001.0)
+
+    now[0] += 60
+    api.get_resource_index()
+    assert builds == [1, 1]
+
+
+def test_unreadable_version_keeps_the_current_index(index_app, monkeypatch):
+    builds, _, now = index_app
+    api.get_resource_index()
+
+    def fail(tags):
+        raise RuntimeError("Table 'lobsternotes.cache_version' doesn't exist")
+    monkeypatch.setattr(api, 'load_cache_versions', fail)
+    now[0] += 60
+    assert api.get_resource_index() is api.resource_index
+    assert builds == [1]
+
+
+def test_zero_interval_turns_the_check_off(index_app, monkeypatch):
+    builds, versions, now = index_app
+    monkeypatch.setitem(api.app.config, 'SEARCH_INDEX_CHECK_INTERVAL', 0)
+    api.get_resource_index()
+    versions['resources'] = (2, 1001.0)
+    now[0] += 3600
+    api.get_resource_index()
+    assert builds == [1]
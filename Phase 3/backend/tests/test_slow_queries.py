@@ -0,0 +1,77 @@
+import pytest
+
+from slow_queries import SlowQueryLog, fingerprint, fingerprint_id, params_shape
+
+
+def test_literals_and_placeholders_become_question_marks():
+    assert fingerprint("SELECT * FROM resource WHERE ResourceID = 42 AND Author = 'Ada'") == \
+        "SELECT * FROM resource WHERE ResourceID = ? AND Author = ?"
+    assert fingerprint("SELECT * FROM user WHERE Name = %s AND UserID = %(id)s") == \
+        "SELECT * FROM user WHERE Name = ? AND UserID = ?"
+
+
+def test_comments_and_whitespace_are_dropped():
+    assert fingerprint("SELECT 1 -- probe\n  FROM /* hint */ resource\n\tWHERE x = 2") == \
+        "SELECT ? FROM resource WHERE x = ?"
+
+
+def test_in_and_values_lists_collapse_to_one_fingerprint():
+    assert fingerprint("SELECT * FROM resource WHERE ResourceID IN (%s, %s, %s)") == \
+        fingerprint("SELECT * FROM resource WHERE ResourceID in (1,2)") == \
+        "SELECT * FROM resource WHERE ResourceID IN (...)"
+    assert fingerprint("INSERT INTO rating VALUES (%s, %s), (%s, %s), (%s, %s)") == \
+        "INSERT INTO rating VALUES (?, ?), ..."
+
+
+def test_bytes_queries_and_ids_are_stable():
+    sql = fingerprint(b"SELECT * FROM note WHERE ResourceID = 7")
+    assert sql == "SELECT * FROM note WHERE ResourceID = ?"
+    assert fingerprint_id(sql) == fingerprint_id(fingerprint("SELECT * FROM note WHERE ResourceID = 9"))
+    assert len(fingerprint_id(sql)) == 16
+
+
+def test_params_shape_keeps_types_and_lengths_not_values():
+    assert params_shape(('secret', 3, None)) == '[str(6), int, null]'
+    assert params_shape({'b': 1.5, 'a': 'xy'}) == {'a': 'str(2)', 'b': 'float'}
+    assert params_shape([(1, 'a'), (2, 'b')], many=True) == '2 x [int, str(1)]'
+
+
+def test_same_query_with_other_arguments_lands_in_one_entry():
+    log = SlowQueryLog(threshold=0.05, log=False)
+    log.observe(None, 'execute', "SELECT * FROM resource WHERE ResourceID = %s", (1,), 0.2)
+    log.observe(None, 'execute', "SELECT * FROM resource WHERE ResourceID = 99", None, 0.1)
+    log.observe(None, 'execute', "SELECT 1", None, 0.01)
+    report = log.report()
+    assert report['captured'] == 2
+    assert [(q['sql'], q['count'], q['max_ms']) for q in report['queries']] == \
+        [("SELECT * FROM resource WHERE ResourceID = ?", 2, 200.0)]
+
+
+def test_stored_procedure_calls_are_fingerprinted_by_name():
+    log = SlowQueryLog(threshold=0, log=False)
+    log.observe(None, 'callproc', 'SP_Rating_Rate', ('Ada', 3, 4.5), 0.3)
+    assert log.report()['queries'][0]['sql'] == "CALL SP_Rating_Rate(?, ?, ?)"
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    pytest.importorskip('MySQLdb')
+    import app as api
+    monkeypatch.setattr(api, 'slow_query_log', None)
+    return api, api.app.test_client()
+
+
+def test_admin_endpoints_refuse_everything_without_a_configured_token(admin_client, monkeypatch):
+    api, client = admin_client
+    monkeypatch.setitem(api.app.config, 'ADMIN_TOKEN', None)
+    assert client.get('/api/admin/slow-queries').status_code == 403
+    assert client.delete('/api/admin/slow-queries', headers={'X-Admin-Token': ''}).status_code == 403
+
+
+def test_admin_endpoints_need_the_matching_token(admin_client, monkeypatch):
+    api, client = admin_client
+    monkeypatch.setitem(api.app.config, 'ADMIN_TOKEN', 's3cret')
+    assert client.get('/api/admin/slow-queries', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    response = client.get('/api/admin/slow-queries', headers={'X-Admin-Token': 's3cret'})
+    assert response.status_code == 200
+    assert response.get_json() == {"enabled": False, "queries": []}
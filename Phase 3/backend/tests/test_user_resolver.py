@@ -0,0 +1,128 @@
+import pytest
+
+from user_resolver import UserResolver
+
+
+class DatabaseError(Exception):
+    pass
+
+
+class FakeUsers:
+    """Cursor over an in-memory user table with a unique Name."""
+
+    def __init__(self, names=(), hidden=()):
+        self.users = {name: i + 1 for i, name in enumerate(names)}
+        # Committed by another request after this one's snapshot: only locking reads see them
+        self.hidden = dict(hidden)
+        self.next_id = 100
+        self.students = []
+        self.statements = []
+        self.lastrowid = None
+        self._row = None
+
+    def execute(self, query, params):
+        self.statements.append(query.split()[0])
+        name = params[0]
+        if query.startswith('SELECT'):
+            user_id = self.users.get(name)
+            if user_id is None and 'LOCK IN SHARE MODE' in query:
+                user_id = self.hidden.get(name)
+            self._row = {'UserID': user_id} if user_id is not None else None
+        elif query.startswith('INSERT INTO user'):
+            if name in self.users or name in self.hidden:
+                raise DatabaseError(1062, f"Duplicate entry '{name}' for key 'Name'")
+            self.users[name] = self.lastrowid = self.next_id
+            self.next_id += 1
+        elif query.startswith('INSERT INTO student'):
+            self.students.append(name)
+
+    def fetchone(self):
+        return self._row
+
+
+def test_existing_user_is_selected_without_an_insert():
+    cursor = FakeUsers(['ada'])
+    resolver = UserResolver()
+    assert resolver.resolve(cursor, 'ada') == 1
+    assert cursor.statements == ['SELECT']
+    assert cursor.next_id == 100
+
+
+def test_new_user_becomes_a_student_and_is_not_cached_yet():
+    cursor = FakeUsers()
+    resolver = UserResolver()
+    assert resolver.resolve(cursor, 'bob') == 100
+    assert cursor.students == [100]
+    assert resolver.stats()['entries'] == 0
+    assert resolver.resolve(cursor, 'bob') == 100
+    assert resolver.stats()['entries'] == 1
+
+
+def test_cached_names_need_no_round_trip():
+    cursor = FakeUsers(['ada'])
+    resolver = UserResolver()
+    resolver.resolve(cursor, 'ada')
+    resolver.resolve(cursor, 'ada')
+    assert cursor.statements == ['SELECT']
+    assert resolver.stats()['hits'] == 1
+
+
+def test_concurrently_created_name_is_read_back():
+    cursor = FakeUsers(hidden={'cy': 7})
+    assert UserResolver().resolve(cursor, 'cy') == 7
+    assert cursor.students == []
+
+
+def test_lru_is_bounded():
+    cursor = FakeUsers(['a', 'b', 'c'])
+    resolver = UserResolver(max_entries=2)
+    for name in ('a', 'b', 'c'):
+        resolver.resolve(cursor, name)
+    assert resolver.stats()['entries'] == 2
+
+
+def test_stale_cached_name_is_resolved_again_and_the_write_retried():
+    cursor = FakeUsers(['ada'])
+    resolver = UserResolver()
+    resolver.resolve(cursor, 'ada')
+    del cursor.users['ada']   # deleted by another request
+
+    writes = []
+
+    def write():
+        writes.append(cursor.users.get('ada'))
+        if writes[-1] is None:
+            raise DatabaseError(1452, "Cannot add or update a child row: a foreign key constraint fails")
+        return 'ok'
+
+    assert resolver.write_as(cursor, 'ada', write) == 'ok'
+    assert writes == [None, 100]
+    assert resolver.stats()['stale'] == 1
+
+
+def test_write_failures_for_fresh_names_are_not_retried():
+    cursor = FakeUsers(['ada'])
+    calls = []
+
+    def write():
+        calls.append(1)
+        raise DatabaseError(1452, "foreign key constraint fails")
+
+    with pytest.raises(DatabaseError):
+        UserResolver().write_as(cursor, 'ada', write)
+    assert calls == [1]
+
+
+def test_other_errors_are_not_retried():
+    cursor = FakeUsers(['ada'])
+    resolver = UserResolver()
+    resolver.resolve(cursor, 'ada')
+    calls = []
+
+    def write():
+        calls.append(1)
+        raise DatabaseError(3819, "Check constraint is violated")
+
+    with pytest.raises(DatabaseError):
+        resolver.write_as(cursor, 'ada', write)
+    assert calls == [1]
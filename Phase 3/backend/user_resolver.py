@@ -0,0 +1,138 @@
+"""
+Name -> UserID resolution for the write endpoints.
+
+create_resource and submit_rating accept an author/poster by name and
+create a student account for names that do not exist yet. Resolving a
+name is a SELECT by the unique Name, plus an INSERT INTO user and
+INSERT INTO student only when it misses, so looking up an existing user
+never takes an AUTO_INCREMENT value. Two requests creating the same name
+at once meet on the unique key; the loser reads the winner's row.
+
+Names seen before are answered from a bounded in-process LRU with no
+round trip at all. A cached name can be stale when the user was deleted
+since, so write_as() runs the write that depends on the user and, if it
+fails on the missing reference, evicts the name, resolves it again and
+retries once.
+"""
+import threading
+from collections import OrderedDict
+
+SELECT_USER_SQL = "SELECT UserID FROM user WHERE Name = %s"
+INSERT_USER_SQL = "INSERT INTO user (Name, Courses, IsProfessor, Password) VALUES (%s, NULL, FALSE, 'defaultpass')"
+
+ER_DUP_ENTRY = 1062
+ER_NO_REFERENCED_ROW_2 = 1452
+# Stored procedures with an exit handler (SP_Rating_Rate) re-signal every error as 45000
+ER_SIGNAL_EXCEPTION = 1644
+MISSING_REFERENCE_ERRORS = (ER_NO_REFERENCED_ROW_2, ER_SIGNAL_EXCEPTION)
+
+
+def error_code(error):
+    args = getattr(error, 'args', ())
+    return args[0] if args and isinstance(args[0], int) else None
+
+
+def _first_column(row):
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+class UserResolver:
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ids = OrderedDict()   # Name -> UserID
+
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.stale = 0
+
+    # UserID for name, creating the user (as a student) inside the caller's transaction
+    def resolve(self, cursor, name):
+        return self._resolve(cursor, name)[0]
+
+    # (UserID, whether it came from the cache)
+    def _resolve(self, cursor, name):
+        with self._lock:
+            user_id = self._ids.get(name)
+            if user_id is not None:
+                self._ids.move_to_end(name)
+                self.hits += 1
+                return user_id, True
+            self.misses += 1
+
+        user_id = self._select(cursor, name)
+        if user_id is None:
+            try:
+                cursor.execute(INSERT_USER_SQL, (name,))
+            except Exception as e:
+                if error_code(e) != ER_DUP_ENTRY:
+                    raise
+                # Created by another request after this transaction's snapshot; a locking read sees it
+                user_id = self._select(cursor, name, locking=True)
+                if user_id is None:
+                    raise
+            else:
+                user_id = cursor.lastrowid
+                cursor.execute("INSERT INTO student (UserID) VALUES (%s)", (user_id,))
+                with self._lock:
+                    self.created += 1
+                # Not cached until a later request sees it committed, the caller may still roll back
+                return user_id, False
+
+        self._store(name, user_id)
+        return user_id, False
+
+    @staticmethod
+    def _select(cursor, name, locking=False):
+        cursor.execute(SELECT_USER_SQL + (" LOCK IN SHARE MODE" if locking else ""), (name,))
+        row = cursor.fetchone()
+        return _first_column(row) if row else None
+
+    # Resolves name, then runs write(), which needs the user to exist. When the name came from
+    # the cache and write() fails on the missing user, the entry was stale: resolve it again
+    # (recreating the user) and retry write() once
+    def write_as(self, cursor, name, write):
+        _, cached = self._resolve(cursor, name)
+        try:
+            return write()
+        except Exception as e:
+            if not cached or error_code(e) not in MISSING_REFERENCE_ERRORS:
+                raise
+            self.forget(name)
+            with self._lock:
+                self.stale += 1
+            self._resolve(cursor, name)
+            return write()
+
+    def _store(self, name, user_id):
+        with self._lock:
+            self._ids[name] = user_id
+            self._ids.move_to_end(name)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    # Drop a name whose cached id may be stale (user deleted or renamed)
+    def forget(self, name):
+        with self._lock:
+            self._ids.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+    # stats() keys that only ever go up, exported to Prometheus as counters
+    STATS_COUNTERS = ("hits", "misses", "created", "stale")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._ids),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "created": self.created,
+                "stale": self.stale,
+            }
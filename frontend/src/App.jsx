@@ -11,6 +11,27 @@ import HomePage from './pages/HomePage.jsx';
 
 const API_BASE_URL = 'http://127.0.0.1:8080/api';
 
+// The API hands out resource lists a page at a time (at most 500 rows)
+const RESOURCE_PAGE_SIZE = 500;
+
+// Fetch every page of /resources, following next_cursor until the list is complete
+async function fetchAllResources(params = {}) {
+  const resources = [];
+  let after = null;
+  do {
+    const query = new URLSearchParams({ ...params, limit: RESOURCE_PAGE_SIZE });
+    if (after) query.set('after', after);
+    const response = await fetch(`${API_BASE_URL}/resources?${query}`);
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    const page = await response.json();
+    resources.push(...page.resources);
+    after = page.next_cursor;
+  } while (after);
+  return resources;
+}
+
 const sampleNotes = [
 ];
 
@@ -110,14 +131,7 @@ export default function App(){
     const fetchNotes = async () => {
       setLoading(true);
       try {
-        const response = await fetch(`${API_BASE_URL}/resources`);
-        if (response.ok) {
-          const data = await response.json();
-          setNotes(data);
-        } else {
-          console.error('Failed to fetch notes');
-          setNotes(sampleNotes); // Fallback to sample data
-        }
+        setNotes(await fetchAllResources());
       } catch (error) {
         console.error('Error fetching notes:', error);
         setNotes(sampleNotes); // Fallback to sample data
@@ -252,14 +266,7 @@ export default function App(){
     if (query && query.trim()) {
       setLoading(true);
       try {
-        const response = await fetch(`${API_BASE_URL}/resources?search=${encodeURIComponent(query)}`);
-        if (response.ok) {
-          const data = await response.json();
-          setSearchResults(data);
-        } else {
-          console.error('Failed to fetch search results');
-          setSearchResults(sampleSearch);
-        }
+        setSearchResults(await fetchAllResources({ search: query }));
       } catch (error) {
         console.error('Error fetching search results:', error);
         setSearchResults(sampleSearch);
@@ -302,11 +309,7 @@ export default function App(){
   const handleNoteCreated = async () => {
     setLoading(true);
     try {
-      const response = await fetch(`${API_BASE_URL}/resources`);
-      if (response.ok) {
-        const data = await response.json();
-        setNotes(data);
-      }
+      setNotes(await fetchAllResources());
     } catch (error) {
       console.error('Error refreshing notes:', error);
     } finally {
@@ -7,11 +7,15 @@ function NotePage({ noteId, note, resource, onBack, user, apiBaseUrl }) {
   const [ratingMessage, setRatingMessage] = useState('');
   const [submittingRating, setSubmittingRating] = useState(false);
 
-  // Fetch resource details from API if noteId provided and no initial data
+  // Fetch resource details from API if noteId provided; list rows are a compact
+  // projection without Body/Url, so a note from the list is only shown meanwhile
   useEffect(() => {
-    if (noteId && !note && !resource && apiBaseUrl) {
+    if (noteId && !resource && apiBaseUrl) {
+      if (note) {
+        setResourceData(note);
+      }
       const fetchResource = async () => {
-        setLoading(true);
+        setLoading(!note);
         try {
           const response = await fetch(`${apiBaseUrl}/resources/${noteId}`);
           if (response.ok) {
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Convert scraper output files between json, ndjson and columnar.
+
+    python3 convert_scrapes.py                       # oldVersions/Scraping scripts/*.json to ndjson
+    python3 convert_scrapes.py a.json b.json --to columnar -o converted/
+    python3 convert_scrapes.py *.json --to ndjson --append -o all.ndjson
+
+Each input is streamed through scraper_stream.iter_rows, so its format is
+detected and it never has to fit in memory. Without --append every input
+gets its own output file, named after the input with the new extension,
+in the output directory (default: next to the input). With --append all
+inputs go into the one ndjson or columnar file given by -o. Files that
+hold no scraper rows (raw page dumps, ignore lists) are skipped.
+"""
+import argparse
+import glob
+import itertools
+import os
+import sys
+
+from scraper_stream import EXTENSION_FOR, iter_rows, sniff_format, write_rows
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+LEGACY_DIR = os.path.join(script_dir, 'oldVersions', 'Scraping scripts')
+
+
+def _size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def convert(path, out_path, fmt, append=False):
+    """Rewrites one scraper file as fmt, returning the row count per section."""
+    if os.path.abspath(path) == os.path.abspath(out_path):
+        raise ValueError('input and output are the same file')
+    rows = iter_rows(path)
+    if append:
+        return write_rows(rows, out_path, fmt, append=True)
+    # peek first so a file without scraper rows leaves no empty output behind
+    first = next(rows, None)
+    if first is None:
+        raise ValueError('no scraper rows')
+    try:
+        return write_rows(itertools.chain([first], rows), out_path, fmt)
+    except ValueError:
+        # a file that broke off partway leaves no half-written output
+        os.remove(out_path)
+        raise
+
+
+def main():
+    p = argparse.ArgumentParser(description='Convert scraper output between json, ndjson and columnar')
+    p.add_argument('inputs', nargs='*', help='scraper files (default: the legacy .json files in oldVersions/Scraping scripts)')
+    p.add_argument('--to', choices=sorted(EXTENSION_FOR), default='ndjson', help='output format (default: ndjson)')
+    p.add_argument('-o', '--output', help='output directory, or the output file with --append')
+    p.add_argument('--append', action='store_true', help='append every input to the one ndjson or columnar file given by -o')
+    args = p.parse_args()
+
+    inputs = args.inputs or sorted(glob.glob(os.path.join(LEGACY_DIR, '*.json')))
+    if args.append:
+        if args.to == 'json':
+            p.error('--append needs --to ndjson or columnar')
+        if not args.output:
+            p.error('--append needs -o with the output file')
+    elif args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    total_in = total_out = converted = 0
+    for path in inputs:
+        if args.append:
+            out_path = args.output
+        else:
+            name = os.path.splitext(os.path.basename(path))[0] + EXTENSION_FOR[args.to]
+            out_path = os.path.join(args.output or os.path.dirname(path) or '.', name)
+        before = _size(out_path) if args.append else 0
+        try:
+            source_format = sniff_format(path)
+            counts = convert(path, out_path, args.to, append=args.append)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        rows = sum(counts.values())
+        if args.append and not rows:
+            print(f"Skipping {path}: no scraper rows")
+            continue
+        size_in, size_out = _size(path), _size(out_path) - before
+        total_in += size_in
+        total_out += size_out
+        converted += 1
+        print(f"{path} ({source_format}, {size_in:,} bytes) -> {out_path} ({args.to}, {size_out:,} bytes), {rows} rows")
+
+    if not converted:
+        print('No scraper files converted')
+        sys.exit(1)
+    print(f"Converted {converted} file(s): {total_in:,} -> {total_out:,} bytes")
+
+
+if __name__ == '__main__':
+    main()
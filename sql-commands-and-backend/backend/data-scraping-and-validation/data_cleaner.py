@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import os
 import random
 import datetime
 import urllib.parse
 import re
 
+from scraper_stream import EXTENSION_FOR, FORMATS, SECTIONS, iter_data, iter_rows, write_rows
+
 
 def _truncate_string(s, length):
     if s is None:
@@ -75,144 +76,108 @@ def canonical_keys(obj):
     return mapping
 
 
-def clean_data(data, preserve_ids=False):
-    
-    if not isinstance(data, dict):
-        raise ValueError('expected top-level JSON object')
+def clean_rows(rows, preserve_ids=False):
+    """Cleans a (section, row) stream, yielding cleaned (section, row) pairs.
 
-    # make sure canonical top-level arrays exist
-    top = {}
-    for name in ('Resource', 'Note', 'pdf', 'Image', 'Video', 'Website'):
-        # accept lowercase versions
-        found = data.get(name) or data.get(name.lower()) or []
-        top[name] = list(found) if isinstance(found, list) else []
+    Rows pass straight through except images, which are deduplicated by URL
+    and come out at the end with their new Resource and Note rows."""
 
     # collect used resource ids
     used_ids = set()
-    for r in top['Resource']:
-        if isinstance(r, dict) and isinstance(r.get('ResourceID'), int):
-            used_ids.add(r['ResourceID'])
 
-    # build a mapping for existing Image rows (Link -> ResourceID)
+    # image candidates by URL (Link -> ResourceID of an existing Image row)
     url_to_img_res = {}
-    for img in top['Image']:
-        if not isinstance(img, dict):
-            continue
-        link = img.get('Link') or img.get('link') or img.get('url')
-        rid = img.get('ResourceID') if isinstance(img.get('ResourceID'), int) else None
-        if link:
-            if rid is not None:
-                url_to_img_res[link] = rid
-
+    dedup = {}
 
-    # collect all image candidates from existing Image rows
-    all_image_entries = []
-    for img in top['Image']:
-        if not isinstance(img, dict):
-            continue
-        link = img.get('Link') or img.get('link') or img.get('url')
-        if not link:
+    for section, row in rows:
+        if not isinstance(row, dict):
             continue
-        size_val = compute_image_size(img)
-        alt = None
-        # try to find alt in Note rows that reference this ResourceID
-        alt = img.get('Alt') or img.get('alt') or img.get('Title') or img.get('title')
-        all_image_entries.append({'url': link, 'alt': alt, 'size': size_val, 'orig': img})
 
-    # dedupe by URL
-    dedup = {}
-    for it in all_image_entries:
-        if not it.get('url'):
-            continue
-        if it['url'] in dedup:
-            if dedup[it['url']].get('size', 0) < it.get('size', 0):
-                dedup[it['url']] = it
-        else:
-            dedup[it['url']] = it
+        if section == 'Resource':
+            if isinstance(row.get('ResourceID'), int):
+                used_ids.add(row['ResourceID'])
+            row['Topic'] = _truncate_string(row.get('Topic'), 25) or 'image'
+            yield 'Resource', row
+
+        elif section == 'Image':
+            link = row.get('Link') or row.get('link') or row.get('url')
+            if not link:
+                continue
+            rid = row.get('ResourceID') if isinstance(row.get('ResourceID'), int) else None
+            if rid is not None:
+                url_to_img_res[link] = rid
+            # dedupe by URL, keeping the largest
+            alt = row.get('Alt') or row.get('alt') or row.get('Title') or row.get('title')
+            info = {'url': link, 'alt': alt, 'size': compute_image_size(row)}
+            if link not in dedup or dedup[link].get('size', 0) < info['size']:
+                dedup[link] = info
+
+        # normalize videos
+        elif section == 'Video':
+            link = row.get('Link') or row.get('link')
+            if link:
+                row['Link'] = normalize_youtube_url(link)
+            yield 'Video', row
+
+        # normalize websites
+        elif section == 'Website':
+            link = row.get('Link') or row.get('link')
+            if link:
+                row['Link'] = link
+            yield 'Website', row
+
+        # pdfs and notes
+        elif section == 'pdf':
+            body = row.get('Body') or row.get('body') or row.get('filepath') or row.get('url')
+            url = body
+            yield 'pdf', {'ResourceID': row.get('ResourceID'), 'Link': url, 'Body': _truncate_string(body, 2048)}
+
+        elif section == 'Note':
+            yield 'Note', row
 
     # ensure each unique image URL has a Resource and Image row, and that Notes reference the same ResourceID
-    new_resources = list(top['Resource'])
-    new_images = []
-    new_notes = list(top['Note'])
-
     for url, info in dedup.items():
         # reuse existing ResourceID if present
-        rid = None
-        if url in url_to_img_res:
-            rid = url_to_img_res[url]
-        if rid is None and preserve_ids:
-            rid = None
+        rid = url_to_img_res.get(url)
         if rid is None:
             rid = gen_id(used_ids)
             # create a Resource entry for this image
             topic = _truncate_string(info.get('alt') or os.path.basename(urllib.parse.urlparse(url).path) or 'image', 25)
-            new_resources.append({
+            yield 'Resource', {
                 'ResourceID': rid,
                 'Date': datetime.date.today().isoformat(),
                 'DateFor': datetime.date.today().isoformat(),
                 'Author': 'khan accademy, lobster notes web scraper',
-                'Topic': topic,
+                'Topic': topic or 'image',
                 'Keywords': None,
                 'Rating': 9.9,
                 'Format': 'Image',
                 'isVerified': False,
-            })
+            }
         # create Image row
         size_val = int(info.get('size') or 1)
         if size_val <= 0:
             size_val = 1
-        new_images.append({'ResourceID': rid, 'Link': url, 'Size': size_val})
-        # attach a Note for the image 
+        yield 'Image', {'ResourceID': rid, 'Link': url, 'Size': size_val}
+        # attach a Note for the image
         alt_text = info.get('alt')
         if alt_text:
-            new_notes.append({'ResourceID': rid, 'Body': _truncate_string(alt_text, 2048)})
+            yield 'Note', {'ResourceID': rid, 'Body': _truncate_string(alt_text, 2048)}
 
-    # normalize videos    
-    new_videos = []
-    for v in top['Video']:
-        if not isinstance(v, dict):
-            continue
-        link = v.get('Link') or v.get('link')
-        if link:
-            v['Link'] = normalize_youtube_url(link)
-        new_videos.append(v)
-
-    # normalize websites
-    new_websites = []
-    for w in top['Website']:
-        if not isinstance(w, dict):
-            continue
-        link = w.get('Link') or w.get('link')
-        if link:
-            w['Link'] = link
-        new_websites.append(w)
-
-    # pdfs and notes
-    new_pdfs = []
-    for p in top['pdf']:
-        if not isinstance(p, dict):
-            continue
-        body = p.get('Body') or p.get('body') or p.get('filepath') or p.get('url')
-        url=body
-        new_pdfs.append({'ResourceID': p.get('ResourceID'), 'Link': url, 'Body': _truncate_string(body, 2048)})
-
-    # ensure Resource topics and note bodies truncated
-    final_resources = []
-    for r in new_resources:
-        if not isinstance(r, dict):
-            continue
-        r['Topic'] = _truncate_string(r.get('Topic'), 25) or 'image'
-        final_resources.append(r)
-
-    # assemble result
-    out = {
-        'Resource': final_resources,
-        'Note': new_notes,
-        'pdf': new_pdfs,
-        'Image': new_images,
-        'Video': new_videos,
-        'Website': new_websites,
-    }
+
+def clean_data(data, preserve_ids=False):
+
+    # a loaded scraper document, or (section, row) pairs as read by iter_rows from an ndjson or columnar file
+    if isinstance(data, dict):
+        rows = iter_data(data)
+    elif isinstance(data, (str, bytes)) or not hasattr(data, '__iter__'):
+        raise ValueError('expected top-level JSON object or (section, row) pairs')
+    else:
+        rows = data
+
+    out = {name: [] for name in SECTIONS}
+    for section, row in clean_rows(rows, preserve_ids=preserve_ids):
+        out[section].append(row)
     return out
 
 
@@ -221,6 +186,7 @@ def main():
     p.add_argument('input')
     p.add_argument('output', nargs='?', help='output file (optional)')
     p.add_argument('--preserve-ids', action='store_true', help='try to reuse existing ResourceIDs when present')
+    p.add_argument('--format', choices=FORMATS, help='output format (default: by output extension, the input format is detected)')
     args = p.parse_args()
 
    
@@ -228,19 +194,16 @@ def main():
         inp = args.input
         idir, ifname = os.path.split(inp)
         name, ext = os.path.splitext(ifname)
-        if not ext:
+        if args.format:
+            ext = EXTENSION_FOR[args.format]
+        elif not ext:
             ext = '.json'
         outp = os.path.join(idir or '.', f"{name}_cleaned{ext}")
     else:
         outp = args.output
 
-    with open(args.input, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    cleaned = clean_data(data, preserve_ids=args.preserve_ids)
-
-    with open(outp, 'w', encoding='utf-8') as f:
-        json.dump(cleaned, f, ensure_ascii=False, indent=2)
+    # rows are read and written one at a time, so any size of crawl output fits in memory
+    write_rows(clean_rows(iter_rows(args.input), preserve_ids=args.preserve_ids), outp, args.format)
 
     print(f'Wrote cleaned data to {outp}')
 
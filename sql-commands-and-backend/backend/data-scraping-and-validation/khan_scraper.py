@@ -10,6 +10,7 @@ import datetime
 import random
 import struct
 import io
+from scraper_stream import EXTENSION_FOR, FORMATS, iter_data, iter_rows, path_format, write_rows
 
 IGNORE_FILE = os.path.join(os.path.dirname(__file__), 'ignore_links.json')
 try:
@@ -296,7 +297,7 @@ def _truncate_string(s, length):
     s = str(s).strip()
     return s if len(s) <= length else s[:length]
 
-def write_json(data, outpath):
+def write_json(data, outpath, fmt=None):
     today = datetime.date.today().isoformat()
     resources = []
     notes = []
@@ -309,14 +310,10 @@ def write_json(data, outpath):
     used_ids = set()
     if os.path.exists(outpath):
         try:
-            with open(outpath, 'r', encoding='utf-8') as ef:
-                existing = json.load(ef)
-            if isinstance(existing, dict):
-                for tab in ('Resource', 'Note', 'pdf', 'Image', 'Video', 'Website'):
-                    for row in existing.get(tab, []) if isinstance(existing.get(tab, []), list) else []:
-                        rid = row.get('ResourceID') if isinstance(row, dict) else None
-                        if isinstance(rid, int):
-                            used_ids.add(rid)
+            for _, row in iter_rows(outpath):
+                rid = row.get('ResourceID') if isinstance(row, dict) else None
+                if isinstance(rid, int):
+                    used_ids.add(rid)
         except Exception:
             used_ids = set()
 
@@ -443,6 +440,11 @@ def write_json(data, outpath):
         'Video': videos,
         'Website': websites,
     }
+    # ndjson and columnar outputs are picked by --format or the file extension
+    fmt = fmt or path_format(outpath)
+    if fmt != 'json':
+        write_rows(iter_data(out), outpath, fmt)
+        return
     with open(outpath,'w',encoding='utf-8') as f:
         json.dump(out,f,ensure_ascii=False,indent=2)
 
@@ -452,19 +454,19 @@ def start_driver():
     return webdriver.Chrome(options=opts)
 
 def parse_args():
-    p=argparse.ArgumentParser(); p.add_argument('url'); p.add_argument('name', nargs='?'); return p.parse_args()
+    p=argparse.ArgumentParser(); p.add_argument('url'); p.add_argument('name', nargs='?'); p.add_argument('--format', choices=FORMATS); return p.parse_args()
 
 def main():
     
     URL_MAX_LENGTH = 2048 #ensures URL fits into DB
 
-    args=parse_args(); url=args.url; outpath=args.name if args.name else ('khan_data_' + datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S') + '.json')
+    args=parse_args(); url=args.url; outpath=args.name if args.name else ('khan_data_' + datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S') + EXTENSION_FOR[args.format or 'json'])
     os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
     d = start_driver(); d.get(url); time.sleep(1); html = d.page_source
     print(f"Page loaded: {url}")
     data = parse_page(url, html, driver=d)
     print(f"Found {len(data.get('videos') or [])} video(s), {len(data.get('images') or [])} image(s), {len(data.get('links') or [])} link(s)")
-    write_json(data, outpath)
+    write_json(data, outpath, args.format)
     out_dir = os.path.join(os.path.dirname(outpath) or '.', 'downloaded_videos')
     pdf_dir = os.path.join(os.path.dirname(outpath) or '.', 'downloadedPDFS')
     os.makedirs(out_dir, exist_ok=True)
@@ -660,17 +662,17 @@ def main():
         if images:
             data['images'] = (data.get('images', []) or []) + images
         print(f"Writing video(s) to {outpath}")
-        write_json(data, outpath)
+        write_json(data, outpath, args.format)
     if documents:
         data['documents'] = data.get('documents', []) + documents
         if images:
             data['images'] = (data.get('images', []) or []) + images
         print(f"Writing documents to {outpath}")
-        write_json(data, outpath)
+        write_json(data, outpath, args.format)
     elif images:
         data['images'] = (data.get('images', []) or []) + images
         print(f"Writing images to {outpath}")
-        write_json(data, outpath)
+        write_json(data, outpath, args.format)
 
   
 if __name__=='__main__': main()
@@ -7,6 +7,7 @@ from decimal import Decimal
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from scraper_stream import EXTENSION_FOR, FORMATS, iter_data, iter_rows, path_format, write_rows
 
 def extract_meta_video(soup):
     urls = []
@@ -115,7 +116,7 @@ def _truncate_string(s, length):
     return s if len(s) <= length else s[:length]
 
 
-def write_json(data, outpath):
+def write_json(data, outpath, fmt=None):
    
     today = datetime.date.today().isoformat()
     resources = []
@@ -247,6 +248,11 @@ def write_json(data, outpath):
         'Website': websites,
     }
 
+    # ndjson and columnar outputs are picked by --format or the file extension
+    fmt = fmt or path_format(outpath)
+    if fmt != 'json':
+        write_rows(iter_data(out), outpath, fmt)
+        return
     with open(outpath,'w',encoding='utf-8') as f:
         json.dump(out,f,ensure_ascii=False,indent=2)
 
@@ -298,10 +304,10 @@ def get_image_dimensions(url, driver=None, timeout=5):
                 pass
 
 def parse_args():
-    p=argparse.ArgumentParser(); p.add_argument('url'); p.add_argument('name', nargs='?'); return p.parse_args()
+    p=argparse.ArgumentParser(); p.add_argument('url'); p.add_argument('name', nargs='?'); p.add_argument('--format', choices=FORMATS); return p.parse_args()
 
 def main():
-    args=parse_args(); url=args.url; outpath=args.name if args.name else ('mit_data_' + datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S') + '.json')
+    args=parse_args(); url=args.url; outpath=args.name if args.name else ('mit_data_' + datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S') + EXTENSION_FOR[args.format or 'json'])
     os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
     d = start_driver(); d.get(url); time.sleep(1); html = d.page_source
     print(f"Page loaded: {url}")
@@ -329,6 +335,6 @@ def main():
     except Exception:
         pass
     print(f"Writing output to {outpath}")
-    write_json(data, outpath)
+    write_json(data, outpath, args.format)
 
 if __name__=='__main__': main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Compact columnar format for scraper rows (.lnc files).
+
+A file is the magic line b'LNCOL1\\n' followed by self-contained blocks,
+each holding up to GROUP_SIZE rows of one section stored column by
+column, so appending is writing more blocks. A block is
+
+    4-byte little-endian header length
+    header JSON: {"section", "rows", "columns": [{"name", "type", "sizes"}]}
+    per column: zlib(state), zlib(values)
+
+state has one byte per row: 0 key absent, 1 null, 2 value present.
+values holds the present values packed by column type: 'i' int64 and
+'f' float64 arrays, 'b' one byte per bool, 's' UTF-8 strings and 'j'
+JSON text for anything else (mixed types, nested values), the last two
+as a uint32 length array followed by the bytes.
+"""
+import json
+import os
+import struct
+import zlib
+from array import array
+
+MAGIC = b'LNCOL1\n'
+
+GROUP_SIZE = 65536
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+ABSENT, NULL, PRESENT = 0, 1, 2
+
+
+def _column_type(values):
+    kinds = {type(v) for v in values}
+    if not kinds or kinds == {str}:
+        return 's'
+    if kinds == {bool}:
+        return 'b'
+    if kinds == {int} and all(INT64_MIN <= v <= INT64_MAX for v in values):
+        return 'i'
+    if kinds == {float}:
+        return 'f'
+    return 'j'
+
+
+def _pack_texts(texts):
+    encoded = [t.encode('utf-8') for t in texts]
+    lengths = array('I', (len(b) for b in encoded))
+    return struct.pack('<I', len(lengths)) + lengths.tobytes() + b''.join(encoded)
+
+
+def _unpack_texts(data):
+    (count,) = struct.unpack_from('<I', data)
+    lengths = array('I')
+    lengths.frombytes(data[4:4 + count * lengths.itemsize])
+    pos = 4 + count * lengths.itemsize
+    texts = []
+    for length in lengths:
+        texts.append(data[pos:pos + length].decode('utf-8'))
+        pos += length
+    return texts
+
+
+def _pack_values(kind, values):
+    if kind == 'i':
+        return array('q', values).tobytes()
+    if kind == 'f':
+        return array('d', values).tobytes()
+    if kind == 'b':
+        return bytes(values)
+    if kind == 's':
+        return _pack_texts(values)
+    return _pack_texts([json.dumps(v, ensure_ascii=False) for v in values])
+
+
+def _unpack_values(kind, data):
+    if kind in ('i', 'f'):
+        values = array('q' if kind == 'i' else 'd')
+        values.frombytes(data)
+        return values.tolist()
+    if kind == 'b':
+        return [bool(b) for b in data]
+    if kind == 's':
+        return _unpack_texts(data)
+    return [json.loads(t) for t in _unpack_texts(data)]
+
+
+def encode_block(section, rows):
+    """One block of bytes for rows of a single section."""
+    names = list(dict.fromkeys(key for row in rows for key in row))
+    header = {'section': section, 'rows': len(rows), 'columns': []}
+    parts = []
+    for name in names:
+        state = bytearray(len(rows))
+        present = []
+        for i, row in enumerate(rows):
+            if name not in row:
+                continue
+            value = row[name]
+            if value is None:
+                state[i] = NULL
+            else:
+                state[i] = PRESENT
+                present.append(value)
+        kind = _column_type(present)
+        packed_state = zlib.compress(bytes(state))
+        packed_values = zlib.compress(_pack_values(kind, present))
+        header['columns'].append({'name': name, 'type': kind, 'sizes': [len(packed_state), len(packed_values)]})
+        parts += [packed_state, packed_values]
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    return struct.pack('<I', len(header_bytes)) + header_bytes + b''.join(parts)
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("truncated columnar block")
+    return data
+
+
+def iter_blocks(f):
+    """Yields (section, rows) for each block of an open .lnc file."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a columnar scraper file (bad magic)")
+    while True:
+        size_bytes = f.read(4)
+        if not size_bytes:
+            return
+        if len(size_bytes) != 4:
+            raise ValueError("truncated columnar block")
+        (header_size,) = struct.unpack('<I', size_bytes)
+        header = json.loads(_read_exact(f, header_size).decode('utf-8'))
+        count = header['rows']
+        rows = [{} for _ in range(count)]
+        for column in header['columns']:
+            state_size, values_size = column['sizes']
+            state = zlib.decompress(_read_exact(f, state_size))
+            values = iter(_unpack_values(column['type'], zlib.decompress(_read_exact(f, values_size))))
+            name = column['name']
+            for row, flag in zip(rows, state):
+                if flag == PRESENT:
+                    row[name] = next(values)
+                elif flag == NULL:
+                    row[name] = None
+        yield header['section'], rows
+
+
+def iter_columnar(path):
+    with open(path, 'rb') as f:
+        for section, rows in iter_blocks(f):
+            for row in rows:
+                yield section, row
+
+
+def write_columnar(rows, path, append=False, group_size=GROUP_SIZE):
+    """Writes (section, row) pairs as blocks of up to group_size rows per section.
+
+    Returns the row count per section."""
+    if append and os.path.exists(path) and os.path.getsize(path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a columnar scraper file, cannot append to it")
+    counts = {}
+    pending = {'Resource': []}
+    with open(path, 'ab' if append else 'wb') as f:
+
+        def flush(section):
+            # Resources go out first, so a child row never lands in a block before its resource
+            if section != 'Resource' and pending['Resource']:
+                flush('Resource')
+            f.write(encode_block(section, pending[section]))
+            pending[section] = []
+
+        if f.tell() == 0:
+            f.write(MAGIC)
+        for section, row in rows:
+            group = pending.setdefault(section, [])
+            group.append(row)
+            counts[section] = counts.get(section, 0) + 1
+            if len(group) >= group_size:
+                flush(section)
+        for section in list(pending):
+            if pending[section]:
+                flush(section)
+    return counts
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Incremental reading and writing of scraper output files.
+
+Three formats carry the same Resource, Note, pdf, Image, Video and
+Website rows between the scrapers, data_cleaner.py, validate.py and the
+importers:
+
+    json      the original document of six arrays (.json)
+    ndjson    one typed row per line, {"type": "Video", "ResourceID": ...}
+              (.ndjson or .jsonl); files can be appended to and concatenated
+    columnar  compressed column blocks, see scraper_columnar.py (.lnc)
+
+iter_rows yields (section, row) one row at a time from any of them,
+reading the file in chunks, so crawl outputs of any size are handled in
+bounded memory; write_rows writes such a stream in the format the output
+path names. A file's format is sniffed from its first bytes, so an
+NDJSON file saved as .json still reads correctly.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from scraper_columnar import MAGIC as COLUMNAR_MAGIC, iter_columnar, write_columnar
+
+SECTIONS = ('Resource', 'Note', 'pdf', 'Image', 'Video', 'Website')
+
+# lowercase spellings are accepted, as data_cleaner always did
+SECTION_NAMES = {name.lower(): name for name in SECTIONS}
+
+FORMATS = ('json', 'ndjson', 'columnar')
+
+EXTENSIONS = {'.json': 'json', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.lnc': 'columnar'}
+
+EXTENSION_FOR = {'json': '.json', 'ndjson': '.ndjson', 'columnar': '.lnc'}
+
+# Key naming the section of an NDJSON row
+TYPE_KEY = 'type'
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    # A growing window over the file; everything before pos has been consumed
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # Next non-whitespace character without consuming it, '' at end of file
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} in scraper JSON, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        # Decodes one JSON value, reading more of the file until it is complete
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number that ends at the buffer edge might continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill(size):
+                continue
+            size *= 2
+
+
+def iter_sections(f, chunk_size=CHUNK_SIZE):
+    """Yields (key, row) for every element of every top-level array, in file order."""
+    reader = _Reader(f, chunk_size)
+    reader.expect('{')
+    while True:
+        char = reader.peek()
+        if char == '}':
+            return
+        if char == ',':
+            reader.pos += 1
+            continue
+        key = reader.value()
+        reader.expect(':')
+        if reader.peek() != '[':
+            # Not an array of rows, skip it whole
+            reader.value()
+            continue
+        reader.pos += 1
+        while True:
+            char = reader.peek()
+            if char == ']':
+                reader.pos += 1
+                break
+            if char == ',':
+                reader.pos += 1
+                continue
+            if char == '':
+                raise ValueError("unexpected end of file in scraper JSON")
+            yield key, reader.value()
+
+
+def path_format(path, default='json'):
+    # Format an output path asks for, by extension
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def sniff_format(path):
+    with open(path, 'rb') as f:
+        head = f.read(CHUNK_SIZE)
+    if head.startswith(COLUMNAR_MAGIC):
+        return 'columnar'
+    first_line = head.split(b'\n', 1)[0].strip()
+    try:
+        row = json.loads(first_line)
+    except ValueError:
+        # An indented document starts with a lone '{', a one-line document rarely fits in the chunk
+        return 'json'
+    if isinstance(row, dict) and isinstance(row.get(TYPE_KEY), str) and row[TYPE_KEY] in SECTIONS \
+            and not any(isinstance(v, list) for v in row.values()):
+        return 'ndjson'
+    return 'json'
+
+
+def iter_json(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, row in iter_sections(f, chunk_size):
+            section = SECTION_NAMES.get(key.lower()) if isinstance(key, str) else None
+            if section is not None:
+                yield section, row
+
+
+def iter_ndjson(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+            section = SECTION_NAMES.get(str(row.pop(TYPE_KEY, '')).lower()) if isinstance(row, dict) else None
+            if section is None:
+                raise ValueError(f"{path}:{number}: row without a known {TYPE_KEY!r}")
+            yield section, row
+
+
+def iter_rows(path, fmt=None, chunk_size=CHUNK_SIZE):
+    """Yields (section, row) for the scraper rows of a file in any of FORMATS."""
+    fmt = fmt or sniff_format(path)
+    if fmt == 'ndjson':
+        return iter_ndjson(path)
+    if fmt == 'columnar':
+        return iter_columnar(path)
+    if fmt == 'json':
+        return iter_json(path, chunk_size)
+    raise ValueError(f"Unknown format {fmt}, expected one of {', '.join(FORMATS)}")
+
+
+def iter_data(data):
+    # Same (section, row) stream for a document that is already in memory
+    for name in SECTIONS:
+        rows = data.get(name) or data.get(name.lower()) or []
+        for row in rows if isinstance(rows, list) else []:
+            yield name, row
+
+
+def write_sections(rows, out_path):
+    """Writes (section, row) pairs as one scraper JSON document, one row per line.
+
+    Returns the row count per section."""
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    counts = {name: 0 for name in SECTIONS}
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        parts = {name: open(os.path.join(tmp, name), 'w+', encoding='utf-8') for name in SECTIONS}
+        try:
+            for section, row in rows:
+                f = parts[section]
+                f.write((',\n' if counts[section] else '\n') + json.dumps(row, ensure_ascii=False))
+                counts[section] += 1
+
+            with open(out_path, 'w', encoding='utf-8') as out:
+                out.write('{')
+                for i, (name, f) in enumerate(parts.items()):
+                    out.write(f'{"," if i else ""}\n"{name}": [')
+                    f.seek(0)
+                    shutil.copyfileobj(f, out)
+                    out.write('\n]' if counts[name] else ']')
+                out.write('\n}\n')
+        finally:
+            for f in parts.values():
+                f.close()
+    return counts
+
+
+def ndjson_line(section, row):
+    if TYPE_KEY in row:
+        raise ValueError(f"{section} row already has a {TYPE_KEY!r} key: {row!r}")
+    return json.dumps({TYPE_KEY: section, **row}, ensure_ascii=False) + '\n'
+
+
+def write_ndjson(rows, out_path, append=False):
+    counts = {name: 0 for name in SECTIONS}
+    with open(out_path, 'a' if append else 'w', encoding='utf-8') as f:
+        for section, row in rows:
+            f.write(ndjson_line(section, row))
+            counts[section] += 1
+    return counts
+
+
+def write_rows(rows, out_path, fmt=None, append=False):
+    """Writes (section, row) pairs in fmt (default: by out_path's extension), returning counts per section.
+
+    append adds to an existing ndjson or columnar file; a json document has to be rewritten."""
+    fmt = fmt or path_format(out_path)
+    if fmt == 'ndjson':
+        return write_ndjson(rows, out_path, append)
+    if fmt == 'columnar':
+        return write_columnar(rows, out_path, append)
+    if fmt != 'json':
+        raise ValueError(f"Unknown format {fmt}, expected one of {', '.join(FORMATS)}")
+    if append:
+        raise ValueError("cannot append to a json document, use ndjson or columnar")
+    return write_sections(rows, out_path)
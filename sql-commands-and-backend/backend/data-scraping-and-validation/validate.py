@@ -1,19 +1,15 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import sys
 import re
 import datetime
 from decimal import Decimal, InvalidOperation
 
-
-URL_RE = re.compile(r"^https?://", re.IGNORECASE)
+from scraper_stream import FORMATS, SECTIONS, iter_data, iter_rows
 
 
-def load_json(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+URL_RE = re.compile(r"^https?://", re.IGNORECASE)
 
 
 def is_int(v):
@@ -82,13 +78,10 @@ def check_resource(row, errors, warnings, idx):
         errors.append((f'Resource[{idx}]', 'isVerified present but not boolean'))
 
 
-def check_note(row, errors, warnings, idx, resource_ids, table_name='Note'):
+def check_note(row, errors, warnings, idx, table_name='Note'):
     rid = row.get('ResourceID')
     if not is_int(rid):
         errors.append((f'{table_name}[{idx}]', 'ResourceID missing or not integer'))
-    else:
-        if rid not in resource_ids:
-            errors.append((f'{table_name}[{idx}]', f'ResourceID {rid} has no matching Resource'))
     body = row.get('Body')
     if not isinstance(body, str):
         errors.append((f'{table_name}[{idx}]', 'Body missing or not a string'))
@@ -97,13 +90,10 @@ def check_note(row, errors, warnings, idx, resource_ids, table_name='Note'):
             errors.append((f'{table_name}[{idx}]', f'Body too long ({len(body)} > 2048)'))
 
 
-def check_pdf(row, errors, warnings, idx, resource_ids):
+def check_pdf(row, errors, warnings, idx, table_name='pdf'):
     rid = row.get('ResourceID')
     if not is_int(rid):
         errors.append((f'{table_name}[{idx}]', 'ResourceID missing or not integer'))
-    else:
-        if rid not in resource_ids:
-            errors.append((f'{table_name}[{idx}]', f'ResourceID {rid} has no matching Resource'))
     body = row.get('Body')
     if not isinstance(body, str):
         errors.append((f'{table_name}[{idx}]', 'Body missing or not a string'))
@@ -112,13 +102,10 @@ def check_pdf(row, errors, warnings, idx, resource_ids):
             errors.append((f'{table_name}[{idx}]', f'Body too long ({len(body)} > 2048)'))
 
 
-def check_image(row, errors, warnings, idx, resource_ids):
+def check_image(row, errors, warnings, idx):
     rid = row.get('ResourceID')
     if not is_int(rid):
         errors.append((f'Image[{idx}]', 'ResourceID missing or not integer'))
-    else:
-        if rid not in resource_ids:
-            errors.append((f'Image[{idx}]', f'ResourceID {rid} has no matching Resource'))
 
     size = row.get('Size')
     if size is None:
@@ -133,13 +120,10 @@ def check_image(row, errors, warnings, idx, resource_ids):
             errors.append((f'Image[{idx}]', f'Link is present but not a valid http(s) URL: {link}'))
 
 
-def check_video(row, errors, warnings, idx, resource_ids):
+def check_video(row, errors, warnings, idx):
     rid = row.get('ResourceID')
     if not is_int(rid):
         errors.append((f'Video[{idx}]', 'ResourceID missing or not integer'))
-    else:
-        if rid not in resource_ids:
-            errors.append((f'Video[{idx}]', f'ResourceID {rid} has no matching Resource'))
 
     dur = row.get('Duration')
     if not is_int(dur) or dur <= 0:
@@ -151,97 +135,92 @@ def check_video(row, errors, warnings, idx, resource_ids):
             errors.append((f'Video[{idx}]', f'Link must be null or an http(s) URL: {link}'))
 
 
-def check_website(row, errors, warnings, idx, resource_ids):
+def check_website(row, errors, warnings, idx):
     rid = row.get('ResourceID')
     if not is_int(rid):
         errors.append((f'Website[{idx}]', 'ResourceID missing or not integer'))
-    else:
-        if rid not in resource_ids:
-            errors.append((f'Website[{idx}]', f'ResourceID {rid} has no matching Resource'))
 
     link = row.get('Link')
     if not isinstance(link, str) or not URL_RE.match(link):
         errors.append((f'Website[{idx}]', f'Link missing or invalid http(s) URL: {link}'))
 
 
-def validate(data):
-    errors = []
-    warnings = []
+CHILD_CHECKS = {
+    'Note': check_note,
+    'pdf': check_pdf,
+    'Image': check_image,
+    'Video': check_video,
+    'Website': check_website,
+}
 
-    # expected top-level keys
-    expected = {'Resource', 'Note', 'pdf', 'Image', 'Video', 'Website'}
-    present = set(k for k in data.keys())
-    missing = expected - present
-    if missing:
-        warnings.append(('top-level', f'Missing expected sections: {sorted(list(missing))}'))
 
-    resources = data.get('Resource', []) or []
-    notes = data.get('Note', []) or []
-    pdfs = data.get('pdf', []) or []
-    images = data.get('Image', []) or []
-    videos = data.get('Video', []) or []
-    websites = data.get('Website', []) or []
+def validate_rows(rows):
+    """Validates a (section, row) stream; only ResourceIDs are kept in memory."""
+    errors = []
+    warnings = []
 
-    # Validate Resource entries
+    present = set()
+    counts = {}
     resource_ids = set()
-    for idx, r in enumerate(resources):
-        if not isinstance(r, dict):
-            errors.append((f'Resource[{idx}]', 'Resource entry is not an object'))
+    # child rows whose Resource had not been read yet, checked at the end
+    unmatched = []
+
+    for section, row in rows:
+        idx = counts.get(section, 0)
+        counts[section] = idx + 1
+        present.add(section)
+
+        if section == 'Resource':
+            # Validate Resource entries
+            if not isinstance(row, dict):
+                errors.append((f'Resource[{idx}]', 'Resource entry is not an object'))
+                continue
+            check_resource(row, errors, warnings, idx)
+            rid = row.get('ResourceID')
+            if is_int(rid):
+                if rid in resource_ids:
+                    errors.append((f'Resource[{idx}]', f'Duplicate ResourceID {rid}'))
+                resource_ids.add(rid)
             continue
-        check_resource(r, errors, warnings, idx)
-        rid = r.get('ResourceID')
-        if is_int(rid):
-            if rid in resource_ids:
-                errors.append((f'Resource[{idx}]', f'Duplicate ResourceID {rid}'))
-            resource_ids.add(rid)
-
-    # Validate child tables
-    for idx, n in enumerate(notes):
-        if not isinstance(n, dict):
-            errors.append((f'Note[{idx}]', 'entry not an object'))
-            continue
-        check_note(n, errors, warnings, idx, resource_ids)
-
-    for idx, p in enumerate(pdfs):
-        if not isinstance(p, dict):
-            errors.append((f'pdf[{idx}]', 'entry not an object'))
-            continue
-        check_pdf(p, errors, warnings, idx, resource_ids)
 
-    for idx, im in enumerate(images):
-        if not isinstance(im, dict):
-            errors.append((f'Image[{idx}]', 'entry not an object'))
+        # Validate child tables
+        if not isinstance(row, dict):
+            errors.append((f'{section}[{idx}]', 'entry not an object'))
             continue
-        check_image(im, errors, warnings, idx, resource_ids)
+        CHILD_CHECKS[section](row, errors, warnings, idx)
+        rid = row.get('ResourceID')
+        if is_int(rid) and rid not in resource_ids:
+            unmatched.append((f'{section}[{idx}]', rid))
 
-    for idx, v in enumerate(videos):
-        if not isinstance(v, dict):
-            errors.append((f'Video[{idx}]', 'entry not an object'))
-            continue
-        check_video(v, errors, warnings, idx, resource_ids)
+    for src, rid in unmatched:
+        if rid not in resource_ids:
+            errors.append((src, f'ResourceID {rid} has no matching Resource'))
 
-    for idx, w in enumerate(websites):
-        if not isinstance(w, dict):
-            errors.append((f'Website[{idx}]', 'entry not an object'))
-            continue
-        check_website(w, errors, warnings, idx, resource_ids)
+    # expected top-level keys (a stream cannot tell a missing section from an empty one)
+    missing = set(SECTIONS) - present
+    if missing:
+        warnings.insert(0, ('top-level', f'Missing or empty expected sections: {sorted(list(missing))}'))
 
     return errors, warnings
 
 
+def validate(data):
+    # a loaded scraper document, or (section, row) pairs as read by iter_rows from any format
+    return validate_rows(iter_data(data) if isinstance(data, dict) else data)
+
+
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument('jsonfile')
+    p.add_argument('jsonfile', help='scraper output in json, ndjson or columnar format')
+    p.add_argument('--format', choices=FORMATS, help='input format (default: detected from the file)')
     args = p.parse_args()
 
     try:
-        data = load_json(args.jsonfile)
-    except Exception as e:
-        print(f'ERROR: failed to read JSON file: {e}', file=sys.stderr)
+        errors, warnings = validate_rows(iter_rows(args.jsonfile, args.format))
+    except (OSError, ValueError) as e:
+        print(f'ERROR: failed to read scraper file: {e}', file=sys.stderr)
         sys.exit(2)
 
-    errors, warnings = validate(data)
-
     if warnings:
         print('\nWarnings:')
         for src, msg in warnings:
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Bulk import scraper output into the Lobster Notes database.
+
+    python3 bulk_import.py khan_output_cleaned.json [more.ndjson crawl.lnc ...] [--method insert|load]
+    python3 bulk_import.py data.json --dry-run
+
+Rows are streamed one at a time from the scraper shape (Resource, Note,
+pdf, Image, Video, Website) by scraper_stream.py, from JSON, NDJSON or
+columnar files (detected per file unless --format is given), normalized the way
+the old importers did and grouped per table. --method insert sends each table's rows as
+multi-row INSERTs, --batch-size rows per statement. --method load
+writes each table to a temp CSV and loads it with LOAD DATA LOCAL
+INFILE, which needs local_infile enabled on the server.
+
+Foreign key and unique checks are off while rows load. That is only
+safe because the importer checks what they would have caught:
+ResourceIDs already in the database or repeated in the input are
+skipped, a child row needs an imported resource that appeared before
+it, and authors are created (with the checks on) before their
+resources. Rows that would break a CHECK constraint are skipped too,
+and every skip is counted by reason. The whole import is one
+transaction; resource_summary and resource_subject are refreshed for
+the imported ids before it commits, together with one cache_version
+bump per tag, which is what tells the API workers their cached responses
+are out of date.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+import MySQLdb
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, 'backend', 'data-scraping-and-validation'))
+from scraper_stream import FORMATS, iter_rows
+
+socket_paths = [
+    os.path.expanduser('~/mysql.sock'),
+    '/tmp/mysql.sock',
+    '/var/run/mysqld/mysqld.sock',
+    '/var/run/mysqld/mysql.sock',
+]
+
+DEFAULT_FILE = os.path.join(script_dir, 'backend', 'data-scraping-and-validation', 'oldVersions',
+                            'Scraping scripts', 'data.json')
+
+# Author for resources without one, as in ImportData
+DEFAULT_AUTHOR = 'Web Scraped'
+
+# Scraper section -> table, in the order the scrapers write them
+SECTIONS = {'Resource': 'resource', 'Note': 'note', 'pdf': 'pdf', 'Image': 'image',
+            'Video': 'video', 'Website': 'website'}
+
+# Tables in load order with the columns the importer fills
+TABLES = {
+    'resource': ('ResourceID', 'Date', 'DateFor', 'Author', 'Topic', 'Keywords', 'Rating', 'Format', 'isVerified'),
+    'note': ('ResourceID', 'Body'),
+    'video': ('ResourceID', 'Duration', 'Link'),
+    'website': ('ResourceID', 'Link'),
+    'pdf': ('ResourceID', 'Body', 'Link'),
+    'image': ('ResourceID', 'Size', 'Link'),
+}
+
+# Format as the scrapers spell it (any case) -> resource.Format
+RESOURCE_FORMATS = {'note': 'Note', 'video': 'Video', 'website': 'Website', 'pdf': 'Pdf', 'image': 'Image'}
+
+HTTP_RE = re.compile(r'^https?://', re.I)
+PDF_RE = re.compile(r'\.pdf$', re.I)
+IMAGE_RE = re.compile(r'\.(jpg|jpeg|png|gif)$', re.I)
+CSV_SPECIAL_RE = re.compile(r'[,"\\\n\r]')
+
+
+def connect(local_infile=False):
+    socket_path = next((p for p in socket_paths if os.path.exists(p)), '/tmp/mysql.sock')
+    return MySQLdb.connect(host='localhost', user='admin', passwd='admin', db='lobsternotes',
+                           unix_socket=socket_path, local_infile=1 if local_infile else 0)
+
+
+# ---------- normalizing ----------
+
+class Skip(Exception):
+    """A row the importer leaves out; the message is the reason it is counted under."""
+
+
+def _text(value, limit):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value[:limit] if value else None
+
+
+def _date(value, today):
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        return today
+
+
+def _resource_id(row):
+    rid = row.get('ResourceID')
+    if not isinstance(rid, int) or isinstance(rid, bool) or not 0 < rid < 2 ** 32:
+        raise Skip("ResourceID missing or not an unsigned integer")
+    return rid
+
+
+def normalize(section, row, today):
+    """(table, values) for one scraper row, values in TABLES[table] order."""
+    if not isinstance(row, dict):
+        raise Skip("row is not an object")
+    rid = _resource_id(row)
+    table = SECTIONS[section]
+
+    if table == 'resource':
+        fmt = RESOURCE_FORMATS.get(str(row.get('Format') or '').lower())
+        if fmt is None:
+            raise Skip("unknown Format")
+        rating = row.get('Rating')
+        # Scrapers write a 9.9 placeholder; Rating is the average of 0-5 scores
+        if not isinstance(rating, (int, float)) or isinstance(rating, bool) or not 0 <= rating <= 5:
+            rating = None
+        return table, (rid, _date(row.get('Date'), today), _date(row.get('DateFor'), today),
+                       _text(row.get('Author'), 50) or DEFAULT_AUTHOR, _text(row.get('Topic'), 25) or 'n/a',
+                       _text(row.get('Keywords'), 25), rating, fmt, bool(row.get('isVerified')))
+
+    if table == 'note':
+        body = row.get('Body')
+        if not isinstance(body, str):
+            raise Skip("Note Body missing")
+        return table, (rid, body[:2048])
+
+    if table == 'video':
+        link = _text(row.get('Link'), 2048)
+        if link is not None and not HTTP_RE.match(link):
+            raise Skip("Video Link is not an http(s) URL")
+        duration = row.get('Duration')
+        # Scrapers write 0 when they could not read the length; the table needs > 0
+        if not isinstance(duration, int) or duration <= 0:
+            duration = 1
+        return table, (rid, duration, link)
+
+    if table == 'website':
+        link = _text(row.get('Link'), 2048)
+        if link is None or not HTTP_RE.match(link):
+            raise Skip("Website Link is not an http(s) URL")
+        return table, (rid, link)
+
+    if table == 'pdf':
+        # Older scrapes only have Body, holding the link; ImportData falls back the same way
+        body = _text(row.get('Body'), 2048)
+        link = _text(row.get('Link'), 2048) or body
+        if link is None or not (HTTP_RE.match(link) and PDF_RE.search(link)):
+            raise Skip("pdf Link is not an http(s) URL ending in .pdf")
+        return table, (rid, body or link, link)
+
+    link = _text(row.get('Link'), 2048)
+    if link is None or not (HTTP_RE.match(link) and IMAGE_RE.search(link)):
+        raise Skip("Image Link is not an http(s) URL to a jpg, jpeg, png or gif")
+    size = row.get('Size')
+    if not isinstance(size, int) or size <= 0:
+        size = 1
+    return table, (rid, size, link)
+
+
+# ---------- loading ----------
+
+# One field as LOAD DATA reads it with the options in load_data_sql
+def csv_field(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    value = str(value)
+    if CSV_SPECIAL_RE.search(value):
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+        return f'"{value}"'
+    return value
+
+
+def load_data_sql(table, columns):
+    return (f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(columns)})")
+
+
+def insert_sql(table, columns):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+
+class BulkImporter:
+    """Collects normalized rows per table and loads them in batches.
+
+    With conn=None nothing touches a database (--dry-run): rows are only
+    normalized and counted, and ids are not checked against existing data."""
+
+    def __init__(self, conn, method='insert', batch_size=5000, today=None):
+        if method not in ('insert', 'load'):
+            raise ValueError(f"Unknown method {method}")
+        self.conn = conn
+        self.cursor = conn.cursor() if conn is not None else None
+        self.method = method
+        self.batch_size = batch_size
+        self.today = (today or date.today()).isoformat()
+
+        self.pending = {table: [] for table in TABLES}
+        self.seen = {table: set() for table in TABLES}    # ResourceIDs per table in the input
+        self.imported = set()                              # ResourceIDs accepted into resource
+        self.authors = set()                               # authors known to exist
+        self.counts = Counter()
+        self.skipped = Counter()
+        self.seconds = Counter()
+        self.min_id = self.max_id = None
+        self.csv_files = {}
+        self.tmp_dir = None
+
+    def __enter__(self):
+        if self.method == 'load':
+            self.tmp_dir = tempfile.TemporaryDirectory(prefix='lobster-import-')
+        self._set_checks(False)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            for f in self.csv_files.values():
+                f.close()
+            if self.tmp_dir is not None:
+                self.tmp_dir.cleanup()
+            if exc_type is not None and self.conn is not None:
+                self.conn.rollback()
+        finally:
+            self._set_checks(True)
+            if self.cursor is not None:
+                self.cursor.close()
+
+    def _set_checks(self, enabled):
+        if self.cursor is not None:
+            value = 1 if enabled else 0
+            self.cursor.execute(f"SET SESSION foreign_key_checks = {value}, unique_checks = {value}")
+
+    def add(self, section, row):
+        try:
+            table, values = normalize(section, row, self.today)
+        except Skip as e:
+            self.skipped[str(e)] += 1
+            return
+        rid = values[0]
+        if rid in self.seen[table]:
+            self.skipped[f"duplicate {table} ResourceID in input"] += 1
+            return
+        self.seen[table].add(rid)
+        self.pending[table].append(values)
+        if len(self.pending[table]) >= self.batch_size:
+            self.flush(table)
+
+    def add_all(self, rows):
+        for section, row in rows:
+            self.add(section, row)
+
+    def flush(self, table):
+        if table != 'resource':
+            # Children are only kept once their resource batch has been accepted
+            self._flush_resources()
+            rows = []
+            for values in self.pending[table]:
+                if values[0] in self.imported:
+                    rows.append(values)
+                else:
+                    self.skipped[f"{table} row without an imported resource"] += 1
+            self.pending[table] = []
+            self._write(table, rows)
+        else:
+            self._flush_resources()
+
+    def _flush_resources(self):
+        rows, self.pending['resource'] = self.pending['resource'], []
+        if not rows:
+            return
+        if self.cursor is not None:
+            ids = [values[0] for values in rows]
+            self.cursor.execute(f"SELECT ResourceID FROM resource WHERE ResourceID IN ({', '.join(['%s'] * len(ids))})",
+                                ids)
+            existing = {row[0] for row in self.cursor.fetchall()}
+            if existing:
+                self.skipped["ResourceID already in the database"] += len(existing)
+                rows = [values for values in rows if values[0] not in existing]
+            self._ensure_authors({values[3] for values in rows})
+        for values in rows:
+            self.imported.add(values[0])
+            self.min_id = values[0] if self.min_id is None else min(self.min_id, values[0])
+            self.max_id = values[0] if self.max_id is None else max(self.max_id, values[0])
+        self._write('resource', rows)
+
+    def _ensure_authors(self, names):
+        names = sorted(names - self.authors)
+        if not names:
+            return
+        placeholders = ', '.join(['%s'] * len(names))
+        self.cursor.execute(f"SELECT Name FROM user WHERE Name IN ({placeholders})", names)
+        missing = sorted(set(names) - {row[0] for row in self.cursor.fetchall()})
+        if missing:
+            # New authors become students, as import_khan_data.py always did. The unique
+            # check on user.Name has to be on for these
+            self._set_checks(True)
+            try:
+                self.cursor.executemany(
+                    "INSERT INTO user (Name, Courses, IsProfessor, Password) VALUES (%s, NULL, FALSE, 'defaultpass')",
+                    [(name,) for name in missing])
+                self.cursor.execute(
+                    f"INSERT INTO student (UserID) SELECT UserID FROM user WHERE Name IN ({', '.join(['%s'] * len(missing))})",
+                    missing)
+            finally:
+                self._set_checks(False)
+            print(f"  Created {len(missing)} author users")
+        self.authors.update(names)
+
+    def _write(self, table, rows):
+        if not rows:
+            return
+        self.counts[table] += len(rows)
+        if self.cursor is None:
+            return
+        start = time.perf_counter()
+        if self.method == 'insert':
+            self.cursor.executemany(insert_sql(table, TABLES[table]), rows)
+        else:
+            f = self.csv_files.get(table)
+            if f is None:
+                path = os.path.join(self.tmp_dir.name, f"{table}.csv")
+                f = self.csv_files[table] = open(path, 'w', encoding='utf-8', newline='')
+            for values in rows:
+                f.write(','.join(map(csv_field, values)) + '\n')
+        self.seconds[table] += time.perf_counter() - start
+
+    def finish(self):
+        """Loads what is left, refreshes the derived tables and commits."""
+        for table in TABLES:
+            self.flush(table)
+        if self.cursor is None:
+            return
+        if self.method == 'load':
+            for table in TABLES:
+                f = self.csv_files.pop(table, None)
+                if f is None:
+                    continue
+                f.close()
+                start = time.perf_counter()
+                self.cursor.execute(load_data_sql(table, TABLES[table]), (f.name,))
+                self.seconds[table] += time.perf_counter() - start
+        if self.min_id is not None:
+            start = time.perf_counter()
+            self.cursor.execute("CALL SP_Resource_Summary_Refresh(%s, %s)", (self.min_id, self.max_id))
+            self.cursor.execute("CALL SP_Resource_Subject_Refresh(%s, %s)", (self.min_id, self.max_id))
+            self.seconds['summary refresh'] += time.perf_counter() - start
+        if self.imported:
+            for tag in ('resources', 'users'):
+                self.cursor.execute("CALL SP_Cache_Version_Bump(%s)", (tag,))
+        self.conn.commit()
+
+    def report(self, elapsed):
+        for table in TABLES:
+            count = self.counts[table]
+            seconds = self.seconds[table]
+            rate = f"{count / seconds:>12,.0f} rows/s" if seconds and count else ''
+            print(f"  {table:<10}{count:>10} rows {seconds:8.2f} s {rate}")
+        if self.seconds['summary refresh']:
+            print(f"  {'summary refresh':<20}{self.seconds['summary refresh']:>9.2f} s")
+        for reason, count in self.skipped.most_common():
+            print(f"  Skipped {count}: {reason}")
+        total = sum(self.counts.values())
+        print(f"Imported {total} rows in {elapsed:.2f} s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+def import_files(conn, paths, method='insert', batch_size=5000, fmt=None):
+    """Imports scraper files in one transaction and prints the per-table report."""
+    start = time.perf_counter()
+    with BulkImporter(conn, method=method, batch_size=batch_size) as importer:
+        for path in paths:
+            print(f"Loading data from {path}...")
+            importer.add_all(iter_rows(path, fmt))
+        importer.finish()
+    importer.report(time.perf_counter() - start)
+    return importer
+
+
+def main():
+    p = argparse.ArgumentParser(description="Bulk import scraper output files")
+    p.add_argument('files', nargs='*', default=[DEFAULT_FILE], help="Scraper JSON, NDJSON or columnar files (default: the bundled data.json)")
+    p.add_argument('--method', choices=['insert', 'load'], default='insert',
+                   help="Multi-row INSERTs or LOAD DATA LOCAL INFILE from temp CSVs")
+    p.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT statement and id check")
+    p.add_argument('--format', choices=FORMATS, help="Input format (default: detected per file)")
+    p.add_argument('--dry-run', action='store_true', help="Normalize and count rows without a database")
+    args = p.parse_args()
+
+    conn = None if args.dry_run else connect(local_infile=args.method == 'load')
+    try:
+        import_files(conn, args.files, method=args.method, batch_size=args.batch_size, fmt=args.format)
+    except Exception as e:
+        print(f"Error importing data: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
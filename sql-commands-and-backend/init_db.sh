@@ -70,14 +70,14 @@ echo "Dropping and recreating database..."
 if [ -n "$SOCKET" ]; then
     DATADIR=$($MYSQL_BIN -u $USER -p$PASS -S $SOCKET -sN -e "SELECT @@datadir;" 2>/dev/null)
     # Drop all tables first to allow clean database drop
-    $MYSQL_BIN -u $USER -p$PASS -S $SOCKET -e "USE lobsternotes; SET FOREIGN_KEY_CHECKS = 0; DROP TABLE IF EXISTS StageWebData, teaches, enrolled, website, video, image, pdf, note, rating, resource, course, professor, student, user, subject; SET FOREIGN_KEY_CHECKS = 1;" 2>/dev/null
+    $MYSQL_BIN -u $USER -p$PASS -S $SOCKET -e "USE lobsternotes; SET FOREIGN_KEY_CHECKS = 0; DROP VIEW IF EXISTS resource_summary_source; DROP TABLE IF EXISTS StageWebData, cache_version, resource_summary, resource_subject, teaches, enrolled, website, video, image, pdf, note, rating, resource, course, professor, student, user, subject; SET FOREIGN_KEY_CHECKS = 1;" 2>/dev/null
     # Now drop and recreate database
     $MYSQL_BIN -u $USER -p$PASS -S $SOCKET -e "DROP DATABASE IF EXISTS lobsternotes;" 2>&1
     $MYSQL_BIN -u $USER -p$PASS -S $SOCKET -e "CREATE DATABASE lobsternotes;" 2>&1
 else
     DATADIR=$($MYSQL_BIN -u $USER -p$PASS -h localhost -sN -e "SELECT @@datadir;" 2>/dev/null)
     # Drop all tables first to allow clean database drop
-    $MYSQL_BIN -u $USER -p$PASS -h localhost -e "USE lobsternotes; SET FOREIGN_KEY_CHECKS = 0; DROP TABLE IF EXISTS StageWebData, teaches, enrolled, website, video, image, pdf, note, rating, resource, course, professor, student, user, subject; SET FOREIGN_KEY_CHECKS = 1;" 2>/dev/null
+    $MYSQL_BIN -u $USER -p$PASS -h localhost -e "USE lobsternotes; SET FOREIGN_KEY_CHECKS = 0; DROP VIEW IF EXISTS resource_summary_source; DROP TABLE IF EXISTS StageWebData, cache_version, resource_summary, resource_subject, teaches, enrolled, website, video, image, pdf, note, rating, resource, course, professor, student, user, subject; SET FOREIGN_KEY_CHECKS = 1;" 2>/dev/null
     # Now drop and recreate database
     $MYSQL_BIN -u $USER -p$PASS -h localhost -e "DROP DATABASE IF EXISTS lobsternotes;" 2>&1
     $MYSQL_BIN -u $USER -p$PASS -h localhost -e "CREATE DATABASE lobsternotes;" 2>&1
@@ -102,6 +102,9 @@ fi
 echo "Importing data..."
 $MYSQL_BIN -u $USER -p$PASS $MYSQL_CONN lobsternotes < "$SQL_DIR/Lobster Notes Import Data.sql" 2>&1
 
+echo "Backfilling rating totals..."
+$MYSQL_BIN -u $USER -p$PASS $MYSQL_CONN lobsternotes < "$SQL_DIR/Rating Totals Backfill.sql" 2>&1
+
 echo "Loading constraint validation..."
 $MYSQL_BIN -u $USER -p$PASS $MYSQL_CONN lobsternotes < "$SQL_DIR/Constraint Validation.sql" 2>&1
 
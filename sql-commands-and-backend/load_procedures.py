@@ -50,6 +50,13 @@ for match in matches:
     except Exception as e:
         print(f"Error creating {match[1]}: {e}")
 
+# The API bumps cache versions itself now, drop the per-row triggers older loads created
+cursor.execute("SELECT TRIGGER_NAME FROM information_schema.TRIGGERS "
+               "WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME LIKE 'TR\\_%\\_Cache'")
+for (trigger,) in cursor.fetchall():
+    cursor.execute(f"DROP TRIGGER IF EXISTS `{trigger}`")
+    print(f"Dropped trigger: {trigger}")
+
 conn.commit()
 cursor.close()
 conn.close()
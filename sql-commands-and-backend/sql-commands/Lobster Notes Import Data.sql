@@ -278,6 +278,16 @@ begin
         
 	end if;
 
+    -- Summarize everything this batch inserted for the list views
+    select coalesce(least(min(jt.ResourceID), @MainResourceID), @MainResourceID),
+           coalesce(greatest(max(jt.ResourceID), @MainResourceID), @MainResourceID)
+    into @SummaryFromID, @SummaryToID
+    from JSON_TABLE(j, '$.Resource[*]' COLUMNS(ResourceID int PATH '$.ResourceID')) as jt;
+    call SP_Resource_Summary_Refresh(@SummaryFromID, @SummaryToID);
+    call SP_Resource_Subject_Refresh(@SummaryFromID, @SummaryToID);
+    call SP_Cache_Version_Bump('resources');
+    call SP_Cache_Version_Bump('users');
+
     -- Mark as imported
     update StageWebData set Imported = 1 where DataID = did;
 end//
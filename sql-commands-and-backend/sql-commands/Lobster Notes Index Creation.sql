@@ -70,6 +70,63 @@ ON resource (Topic ASC, DateFor DESC);
 CREATE INDEX IX_Resource_Author_DateFor
 ON resource (Author ASC, DateFor DESC);
 
+/*
+Resource index creation scripts - Keyset Pagination
+Composite index backing GET /api/resources pages
+*/
+-- Serves ORDER BY Date DESC, ResourceID DESC LIMIT N and the
+-- (Date, ResourceID) < cursor seek, so each page reads only N+1 index entries
+-- instead of sorting the whole catalog
+CREATE INDEX IX_Resource_Date_ResourceID
+ON resource (Date DESC, ResourceID DESC);
+
+-- Same for ?sort=datefor and ?sort=rating; the rating key is a functional index
+-- part so it matches the COALESCE(Rating, -1) the API sorts and seeks on
+CREATE INDEX IX_Resource_DateFor_ResourceID
+ON resource (DateFor DESC, ResourceID DESC);
+
+CREATE INDEX IX_Resource_Rating_ResourceID
+ON resource ((COALESCE(Rating, -1)) DESC, ResourceID DESC);
+
+/*
+Resource summary index creation scripts
+Keyset pagination for the list views, which read resource_summary only
+*/
+-- Same sort keys as the resource indexes above
+CREATE INDEX IX_ResourceSummary_Date_ResourceID
+ON resource_summary (Date DESC, ResourceID DESC);
+
+CREATE INDEX IX_ResourceSummary_DateFor_ResourceID
+ON resource_summary (DateFor DESC, ResourceID DESC);
+
+CREATE INDEX IX_ResourceSummary_Rating_ResourceID
+ON resource_summary ((COALESCE(Rating, -1)) DESC, ResourceID DESC);
+
+/*
+Resource subject index creation scripts
+*/
+-- Serves GET /api/subjects/<code>/resources pages: equality on SubjectCode, then
+-- ORDER BY Date DESC, ResourceID DESC with the (Date, ResourceID) < cursor seek
+CREATE INDEX IX_ResourceSubject_SubjectCode_Date
+ON resource_subject (SubjectCode, Date DESC, ResourceID DESC);
+
+/*
+Resource index creation scripts - Full-Text Search
+FULLTEXT indexes serving GET /api/resources?search=
+*/
+-- Topic, keywords and author searched together with MATCH ... AGAINST in boolean mode,
+-- replacing leading-wildcard LIKE predicates that cannot use any index
+CREATE FULLTEXT INDEX FT_Resource_Topic_Keywords_Author
+ON resource (Topic, Keywords, Author);
+
+-- Note bodies for full-text search
+CREATE FULLTEXT INDEX FT_Note_Body
+ON note (Body);
+
+-- Pdf bodies for full-text search
+CREATE FULLTEXT INDEX FT_Pdf_Body
+ON pdf (Body);
+
 /*
 Rating index creation scripts
 */
@@ -58,6 +58,10 @@ create table resource(
     Topic varchar(25) not null,
     Keywords varchar(25) null,
     Rating numeric(2,1),
+    -- Running totals maintained by SP_Rating_Totals_Add so averages never re-scan rating;
+    -- they count rating rows only, an imported Rating is shown until the first vote replaces it
+    RatingSum numeric(10,1) not null default 0.0 check(RatingSum >= 0.0),
+    RatingCount int unsigned not null default 0,
     Format varchar(7) not null check(Format in('Note', 'Video', 'Website', 'Pdf', 'Image')),
     isVerified boolean null,
     primary key(ResourceID),
@@ -135,6 +139,76 @@ create table StageWebData(
     Imported int default 0
 );
 
+-- Subjects a resource belongs to: from the course/subject it was posted for and from
+-- subject codes or names found in its Topic/Keywords (SP_Resource_Subject_Refresh).
+-- Date is copied from resource so a subject's newest resources come straight off an index
+create table resource_subject(
+	ResourceID int unsigned,
+    SubjectCode char(3),
+    Date date not null,
+    primary key(ResourceID, SubjectCode),
+    foreign key(ResourceID) references resource(ResourceID) on update cascade on delete cascade,
+    foreign key(SubjectCode) references subject(Code) on update cascade on delete cascade
+);
+
+-- One row per resource as the list views show it: the subtype link folded into Url,
+-- the rating totals and a body snippet, so listing never joins the five subtype tables
+create view resource_summary_source as
+select
+    r.ResourceID,
+    r.Date,
+    r.DateFor,
+    r.Author,
+    r.Topic,
+    r.Keywords,
+    r.Format,
+    r.Rating,
+    r.RatingCount,
+    r.isVerified,
+    coalesce(w.Link, v.Link, p.Link, i.Link) as Url,
+    v.Duration,
+    i.Size as ImageSize,
+    left(coalesce(n.Body, p.Body), 280) as Snippet
+from resource r
+left join note n on r.ResourceID = n.ResourceID
+left join website w on r.ResourceID = w.ResourceID
+left join video v on r.ResourceID = v.ResourceID
+left join pdf p on r.ResourceID = p.ResourceID
+left join image i on r.ResourceID = i.ResourceID;
+
+-- Materialized copy of resource_summary_source, refreshed by SP_Resource_Summary_Refresh
+-- from the write paths and ImportData (rebuild/check with Phase 3/backend/resource_summary.py)
+create table resource_summary(
+	ResourceID int unsigned,
+    Date date not null,
+    DateFor date not null,
+    Author varchar(50) not null,
+    Topic varchar(25) not null,
+    Keywords varchar(25) null,
+    Format varchar(7) not null,
+    Rating numeric(2,1),
+    RatingCount int unsigned not null default 0,
+    isVerified boolean null,
+    Url varchar(2048) null,
+    Duration int unsigned null,
+    ImageSize int unsigned null,
+    Snippet varchar(280) null,
+    primary key(ResourceID),
+    foreign key(ResourceID) references resource(ResourceID) on update cascade on delete cascade
+);
+
+-- Version of each cache tag the API builds response ETags from (Phase 3/backend/response_cache.py):
+-- a group ('resources', 'courses', 'users') or one row ('resource:12'). The API bumps the tags
+-- a request wrote once it has committed; anything writing outside the API calls
+-- SP_Cache_Version_Bump for the tags it touched
+create table cache_version(
+	Tag varchar(64),
+    Version bigint unsigned not null default 0,
+    Modified timestamp(6) not null default current_timestamp(6),
+    primary key(Tag)
+);
+insert into cache_version (Tag) values ('resources'), ('courses'), ('users');
+
 -- Average Rating attribute of Resource with Scores
 -- STORED PROCEDURES AND TRIGGERS CANNOT BE LOADED VIA PIPE
 -- Use /home/nikki.gorski/databases/cos457_course_proj/sql-commands-and-backend/load_procedures.py after init
@@ -0,0 +1,27 @@
+/*
+Rating Totals Backfill
+Rebuilds resource.RatingSum/RatingCount from the rating table, which holds every
+counted vote: resources created before the running totals existed, and rows whose
+totals counted their imported Rating as a vote. An imported Rating with no votes
+behind it stays as the displayed value until the first vote replaces it. Safe to
+re-run, it only touches rows whose totals disagree with the rating table.
+*/
+
+USE lobsternotes;
+
+update resource as R
+left join (
+    select ResourceID, sum(Score) as ScoreSum, count(*) as ScoreCount
+    from rating
+    group by ResourceID
+) as T on T.ResourceID = R.ResourceID
+set R.RatingSum = coalesce(T.ScoreSum, 0.0),
+    R.RatingCount = coalesce(T.ScoreCount, 0),
+    R.Rating = if(T.ScoreCount is null, R.Rating, round(T.ScoreSum / T.ScoreCount, 1))
+where R.RatingSum <> coalesce(T.ScoreSum, 0.0) or R.RatingCount <> coalesce(T.ScoreCount, 0);
+
+update resource_summary as S join resource as R on S.ResourceID = R.ResourceID
+set S.Rating = R.Rating,
+    S.RatingCount = R.RatingCount
+where S.Rating <> R.Rating or S.RatingCount <> R.RatingCount
+    or (S.Rating is null) <> (R.Rating is null);
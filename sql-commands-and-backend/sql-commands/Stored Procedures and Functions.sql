@@ -230,6 +230,33 @@ end;
 
 
 
+/*
+Adds score_count scores totalling score_sum to a resource's running totals and
+its resource_summary row. Shared by SP_Rating_Rate and the batched rating queue
+(rating_queue.py) so both keep the same maths. The totals only ever hold
+rating rows: an imported Rating on a resource with no votes yet is a display
+placeholder, replaced by the average of the first scores. Runs inside the
+caller's transaction
+*/
+create procedure SP_Rating_Totals_Add
+(
+	IN resource_ID int unsigned,
+    IN score_sum numeric(10,1),
+    IN score_count int unsigned
+)
+begin
+    -- O(1) running average: assignments apply left to right, so Rating sees the new totals
+    update resource
+		set RatingSum = RatingSum + score_sum,
+            RatingCount = RatingCount + score_count,
+            Rating = round(RatingSum / RatingCount, 1)
+	where ResourceID = resource_ID;
+    update resource_summary as S join resource as R on S.ResourceID = R.ResourceID
+		set S.Rating = R.Rating,
+            S.RatingCount = R.RatingCount
+	where S.ResourceID = resource_ID;
+end;
+
 /*
 Allows submission of rating
 */
@@ -237,7 +264,7 @@ create procedure SP_Rating_Rate
 (
 	IN resource_ID int unsigned,
 	IN rater varchar(50),
-    IN rating numeric(2,1),
+    IN score_of numeric(2,1),
     IN date_of date
 )
 begin
@@ -260,20 +287,72 @@ begin
     (
 		resource_ID,
 		rater,
-        rating,
+        score_of,
         date_of
 	);
---     update resource
--- 		set Rating =
---         (
---         Select avg(r.Score) 
---         from rating as r
---         where r.ResourceID = resource_ID
---         )
--- 	where ResourceID = resource_ID;
+    call SP_Rating_Totals_Add(resource_ID, score_of, 1);
    commit;   
 end;
 
+/*
+Rewrites the resource_summary rows of ResourceIDs from_ID..to_ID from resource_summary_source.
+Rows whose resource is gone are removed by the foreign key cascade
+*/
+create procedure SP_Resource_Summary_Refresh
+(
+	IN from_ID int unsigned,
+    IN to_ID int unsigned
+)
+begin
+	replace into resource_summary
+		(
+			ResourceID, Date, DateFor, Author, Topic, Keywords, Format, Rating,
+            RatingCount, isVerified, Url, Duration, ImageSize, Snippet
+		)
+	select
+		ResourceID, Date, DateFor, Author, Topic, Keywords, Format, Rating,
+        RatingCount, isVerified, Url, Duration, ImageSize, Snippet
+	from resource_summary_source
+	where ResourceID between from_ID and to_ID;
+end;
+
+/*
+Tags ResourceIDs from_ID..to_ID with every subject whose code (case-sensitive, so "CS"
+does not match "physics") or name (any case) appears as a whole word in Topic/Keywords,
+so "Art" matches "art history" but not "Partial". search_index.py filters the same way.
+Tags added from course context are kept
+*/
+create procedure SP_Resource_Subject_Refresh
+(
+	IN from_ID int unsigned,
+    IN to_ID int unsigned
+)
+begin
+	insert ignore into resource_subject
+		(
+			ResourceID,
+            SubjectCode,
+            Date
+		)
+	select R.ResourceID, S.Code, R.Date
+	from resource as R
+	join subject as S
+		on regexp_like(concat_ws(' ', R.Topic, R.Keywords), concat('\\b', S.Code, '\\b'), 'c')
+		or regexp_like(concat_ws(' ', R.Topic, R.Keywords), concat('(^|[^[:alnum:]_])\\Q', S.Name, '\\E($|[^[:alnum:]_])'), 'i')
+	where R.ResourceID between from_ID and to_ID;
+end;
+
+/*
+Rebuilds resource_summary from scratch
+*/
+create procedure SP_Resource_Summary_Rebuild()
+begin
+	start transaction;
+	delete from resource_summary;
+	call SP_Resource_Summary_Refresh(0, 4294967295);
+	commit;
+end;
+
 /*
 Gets details for a resource based on ResourceID
 */
@@ -292,11 +371,9 @@ select
     W.Link as Web_Address,
     V.Duration as Video_Duration,
     
-    (
-    select avg(score) 
-    from Rating 
-    where ResourceID = R.ResourceID
-    ) as Average_Rating
+    case when R.RatingCount > 0
+        then R.RatingSum / R.RatingCount
+    end as Average_Rating
     
 from resource as R join user as U on R.Author = U.Name
 left join note as N on R.ResourceID = N.ResourceID
@@ -314,8 +391,8 @@ create function FN_Rating_Avg(resource_id int)
 	returns decimal(2,1)
 	begin
 	declare r_avg decimal(2,1);
-		select round(avg(Score), 1) into r_avg
-		from rating
+		select round(RatingSum / nullif(RatingCount, 0), 1) into r_avg
+		from resource
 		where resource.ResourceID = resource_id;
 	return r_avg;
 end;
@@ -332,3 +409,18 @@ begin
         where user.UserID = user_id;
 	return is_prof;
 end;
+
+/*
+Bumps the cache_version row of tag_of, which changes the ETag of every cached API
+response built from it. The API bumps its own tags once per request after commit;
+tools that write outside the API (bulk_import.py, ImportData) call this for each
+tag they touched once they are done
+*/
+create procedure SP_Cache_Version_Bump
+(
+	IN tag_of varchar(64)
+)
+begin
+	insert into cache_version (Tag, Version, Modified) values (tag_of, 1, now(6))
+		on duplicate key update Version = Version + 1, Modified = now(6);
+end;
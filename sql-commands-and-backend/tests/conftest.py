@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import bulk_import and the scraper modules the way their scripts run them
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'backend', 'data-scraping-and-validation'))
+sys.path.insert(0, root)
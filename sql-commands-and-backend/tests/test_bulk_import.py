@@ -0,0 +1,187 @@
+import re
+
+import pytest
+
+pytest.importorskip('MySQLdb')
+from bulk_import import DEFAULT_AUTHOR, BulkImporter, Skip, csv_field, normalize
+
+TODAY = '2026-01-15'
+
+
+def resource(rid, fmt='Note', **extra):
+    return dict({'ResourceID': rid, 'Date': '2025-03-01', 'DateFor': '2025-03-02', 'Author': 'Ada',
+                 'Topic': 'Binary trees', 'Keywords': 'trees', 'Rating': 4.5, 'Format': fmt,
+                 'isVerified': 0}, **extra)
+
+
+def test_resource_rows_are_normalized_to_the_table_columns():
+    table, values = normalize('Resource', resource(7, fmt='VIDEO', Rating=9.9, Author='  ', Topic='x' * 40,
+                                                   Date='not a date'), TODAY)
+    assert table == 'resource'
+    assert values == (7, TODAY, '2025-03-02', DEFAULT_AUTHOR, 'x' * 25, 'trees', None, 'Video', False)
+
+
+@pytest.mark.parametrize('section, row, reason', [
+    ('Resource', {'Format': 'Note'}, "ResourceID missing or not an unsigned integer"),
+    ('Resource', resource(True), "ResourceID missing or not an unsigned integer"),
+    ('Resource', resource(2 ** 32), "ResourceID missing or not an unsigned integer"),
+    ('Resource', resource(1, fmt='Audio'), "unknown Format"),
+    ('Note', {'ResourceID': 1}, "Note Body missing"),
+    ('Video', {'ResourceID': 1, 'Link': 'youtube.com/x'}, "Video Link is not an http(s) URL"),
+    ('Website', {'ResourceID': 1, 'Link': None}, "Website Link is not an http(s) URL"),
+    ('pdf', {'ResourceID': 1, 'Link': 'https://a.org/notes.doc'}, "pdf Link is not an http(s) URL ending in .pdf"),
+    ('Image', {'ResourceID': 1, 'Link': 'https://a.org/a.bmp'}, "Image Link is not an http(s) URL to a jpg, jpeg, png or gif"),
+    ('Note', ['not', 'a', 'row'], "row is not an object"),
+])
+def test_rows_that_would_break_a_constraint_are_skipped(section, row, reason):
+    with pytest.raises(Skip, match=re.escape(reason)):
+        normalize(section, row, TODAY)
+
+
+def test_child_rows_get_the_defaults_the_tables_need():
+    assert normalize('Video', {'ResourceID': 1, 'Duration': 0, 'Link': None}, TODAY) == ('video', (1, 1, None))
+    assert normalize('Image', {'ResourceID': 1, 'Size': -3, 'Link': 'https://a.org/a.PNG'}, TODAY) == \
+        ('image', (1, 1, 'https://a.org/a.PNG'))
+    # Older scrapes keep the pdf link in Body
+    assert normalize('pdf', {'ResourceID': 1, 'Body': 'https://a.org/n.pdf'}, TODAY) == \
+        ('pdf', (1, 'https://a.org/n.pdf', 'https://a.org/n.pdf'))
+    assert normalize('Note', {'ResourceID': 1, 'Body': 'b' * 3000}, TODAY) == ('note', (1, 'b' * 2048))
+
+
+def test_csv_fields():
+    assert csv_field(None) == '\\N'
+    assert csv_field(False) == '0'
+    assert csv_field('a,b') == '"a,b"'
+
+
+def test_dry_run_counts_rows_and_skips_by_reason():
+    with BulkImporter(None, batch_size=2) as importer:
+        importer.add_all([
+            ('Resource', resource(1)),
+            ('Note', {'ResourceID': 1, 'Body': 'first'}),
+            ('Resource', resource(1)),
+            ('Note', {'ResourceID': 9, 'Body': 'orphan'}),
+            ('Resource', resource(2, fmt='Website')),
+            ('Website', {'ResourceID': 2, 'Link': 'https://a.org'}),
+        ])
+        importer.finish()
+    assert dict(importer.counts) == {'resource': 2, 'note': 1, 'website': 1}
+    assert dict(importer.skipped) == {"duplicate resource ResourceID in input": 1,
+                                      "note row without an imported resource": 1}
+    assert (importer.min_id, importer.max_id) == (1, 2)
+
+
+class FakeCursor:
+    def __init__(self, existing_ids=(), users=()):
+        self.existing_ids = set(existing_ids)
+        self.users = set(users)
+        self.statements = []
+        self._result = []
+
+    def execute(self, query, args=None):
+        self.statements.append(query)
+        if query.startswith("SELECT ResourceID FROM resource"):
+            self._result = [(rid,) for rid in args if rid in self.existing_ids]
+        elif query.startswith("SELECT Name FROM user"):
+            self._result = [(name,) for name in args if name in self.users]
+        else:
+            self._result = []
+
+    def executemany(self, query, rows):
+        self.statements.append(query)
+        if query.startswith("INSERT INTO user"):
+            self.users.update(name for name, in rows)
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = self.rollbacks = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_import_skips_existing_ids_creates_authors_and_bumps_cache_versions_once():
+    cursor = FakeCursor(existing_ids={1}, users={'Ada'})
+    conn = FakeConnection(cursor)
+    with BulkImporter(conn) as importer:
+        importer.add_all([
+            ('Resource', resource(1)),
+            ('Note', {'ResourceID': 1, 'Body': 'already there'}),
+            ('Resource', resource(2, Author='Grace')),
+            ('Note', {'ResourceID': 2, 'Body': 'new'}),
+        ])
+        importer.finish()
+    assert dict(importer.counts) == {'resource': 1, 'note': 1}
+    assert importer.skipped["ResourceID already in the database"] == 1
+    assert importer.skipped["note row without an imported resource"] == 1
+    assert 'Grace' in cursor.users
+    assert conn.commits == 1 and conn.rollbacks == 0
+
+    statements = cursor.statements
+    assert statements[0] == "SET SESSION foreign_key_checks = 0, unique_checks = 0"
+    # Checks go back on while the author is created
+    created = statements.index("INSERT INTO user (Name, Courses, IsProfessor, Password) VALUES (%s, NULL, FALSE, 'defaultpass')")
+    assert statements[created - 1] == "SET SESSION foreign_key_checks = 1, unique_checks = 1"
+    assert "INSERT INTO resource (ResourceID, Date, DateFor, Author, Topic, Keywords, Rating, Format, isVerified) " \
+           "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)" in statements
+    assert statements.count("CALL SP_Cache_Version_Bump(%s)") == 2
+    assert statements[-1] == "SET SESSION foreign_key_checks = 1, unique_checks = 1"
+
+
+def test_a_failed_import_rolls_back():
+    conn = FakeConnection(FakeCursor())
+    with pytest.raises(RuntimeError):
+        with BulkImporter(conn) as importer:
+            importer.add('Resource', resource(1))
+            raise RuntimeError("disk full")
+    assert conn.rollbacks == 1 and conn.commits == 0
+
+
+def test_cli_reads_the_input_format_it_is_given(tmp_path, monkeypatch, capsys):
+    import bulk_import
+    from scraper_stream import write_rows
+
+    # Saved as .json, so only --format ndjson (or sniffing) reads it as NDJSON
+    path = tmp_path / 'crawl.json'
+    write_rows([('Resource', resource(1)), ('Note', {'ResourceID': 1, 'Body': 'b'}),
+                ('Resource', resource(2, fmt='Website')), ('Website', {'ResourceID': 2, 'Link': 'https://a.org'})],
+               str(path), 'ndjson')
+    monkeypatch.setattr('sys.argv', ['bulk_import.py', str(path), '--dry-run', '--format', 'ndjson'])
+    bulk_import.main()
+    out = capsys.readouterr().out
+    assert "Imported 4 rows" in out
+
+    # The resource Format names are not input formats
+    monkeypatch.setattr('sys.argv', ['bulk_import.py', str(path), '--dry-run', '--format', 'note'])
+    with pytest.raises(SystemExit) as exit_info:
+        bulk_import.main()
+    assert exit_info.value.code == 2
+    assert "invalid choice: 'note'" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('fmt', ['json', 'ndjson', 'columnar'])
+def test_every_interchange_format_imports_the_same_rows(tmp_path, fmt, capsys):
+    from bulk_import import import_files
+    from scraper_stream import EXTENSION_FOR, write_rows
+
+    path = tmp_path / f"scrape{EXTENSION_FOR[fmt]}"
+    write_rows([('Resource', resource(1, fmt='Pdf')), ('pdf', {'ResourceID': 1, 'Link': 'https://a.org/n.pdf'}),
+                ('Resource', resource(2)), ('Note', {'ResourceID': 2, 'Body': 'b'}), ('Note', {'ResourceID': 3})],
+               str(path))
+    importer = import_files(None, [str(path)])
+    assert dict(importer.counts) == {'resource': 2, 'pdf': 1, 'note': 1}
+    assert dict(importer.skipped) == {"Note Body missing": 1}
@@ -0,0 +1,167 @@
+import io
+import json
+
+import pytest
+
+from scraper_columnar import write_columnar
+from scraper_stream import (SECTIONS, iter_data, iter_json, iter_rows, iter_sections, sniff_format,
+                            write_rows, write_sections)
+
+DOCUMENT = {
+    'Resource': [{'ResourceID': 1, 'Topic': 'Vectors', 'Rating': 9.9, 'Format': 'Video'},
+                 {'ResourceID': 2, 'Topic': 'Limits — intro', 'Rating': 4.25, 'Format': 'Note'}],
+    'Note': [{'ResourceID': 2, 'Body': 'Brackets ] and braces } inside a "string", ' + 'x' * 500}],
+    'pdf': [],
+    'Image': [],
+    'Video': [{'ResourceID': 1, 'Duration': 12345678901234567890, 'Link': None}],
+    'Website': [],
+}
+
+
+def expected_rows(document):
+    return [(section, row) for section in SECTIONS for row in document.get(section, [])]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+def test_rows_stream_out_whatever_the_chunk_size(tmp_path, chunk_size):
+    path = tmp_path / 'scrape.json'
+    path.write_text(json.dumps(DOCUMENT, indent=2, ensure_ascii=False), encoding='utf-8')
+    assert list(iter_json(str(path), chunk_size)) == expected_rows(DOCUMENT)
+
+
+def test_compact_documents_and_lowercase_sections_are_read(tmp_path):
+    path = tmp_path / 'scrape.json'
+    path.write_text('{"resource":[{"ResourceID":1}],"website":[{"ResourceID":1,"Link":"https://a.org"}]}',
+                    encoding='utf-8')
+    assert list(iter_rows(str(path))) == [('Resource', {'ResourceID': 1}),
+                                          ('Website', {'ResourceID': 1, 'Link': 'https://a.org'})]
+
+
+def test_keys_that_are_not_row_arrays_are_skipped():
+    f = io.StringIO('{"meta": {"pages": [1, 2]}, "count": 3, "Note": [{"ResourceID": 5, "Body": "b"}], "x": []}')
+    assert list(iter_sections(f, chunk_size=4)) == [('Note', {'ResourceID': 5, 'Body': 'b'})]
+
+
+def test_unknown_sections_are_left_out(tmp_path):
+    path = tmp_path / 'scrape.json'
+    path.write_text('{"Ignored": [{"a": 1}], "Note": [{"ResourceID": 1, "Body": "b"}]}', encoding='utf-8')
+    assert list(iter_json(str(path))) == [('Note', {'ResourceID': 1, 'Body': 'b'})]
+
+
+@pytest.mark.parametrize('text', ['{"Note": [{"ResourceID": 1}', '["Note"]', '{"Note": [{"ResourceID": 1,'])
+def test_broken_documents_raise(text):
+    with pytest.raises(ValueError):
+        list(iter_sections(io.StringIO(text), chunk_size=8))
+
+
+def test_written_sections_read_back_the_same(tmp_path):
+    path = tmp_path / 'out.json'
+    counts = write_sections(expected_rows(DOCUMENT), str(path))
+    assert counts == {section: len(rows) for section, rows in DOCUMENT.items()}
+    assert json.loads(path.read_text(encoding='utf-8')) == DOCUMENT
+    assert list(iter_json(str(path), chunk_size=16)) == expected_rows(DOCUMENT)
+    # Only the output is left behind, no temp files
+    assert [p.name for p in tmp_path.iterdir()] == ['out.json']
+
+
+def test_in_memory_documents_give_the_same_stream():
+    assert list(iter_data(DOCUMENT)) == expected_rows(DOCUMENT)
+    assert list(iter_data({'note': [{'ResourceID': 1}], 'Video': 'not a list'})) == [('Note', {'ResourceID': 1})]
+
+
+ROWS = [
+    ('Resource', {'ResourceID': 1, 'Topic': 'Vectors', 'Rating': 9.9, 'Format': 'Video', 'isVerified': False}),
+    ('Video', {'ResourceID': 1, 'Duration': 0, 'Link': None}),
+    ('Resource', {'ResourceID': 2, 'Topic': 'Limits — intro', 'Rating': 4, 'Format': 'Note', 'Keywords': None}),
+    ('Note', {'ResourceID': 2, 'Body': 'line one\nline two', 'Tags': ['a', {'b': 1}]}),
+    ('Resource', {'ResourceID': 3, 'Topic': 'Ohm', 'Rating': 3.5, 'Format': 'Image'}),
+    ('Image', {'ResourceID': 3, 'Size': 2048, 'Link': 'https://a.org/i.png'}),
+]
+
+
+def by_section(rows):
+    return {section: [row for s, row in rows if s == section] for section in SECTIONS}
+
+
+def test_ndjson_round_trip_keeps_rows_in_order(tmp_path):
+    path = str(tmp_path / 'crawl.ndjson')
+    counts = write_rows(ROWS, path)
+    assert counts['Resource'] == 3 and counts['Website'] == 0
+    assert sniff_format(path) == 'ndjson'
+    assert list(iter_rows(path)) == ROWS
+
+
+def test_ndjson_files_can_be_appended_to(tmp_path):
+    path = str(tmp_path / 'crawl.ndjson')
+    write_rows(ROWS[:2], path)
+    write_rows(ROWS[2:], path, append=True)
+    assert list(iter_rows(path)) == ROWS
+
+
+def test_ndjson_errors_name_the_line(tmp_path):
+    path = tmp_path / 'crawl.ndjson'
+    path.write_text('{"type": "Note", "ResourceID": 1}\n\n{"type": "Lecture", "ResourceID": 2}\n', encoding='utf-8')
+    with pytest.raises(ValueError, match=r'crawl.ndjson:3: row without a known'):
+        list(iter_rows(str(path), 'ndjson'))
+    with pytest.raises(ValueError, match="already has a 'type' key"):
+        write_rows([('Note', {'type': 'x'})], str(tmp_path / 'out.ndjson'))
+
+
+def test_columnar_round_trip_keeps_values_nulls_and_absent_keys(tmp_path):
+    path = str(tmp_path / 'crawl.lnc')
+    write_rows(ROWS, path)
+    assert sniff_format(path) == 'columnar'
+    read = list(iter_rows(path))
+    assert by_section(read) == by_section(ROWS)
+    assert 'Keywords' not in read[0][1] and read[1][1]['Keywords'] is None
+    assert isinstance(read[0][1]['isVerified'], bool)
+
+
+def test_columnar_files_keep_resources_ahead_of_their_children(tmp_path):
+    path = str(tmp_path / 'crawl.lnc')
+    write_columnar(ROWS, path, group_size=1)
+    write_columnar(ROWS, path, append=True, group_size=2)
+    seen = set()
+    read = list(iter_rows(path))
+    for section, row in read:
+        if section == 'Resource':
+            seen.add(row['ResourceID'])
+        else:
+            assert row['ResourceID'] in seen
+    assert len(read) == 2 * len(ROWS)
+
+
+def test_format_is_sniffed_from_the_content_not_the_name(tmp_path):
+    ndjson_as_json = str(tmp_path / 'crawl.json')
+    write_rows(ROWS, ndjson_as_json, 'ndjson')
+    assert sniff_format(ndjson_as_json) == 'ndjson'
+    indented = tmp_path / 'indented.ndjson'
+    indented.write_text(json.dumps(DOCUMENT, indent=2), encoding='utf-8')
+    assert sniff_format(str(indented)) == 'json'
+    one_line = tmp_path / 'one_line.json'
+    one_line.write_text(json.dumps({'Resource': [{'ResourceID': 1}]}), encoding='utf-8')
+    assert sniff_format(str(one_line)) == 'json'
+
+
+def test_json_documents_cannot_be_appended_to(tmp_path):
+    with pytest.raises(ValueError, match='cannot append to a json document'):
+        write_rows(ROWS, str(tmp_path / 'out.json'), append=True)
+    with pytest.raises(ValueError, match='Unknown format'):
+        write_rows(ROWS, str(tmp_path / 'out.json'), 'xml')
+
+
+def test_converting_through_every_format_gives_the_legacy_rows_back(tmp_path):
+    from convert_scrapes import convert
+
+    legacy = tmp_path / 'legacy.json'
+    legacy.write_text(json.dumps(DOCUMENT, indent=2, ensure_ascii=False), encoding='utf-8')
+    convert(str(legacy), str(tmp_path / 'a.ndjson'), 'ndjson')
+    convert(str(tmp_path / 'a.ndjson'), str(tmp_path / 'b.lnc'), 'columnar')
+    convert(str(tmp_path / 'b.lnc'), str(tmp_path / 'c.json'), 'json')
+    assert json.loads((tmp_path / 'c.json').read_text(encoding='utf-8')) == DOCUMENT
+
+    empty = tmp_path / 'empty.json'
+    empty.write_text('{"pages": []}', encoding='utf-8')
+    with pytest.raises(ValueError, match='no scraper rows'):
+        convert(str(empty), str(tmp_path / 'empty.ndjson'), 'ndjson')
+    assert not (tmp_path / 'empty.ndjson').exists()